@@ -1,5 +1,11 @@
 from .bit_vector import *
+from .bit_vector_array import *
+from .tracing import *
+from .bit_sliced import *
 from .bit_vector_abc import *
+from .symbolic_context import *
+from .simplify_policy import *
+from .op_memo import *
 from .adt import *
 from .smt_bit_vector import *
 from .z3_bit_vector import *
@@ -8,3 +14,15 @@ from .fp_vector import *
 from .smt_fp_vector import *
 from .modifiers import *
 from .smt_int import *
+from .memory_abc import *
+from .memory import *
+from .smt_memory import *
+from .z3_memory import *
+from .batch import *
+from .trace_file import *
+from .vcd import *
+from .stimulus import *
+from .domain import *
+from .mux import *
+from .session import *
+from .aig import *
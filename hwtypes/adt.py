@@ -56,6 +56,9 @@ class Tuple(metaclass=TupleMeta):
     def __repr__(self):
         return f'{type(self).__name__}({", ".join(map(repr, self._value_))})'
 
+    def __reduce__(self):
+        return type(self), tuple(self._value_)
+
     @property
     def value_dict(self):
         d = {}
@@ -165,6 +168,9 @@ class Sum(metaclass=SumMeta):
     def __repr__(self) -> str:
         return f'{type(self)}({self._value_})'
 
+    def __reduce__(self):
+        return type(self), (self._value_,)
+
     @property
     def value_dict(self):
         d = {}
@@ -232,6 +238,11 @@ class TaggedUnion(Sum, metaclass=TaggedUnionMeta):
     def __hash__(self):
         return hash(self._tag_) + hash(self._value_)
 
+    def __reduce__(self):
+        cls = type(self)
+        field = list(cls.field_dict)[self._tag_]
+        return cls._from_kwargs, ({field : self._value_},)
+
     def __repr__(self):
         return f'{type(self).__name__}({", ".join(f"{k}={v}" for k,v in self.value_dict.items())})'
 
@@ -275,6 +286,10 @@ class Enum(metaclass=EnumMeta):
     def __hash__(self):
         return hash(self._value_)
 
+    def __reduce__(self):
+        # preserve identity of the members
+        return getattr, (type(self), self.name)
+
     def __getattribute__(self, attr):
         # prevent:
         #  class E(Enum):
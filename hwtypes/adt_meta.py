@@ -1,5 +1,7 @@
 from abc import ABCMeta, abstractmethod
+import copyreg
 import itertools as it
+import operator
 import typing as tp
 import weakref
 
@@ -8,7 +10,7 @@ from collections.abc import Mapping, MutableMapping
 from collections import OrderedDict
 from .util import TypedProperty
 from .util import OrderedFrozenDict, FrozenDict
-from .util import _issubclass
+from .util import _issubclass, _reduce_type
 
 __all__ = [
     'BoundMeta', 'TupleMeta', 'ProductMeta',
@@ -206,6 +208,17 @@ class _AttrSyntax(type): #, metaclass=ABCMeta):
     def _from_fields(mcs, fields, name, bases, ns, **kwargs):
         pass
 
+    def _pickle_reduce_(cls):
+        # types declared with a class statement can always be found by
+        # name (or not pickled at all) so cls must come from from_fields
+        if cls.is_bound and cls._unbound_base_ is not None:
+            fields = cls._pickle_fields_()
+            return cls.unbound_t.from_fields, (cls.__name__, fields, cls.is_cached)
+        return cls.__qualname__
+
+    def _pickle_fields_(cls):
+        return dict(cls.field_dict)
+
     def rebind(cls, A: type, B: type, rebind_sub_types: bool = False, rebind_recursive: bool = True):
         new_fields = OrderedDict()
         for field, T in cls.field_dict.items():
@@ -279,6 +292,22 @@ class BoundMeta(_GetitemSyntax): #, metaclass=ABCMeta):
 
         return t
 
+    def __init_subclass__(mcs, **kwargs):
+        super().__init_subclass__(**kwargs)
+        copyreg.pickle(mcs, _reduce_type)
+
+    def _pickle_reduce_(cls):
+        '''
+        Called when pickling types which cannot be found by name.
+        Bound types are rebuilt by binding their unbound type.
+        '''
+        if cls.is_bound and cls._unbound_base_ is not None:
+            return operator.getitem, (cls.unbound_t, cls._pickle_idx_())
+        return cls.__qualname__
+
+    def _pickle_idx_(cls):
+        return cls.fields
+
     def _from_idx(cls, idx) -> 'BoundMeta':
         mcs= type(cls)
         if cls.is_bound:
@@ -427,6 +456,9 @@ def __init__(self, {type_sig}):
         base = _get_tuple_base(bases)[tuple(idx.values())]
         return (*bases, base)
 
+    def _pickle_idx_(cls):
+        return dict(cls.field_dict)
+
     def _name_from_idx(cls, idx):
         return '{}[{{{}}}]'.format(cls.__name__, ', '.join(f"'{k}': {t.__name__}" for k, t in idx.items()))
 
@@ -628,7 +660,12 @@ class EnumMeta(_AttrSyntax, BoundMeta):
     def enumerate(cls):
         yield from cls.fields
 
+    def _pickle_fields_(cls):
+        return {name : elem._value_ for name, elem in cls.field_dict.items()}
+
     def rebind(cls, A: type, B: type, rebind_sub_types: bool = False, rebind_recursive: bool = True):
         # Enums aren't bound to types
         # could potentialy rebind values but that seems annoying
         return cls
+
+copyreg.pickle(BoundMeta, _reduce_type)
@@ -0,0 +1,554 @@
+'''
+And-inverter graph family for bit level reasoning.
+
+AIGBit values are literals of an and-inverter graph: every operation is
+lowered to two input ands and inversions.  The graph hashes its nodes
+structurally (building the same and twice returns the same literal),
+propagates constants and applies the two level rewrites of Brummayer and
+Biere (x & y & x = x & y, x & y & ~x = 0, ~(x & y) & ~x = ~x,
+~(x & y) & x = x & ~y, ...).  The vector types are bit blasted (see
+bit_blast) so AIGBitVector arithmetic builds adders, multipliers, ...
+
+    x = AIGBitVector[8](name='x')
+    y = AIGBitVector[8](name='y')
+    f = (x + y == 5) & (x < y)
+    to_aiger({'f': f})              # b'aag ...'
+    to_dimacs(f)                    # CNF satisfiable iff f is
+    simulate(x + y, (x, to_sliced(xs)), (y, to_sliced(ys)))
+
+The graph is owned by the current symbolic context (see symbolic_context),
+values must only be combined with values of the same graph.  Inputs are
+named, the names of a graph are unique.
+
+simulate evaluates the graph bit parallel with the values of the bit
+sliced family (see bit_sliced): each lane is an independent stimulus.
+'''
+import typing as tp
+
+from .bit_vector_abc import AbstractBit, TypeFamily
+from .bit_vector_util import build_ite
+from .bit_vector import Bit, BitVector
+from .bit_blast import BitBlastedVector, bit_ite, dispatch_oper, dispatch_roper
+from .bit_sliced import SlicedBit, SlicedBitVector, SlicedUIntVector, SlicedSIntVector
+from .symbolic_context import current_context
+
+__all__ = ['AIG', 'AIGBit', 'AIGBitVector', 'AIGNumVector']
+__all__ += ['AIGUIntVector', 'AIGSIntVector']
+__all__ += ['current_aig', 'to_aiger', 'to_dimacs', 'simulate']
+
+# literals are 2 * var + negated, var 0 is the constant false
+_FALSE = 0
+_TRUE = 1
+
+
+class AIG:
+    '''
+    A structurally hashed and-inverter graph
+    '''
+    def __init__(self):
+        # var : (lit, lit) for ands, None for the constant and the inputs.
+        # Nodes are only added so var order is a topological order.
+        self._fanins = [None]
+        # var : name of the inputs
+        self._inputs = {}
+        self._names = {}
+        self._strash = {}
+
+    @property
+    def num_inputs(self) -> int:
+        return len(self._inputs)
+
+    @property
+    def num_ands(self) -> int:
+        return len(self._fanins) - 1 - len(self._inputs)
+
+    def input(self, name : tp.Optional[str] = None) -> int:
+        '''
+        Adds an input, returns its literal.  Raises ValueError if name is
+        taken.
+        '''
+        if name is None:
+            name = f'V_{len(self._fanins)}'
+            while name in self._names:
+                name = '_' + name
+        elif name in self._names:
+            raise ValueError(f'Name {name} already in use')
+        var = len(self._fanins)
+        self._fanins.append(None)
+        self._inputs[var] = name
+        self._names[name] = var
+        return 2 * var
+
+    def and_(self, a : int, b : int) -> int:
+        if a > b:
+            a, b = b, a
+        # constants and trivial cases
+        if a == _FALSE:
+            return _FALSE
+        elif a == _TRUE or a == b:
+            return b
+        elif a ^ 1 == b:
+            return _FALSE
+
+        fanins = self._fanins
+        fa = fanins[a >> 1]
+        fb = fanins[b >> 1]
+        if fa is not None:
+            r = self._rewrite(a, fa, b, fb)
+            if r is not None:
+                return r
+        if fb is not None:
+            r = self._rewrite(b, fb, a, fa)
+            if r is not None:
+                return r
+
+        key = a, b
+        try:
+            return self._strash[key]
+        except KeyError:
+            pass
+        lit = 2 * len(fanins)
+        fanins.append(key)
+        self._strash[key] = lit
+        return lit
+
+    def _rewrite(self, a, fa, b, fb):
+        # two level rewrites of a & b where a is an and (or its negation)
+        a0, a1 = fa
+        if not a & 1:
+            if b == a0 or b == a1:
+                # idempotence
+                return a
+            elif b ^ 1 == a0 or b ^ 1 == a1:
+                # contradiction
+                return _FALSE
+            elif fb is not None and not b & 1 and (a0 ^ 1 in fb or a1 ^ 1 in fb):
+                # contradiction across two ands
+                return _FALSE
+        else:
+            if b ^ 1 == a0 or b ^ 1 == a1:
+                # subsumption
+                return b
+            elif b == a0:
+                # substitution
+                return self.and_(b, a1 ^ 1)
+            elif b == a1:
+                return self.and_(b, a0 ^ 1)
+        return None
+
+    def _cone(self, lits : tp.Iterable[int]) -> tp.List[int]:
+        '''
+        The and vars in the cone of lits, in topological order
+        '''
+        fanins = self._fanins
+        seen = set()
+        stack = [lit >> 1 for lit in lits]
+        while stack:
+            var = stack.pop()
+            if var in seen:
+                continue
+            seen.add(var)
+            f = fanins[var]
+            if f is not None:
+                stack.append(f[0] >> 1)
+                stack.append(f[1] >> 1)
+        return sorted(v for v in seen if fanins[v] is not None)
+
+    def _number(self, lits : tp.Iterable[int]):
+        '''
+        Renumbers the inputs and the ands in the cone of lits to 1, 2, ...
+        (inputs first) as required by AIGER.  Returns the ands and the map
+        from old to new var.
+        '''
+        ands = self._cone(lits)
+        var_map = {0: 0}
+        for var in self._inputs:
+            var_map[var] = len(var_map)
+        for var in ands:
+            var_map[var] = len(var_map)
+        return ands, var_map
+
+    def __repr__(self):
+        return f'AIG(inputs={self.num_inputs}, ands={self.num_ands})'
+
+
+def current_aig() -> AIG:
+    '''
+    The graph of the current symbolic context
+    '''
+    ctx = current_context()
+    aig = ctx.aig
+    if aig is None:
+        aig = ctx.aig = AIG()
+    return aig
+
+
+def bit_cast(fn):
+    def wrapped(self, other):
+        if isinstance(other, AIGBit):
+            return fn(self, other)
+        else:
+            try:
+                other = AIGBit(other)
+            except (TypeError, ValueError):
+                return NotImplemented
+            return fn(self, other)
+    return wrapped
+
+
+class AIGBit(AbstractBit):
+    __slots__ = ('_aig', '_lit')
+
+    @staticmethod
+    def get_family() -> TypeFamily:
+        return _Family_
+
+    def __init__(self, value=None, *, name : tp.Optional[str] = None):
+        if name is not None and value is not None:
+            raise TypeError('Can only name symbolic variables')
+        elif name is not None and not isinstance(name, str):
+            raise TypeError('Name must be string')
+
+        aig = current_aig()
+        if value is None:
+            lit = aig.input(name)
+        elif isinstance(value, AIGBit):
+            aig, lit = value._aig, value._lit
+        elif isinstance(value, (bool, Bit)):
+            lit = _TRUE if value else _FALSE
+        elif isinstance(value, int):
+            if value not in {0, 1}:
+                raise ValueError('Bit must have value 0 or 1 not {}'.format(value))
+            lit = value
+        else:
+            raise TypeError("Can't coerce {} to AIGBit".format(type(value)))
+        self._aig = aig
+        self._lit = lit
+
+    @classmethod
+    def _from_lit_(cls, aig : AIG, lit : int) -> 'AIGBit':
+        bit = cls.__new__(cls)
+        bit._aig = aig
+        bit._lit = lit
+        return bit
+
+    @property
+    def aig(self) -> AIG:
+        return self._aig
+
+    @property
+    def lit(self) -> int:
+        return self._lit
+
+    def is_constant(self) -> bool:
+        return self._lit < 2
+
+    def _graph(self, other) -> AIG:
+        aig = self._aig
+        if other._aig is not aig:
+            # constants are literals of every graph
+            if other._lit < 2:
+                return aig
+            elif self._lit < 2:
+                return other._aig
+            raise ValueError('Cannot combine values of different graphs')
+        return aig
+
+    def _and(self, other, neg_self, neg_other, neg_out):
+        aig = self._graph(other)
+        lit = aig.and_(self._lit ^ neg_self, other._lit ^ neg_other)
+        return type(self)._from_lit_(aig, lit ^ neg_out)
+
+    def _xor(self, other, neg_out):
+        aig = self._graph(other)
+        a, b = self._lit, other._lit
+        # a ^ b = ~(~(a & ~b) & ~(~a & b))
+        lit = aig.and_(aig.and_(a, b ^ 1) ^ 1, aig.and_(a ^ 1, b) ^ 1) ^ 1
+        return type(self)._from_lit_(aig, lit ^ neg_out)
+
+    @bit_cast
+    def __eq__(self, other):
+        return self._xor(other, 1)
+
+    @bit_cast
+    def __ne__(self, other):
+        return self._xor(other, 0)
+
+    def __invert__(self):
+        return type(self)._from_lit_(self._aig, self._lit ^ 1)
+
+    @bit_cast
+    def __and__(self, other):
+        return self._and(other, 0, 0, 0)
+
+    @bit_cast
+    def __or__(self, other):
+        return self._and(other, 1, 1, 1)
+
+    @bit_cast
+    def __xor__(self, other):
+        return self._xor(other, 0)
+
+    __rand__ = __and__
+    __ror__ = __or__
+    __rxor__ = __xor__
+
+    __hash__ = None
+
+    def ite(self, t_branch, f_branch):
+        return build_ite(bit_ite, self, t_branch, f_branch)
+
+    def __bool__(self):
+        raise TypeError('AIGBit cannot be converted to bool')
+
+    def __repr__(self):
+        return f'AIGBit({self._lit})'
+
+
+class AIGBitVector(BitBlastedVector):
+    __slots__ = ()
+    _bit_t_ = AIGBit
+
+    @staticmethod
+    def get_family() -> TypeFamily:
+        return _Family_
+
+    def __init__(self, value=None, *, name : tp.Optional[str] = None):
+        if name is not None and value is not None:
+            raise TypeError('Can only name symbolic variables')
+        elif value is None:
+            if name is not None and not isinstance(name, str):
+                raise TypeError('Name must be string')
+            aig = current_aig()
+            if name is not None:
+                # check first so no input is added on failure
+                for i in range(self.size):
+                    if f'{name}[{i}]' in aig._names:
+                        raise ValueError(f'Name {name}[{i}] already in use')
+                names = [f'{name}[{i}]' for i in range(self.size)]
+            else:
+                names = [None] * self.size
+            self._bits = [AIGBit._from_lit_(aig, aig.input(n)) for n in names]
+        else:
+            super().__init__(value)
+
+
+class AIGNumVector(AIGBitVector):
+    __slots__ = ()
+
+
+class AIGUIntVector(AIGNumVector):
+    __slots__ = ()
+
+
+class AIGSIntVector(AIGNumVector):
+    __slots__ = ()
+
+    __rshift__ = dispatch_oper(BitBlastedVector.bvashr)
+    __rrshift__ = dispatch_roper(__rshift__)
+
+    __floordiv__ = dispatch_oper(BitBlastedVector.bvsdiv)
+    __rfloordiv__ = dispatch_roper(__floordiv__)
+
+    __mod__ = dispatch_oper(BitBlastedVector.bvsrem)
+    __rmod__ = dispatch_roper(__mod__)
+
+    __ge__ = dispatch_oper(BitBlastedVector.bvsge)
+    __gt__ = dispatch_oper(BitBlastedVector.bvsgt)
+    __lt__ = dispatch_oper(BitBlastedVector.bvslt)
+    __le__ = dispatch_oper(BitBlastedVector.bvsle)
+
+    def ext(self, other):
+        return self.sext(other)
+
+
+_Family_ = TypeFamily(AIGBit, AIGBitVector, AIGUIntVector, AIGSIntVector)
+
+# aig unsized type -> sliced unsized type, most specific first
+_SLICED_T = (
+    (AIGSIntVector, SlicedSIntVector),
+    (AIGUIntVector, SlicedUIntVector),
+    (AIGBitVector, SlicedBitVector),
+)
+
+
+def _bits(value) -> tp.List[AIGBit]:
+    if isinstance(value, AIGBit):
+        return [value]
+    elif isinstance(value, AIGBitVector):
+        return value._bits
+    raise TypeError(f'Expected an AIGBit or AIGBitVector not {type(value)}')
+
+
+def _get_aig(bits : tp.Iterable[AIGBit]) -> AIG:
+    aig = None
+    for b in bits:
+        if b._lit < 2:
+            continue
+        elif aig is None:
+            aig = b._aig
+        elif b._aig is not aig:
+            raise ValueError('Cannot combine values of different graphs')
+    return current_aig() if aig is None else aig
+
+
+def _named_outputs(outputs) -> tp.List[tp.Tuple[tp.Optional[str], AIGBit]]:
+    if isinstance(outputs, (AIGBit, AIGBitVector)):
+        outputs = [outputs]
+    if isinstance(outputs, tp.Mapping):
+        items = outputs.items()
+    else:
+        items = ((None, v) for v in outputs)
+    named = []
+    for name, value in items:
+        if isinstance(value, AIGBit) or name is None:
+            named.extend((name, b) for b in _bits(value))
+        else:
+            named.extend((f'{name}[{i}]', b) for i, b in enumerate(_bits(value)))
+    return named
+
+
+def to_aiger(outputs, *, binary : bool = False) -> bytes:
+    '''
+    The AIGER (aag, or aig if binary) file of outputs, a value or a
+    sequence of values or a mapping from names to values (the names go to
+    the symbol table, bit i of a vector x is named x[i]).  All the inputs
+    of the graph are inputs of the file, only the ands in the cone of the
+    outputs are written.
+    '''
+    named = _named_outputs(outputs)
+    aig = _get_aig(b for _, b in named)
+    ands, var_map = aig._number(b._lit for _, b in named)
+
+    def lit(l):
+        return 2 * var_map[l >> 1] | (l & 1)
+
+    M = len(var_map) - 1
+    I = aig.num_inputs
+    header = f'{"aig" if binary else "aag"} {M} {I} 0 {len(named)} {len(ands)}\n'
+    lines = [header]
+    if not binary:
+        lines.extend(f'{2 * var_map[v]}\n' for v in aig._inputs)
+    lines.extend(f'{lit(b._lit)}\n' for _, b in named)
+    body = bytearray(''.join(lines).encode())
+
+    fanins = aig._fanins
+    for var in ands:
+        lhs = 2 * var_map[var]
+        r0, r1 = sorted(map(lit, fanins[var]), reverse=True)
+        if binary:
+            _encode(body, lhs - r0)
+            _encode(body, r0 - r1)
+        else:
+            body += f'{lhs} {r0} {r1}\n'.encode()
+
+    symbols = [f'i{k} {name}\n' for k, name in enumerate(aig._inputs.values())]
+    symbols += [f'o{k} {name}\n' for k, (name, _) in enumerate(named) if name is not None]
+    body += ''.join(symbols).encode()
+    return bytes(body)
+
+
+def _encode(buf : bytearray, x : int) -> None:
+    # 7 bit groups, lsb first, msb of a byte set if more follow
+    while x & ~0x7f:
+        buf.append((x & 0x7f) | 0x80)
+        x >>= 7
+    buf.append(x)
+
+
+def to_dimacs(assertion : AIGBit) -> str:
+    '''
+    The DIMACS CNF (Tseitin encoding) of the cone of assertion, which is
+    satisfiable iff assertion is.  Comment lines map the names of the
+    inputs to their variables.
+    '''
+    if not isinstance(assertion, AIGBit):
+        raise TypeError(f'Expected an AIGBit not {type(assertion)}')
+    aig = assertion._aig
+    ands, var_map = aig._number([assertion._lit])
+
+    def lit(l):
+        v = var_map[l >> 1]
+        return -v if l & 1 else v
+
+    clauses = []
+    fanins = aig._fanins
+    for var in ands:
+        v = var_map[var]
+        a, b = map(lit, fanins[var])
+        clauses.append(f'{-v} {a} 0')
+        clauses.append(f'{-v} {b} 0')
+        clauses.append(f'{v} {-a} {-b} 0')
+    if assertion._lit == _FALSE:
+        clauses.append('0')
+    elif assertion._lit != _TRUE:
+        clauses.append(f'{lit(assertion._lit)} 0')
+
+    lines = [f'c {name} {var_map[var]}' for var, name in aig._inputs.items()]
+    lines.append(f'p cnf {len(var_map) - 1} {len(clauses)}')
+    lines.extend(clauses)
+    return '\n'.join(lines) + '\n'
+
+
+def simulate(outputs, *assignment : tp.Tuple[tp.Any, tp.Any]):
+    '''
+    Evaluates outputs (a value or a tuple / list of values) bit parallel.
+    assignment is pairs of an input (AIGBit or AIGBitVector made of
+    inputs) and its value, a value of the bit sliced family or of the
+    concrete family (which drives every lane).  Returns the values of the
+    outputs in the bit sliced family (see from_sliced).
+    '''
+    lanes = {}
+    for key, value in assignment:
+        if isinstance(key, AIGBit):
+            values = [SlicedBit(value)._value]
+        else:
+            values = [b._value for b in SlicedBitVector[key.size](value)._bits]
+        for b, v in zip(_bits(key), values):
+            if b._lit & 1 or (b._lit >> 1) not in b._aig._inputs:
+                raise ValueError('Only inputs can be assigned')
+            lanes[b._lit >> 1] = v
+
+    leaves = []
+    _collect_bits(outputs, leaves)
+    aig = _get_aig(leaves)
+    ands = aig._cone(b._lit for b in leaves)
+
+    fanins = aig._fanins
+    inputs = aig._inputs
+    vals = {0: 0}
+    for var in {b._lit >> 1 for b in leaves} | {f >> 1 for v in ands for f in fanins[v]}:
+        if var in inputs:
+            try:
+                vals[var] = lanes[var]
+            except KeyError:
+                raise ValueError(f'Input {inputs[var]} is not assigned') from None
+    for var in ands:
+        a, b = fanins[var]
+        va = vals[a >> 1]
+        vb = vals[b >> 1]
+        vals[var] = (~va if a & 1 else va) & (~vb if b & 1 else vb)
+    return _build_sliced(outputs, vals)
+
+
+def _collect_bits(value, bits):
+    if isinstance(value, (tuple, list)):
+        for v in value:
+            _collect_bits(v, bits)
+    else:
+        bits.extend(_bits(value))
+
+
+def _sliced_bit(bit, vals):
+    v = vals[bit._lit >> 1]
+    return SlicedBit._from_lanes_(~v if bit._lit & 1 else v)
+
+
+def _build_sliced(value, vals):
+    if isinstance(value, (tuple, list)):
+        return type(value)(_build_sliced(v, vals) for v in value)
+    elif isinstance(value, AIGBit):
+        return _sliced_bit(value, vals)
+    for A, S in _SLICED_T:
+        if isinstance(value, A):
+            return S[value.size]._from_bits_([_sliced_bit(b, vals) for b in value._bits])
@@ -0,0 +1,206 @@
+'''
+Map functions over batches of hwtypes values on a process pool.
+
+    results = batch_map(alu, xs, ys, ops)
+
+is equivalent to list(map(alu, xs, ys, ops)) but the inputs are split in
+chunks evaluated by a concurrent.futures.ProcessPoolExecutor.  As usual with
+process pools fn must be picklable, i.e. defined at the top level of a
+module.
+
+Columns of concrete values of a single type (e.g. all BitVector[16]) are
+packed into fixed width little endian bytes instead of being pickled value
+by value.  Large input columns are placed in a shared memory block which
+the workers read their chunk from, results are returned packed.
+'''
+from concurrent.futures import Executor, ProcessPoolExecutor, wait
+import os
+import typing as tp
+
+from multiprocessing import shared_memory
+
+from .bit_vector import Bit, BitVector, _make
+
+__all__ = ['batch_map']
+
+#: Size in bytes above which a packed input column is placed in shared memory
+SHARED_MEMORY_THRESHOLD = 1 << 16
+
+
+def _packed_t(values : tp.Sequence) -> tp.Optional[type]:
+    if not values:
+        return None
+    T = type(values[0])
+    if not (T is Bit or (issubclass(T, BitVector) and T.is_sized)):
+        return None
+    for v in values:
+        if type(v) is not T:
+            return None
+    return T
+
+
+def _nbytes(T : type) -> int:
+    if T is Bit:
+        return 1
+    return max((T.size + 7) // 8, 1)
+
+
+def _pack(T : type, values : tp.Sequence) -> bytes:
+    n = _nbytes(T)
+    if T is Bit:
+        return bytes(bool(v._value) for v in values)
+    return b''.join(v._value.to_bytes(n, 'little') for v in values)
+
+
+def _unpack(T : type, buf, start : int, stop : int) -> list:
+    n = _nbytes(T)
+    if T is Bit:
+        return [Bit(b != 0) for b in buf[start:stop]]
+    frm = int.from_bytes
+    return [_make(T, frm(buf[i:i+n], 'little')) for i in range(start*n, stop*n, n)]
+
+
+class _Column:
+    '''
+    Values of one argument, sent to the workers one chunk at a time
+    '''
+    def __init__(self, values):
+        self.values = values
+
+    def chunk(self, start, stop):
+        return _ObjectChunk(self.values[start:stop])
+
+    def close(self):
+        pass
+
+
+class _ObjectChunk:
+    def __init__(self, values):
+        self.values = values
+
+    def get(self):
+        return self.values
+
+
+class _PackedColumn(_Column):
+    def __init__(self, T, values):
+        self.T = T
+        self.data = _pack(T, values)
+
+    def chunk(self, start, stop):
+        n = _nbytes(self.T)
+        return _PackedChunk(self.T, self.data[start*n:stop*n], stop - start)
+
+
+class _PackedChunk:
+    def __init__(self, T, data, count):
+        self.T = T
+        self.data = data
+        self.count = count
+
+    def get(self):
+        return _unpack(self.T, self.data, 0, self.count)
+
+
+class _SharedColumn(_Column):
+    def __init__(self, T, values):
+        self.T = T
+        data = _pack(T, values)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+        self.shm.buf[:len(data)] = data
+
+    def chunk(self, start, stop):
+        return _SharedChunk(self.T, self.shm.name, start, stop)
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+class _SharedChunk:
+    def __init__(self, T, name, start, stop):
+        self.T = T
+        self.name = name
+        self.start = start
+        self.stop = stop
+
+    def get(self):
+        shm = shared_memory.SharedMemory(name=self.name)
+        try:
+            return _unpack(self.T, shm.buf, self.start, self.stop)
+        finally:
+            shm.close()
+
+
+def _make_column(values : tp.Sequence, threshold : int) -> _Column:
+    T = _packed_t(values)
+    if T is None:
+        return _Column(values)
+    elif len(values) * _nbytes(T) >= threshold:
+        return _SharedColumn(T, values)
+    else:
+        return _PackedColumn(T, values)
+
+
+def _run_chunk(fn, chunks):
+    args = [chunk.get() for chunk in chunks]
+    results = list(map(fn, *args))
+    T = _packed_t(results)
+    if T is None:
+        return _ObjectChunk(results)
+    return _PackedChunk(T, _pack(T, results), len(results))
+
+
+def batch_map(fn : tp.Callable, *iterables : tp.Iterable,
+        executor : tp.Optional[Executor] = None,
+        max_workers : tp.Optional[int] = None,
+        chunksize : tp.Optional[int] = None,
+        shared_memory_threshold : int = SHARED_MEMORY_THRESHOLD) -> list:
+    '''
+    Evaluates fn on the zipped iterables in worker processes.  Results are
+    returned as a list in input order.
+
+    executor: pool to submit the chunks to, by default a ProcessPoolExecutor
+        with max_workers processes is created for the call.
+    chunksize: number of inputs per task, by default each worker gets about
+        four chunks.
+    shared_memory_threshold: packed input columns of at least this many bytes
+        are passed through shared memory.
+    '''
+    if not iterables:
+        raise TypeError('batch_map() must have at least one iterable')
+    columns = [list(values) for values in iterables]
+    count = min(map(len, columns))
+    columns = [values[:count] for values in columns]
+    if count == 0:
+        return []
+
+    if max_workers is None:
+        max_workers = getattr(executor, '_max_workers', None) or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = -(-count // (4 * max_workers))
+    if chunksize < 1:
+        raise ValueError('chunksize must be >= 1')
+
+    columns = [_make_column(values, shared_memory_threshold) for values in columns]
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+    futures = []
+    try:
+        futures = [
+            executor.submit(_run_chunk, fn, [c.chunk(start, min(start + chunksize, count)) for c in columns])
+            for start in range(0, count, chunksize)
+        ]
+        results = []
+        for future in futures:
+            results.extend(future.result().get())
+        return results
+    finally:
+        if own_executor:
+            executor.shutdown()
+        else:
+            # workers may still be reading shared memory
+            wait(futures)
+        for column in columns:
+            column.close()
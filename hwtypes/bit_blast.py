@@ -0,0 +1,476 @@
+'''
+Bit vectors represented as a list of bits of some AbstractBit implementation.
+
+Every vector operation is lowered to the logic operations (&, |, ^, ~) of
+the bit type, e.g. addition is a ripple carry adder and shifts are barrel
+shifters.  A bit level family therefore only needs to provide a Bit class
+and subclass BitBlastedVector setting _bit_t_.
+'''
+import functools as ft
+import typing as tp
+
+from .bit_vector_abc import AbstractBitVector, AbstractBit, InconsistentSizeError
+from .bit_vector import Bit, BitVector
+from .util import Method
+
+__all__ = ['BitBlastedVector']
+
+
+def _mux(s, t, f):
+    return (s & t) | (~s & f)
+
+
+def _reduce(op, bits):
+    # balanced tree to keep the logic depth logarithmic
+    bits = list(bits)
+    while len(bits) > 1:
+        paired = [op(a, b) for a, b in zip(bits[::2], bits[1::2])]
+        if len(bits) & 1:
+            paired.append(bits[-1])
+        bits = paired
+    return bits[0]
+
+
+def _add(xs, ys, c):
+    out = []
+    for x, y in zip(xs, ys):
+        p = x ^ y
+        out.append(p ^ c)
+        c = (x & y) | (p & c)
+    return out, c
+
+
+def _neg(xs, zero):
+    out, _ = _add([~x for x in xs], [zero] * len(xs), ~zero)
+    return out
+
+
+def _udivrem(xs, ys, zero):
+    # restoring division, division by zero gives q = -1, r = xs
+    n = len(xs)
+    one = ~zero
+    nys = [~y for y in ys] + [one]
+    q = [zero] * n
+    r = [zero] * n
+    for i in reversed(range(n)):
+        r = [xs[i]] + r
+        diff, no_borrow = _add(r, nys, one)
+        q[i] = no_borrow
+        r = [_mux(no_borrow, d, o) for d, o in zip(diff, r)][:n]
+    return q, r
+
+
+def _coerce(T : tp.Type['BitBlastedVector'], val : tp.Any) -> 'BitBlastedVector':
+    if not isinstance(val, BitBlastedVector):
+        return T(val)
+    elif val.size != T.size:
+        raise InconsistentSizeError('Inconsistent size')
+    else:
+        return val
+
+
+def bv_cast(fn : tp.Callable[['BitBlastedVector', 'BitBlastedVector'], tp.Any]) -> tp.Callable[['BitBlastedVector', tp.Any], tp.Any]:
+    @ft.wraps(fn)
+    def wrapped(self : 'BitBlastedVector', other : tp.Any) -> tp.Any:
+        other = _coerce(type(self), other)
+        return fn(self, other)
+    return wrapped
+
+
+def dispatch_oper(method: tp.MethodDescriptorType):
+    def oper(self, other):
+        try:
+            return method(self, other)
+        except InconsistentSizeError as e:
+            raise e from None
+        except TypeError:
+            return NotImplemented
+
+    return Method(oper)
+
+
+def dispatch_roper(method: Method):
+    method = method.m if isinstance(method, Method) else method
+    def roper(self, other):
+        try:
+            other = _coerce(type(self), other)
+        except InconsistentSizeError as e:
+            raise e from None
+        except TypeError:
+            return NotImplemented
+        return method(other, self)
+
+    return Method(roper)
+
+
+def bit_ite(select, t_branch, f_branch):
+    '''
+    Leaf ite for build_ite for bit classes of bit blasted families
+    '''
+    if isinstance(t_branch, BitBlastedVector):
+        return type(t_branch)._from_bits_(
+            [_mux(select, t, f) for t, f in zip(t_branch._bits, f_branch._bits)])
+    else:
+        return _mux(select, t_branch, f_branch)
+
+
+class BitBlastedVector(AbstractBitVector):
+    __slots__ = ('_bits',)
+
+    # Bit class of the family, set by subclasses
+    _bit_t_ = None
+
+    def __init__(self, value=0):
+        B = self._bit_t_
+        size = self.size
+        zero = B(0)
+        if isinstance(value, BitBlastedVector):
+            bits = value._bits[:size]
+            bits = bits + [zero] * (size - len(bits))
+        elif isinstance(value, B):
+            bits = [value] + [zero] * (size - 1)
+        elif isinstance(value, Bit):
+            bits = [B(value)] + [zero] * (size - 1)
+        elif isinstance(value, (int, BitVector)):
+            value = int(value)
+            one = ~zero
+            bits = [one if (value >> i) & 1 else zero for i in range(size)]
+        elif isinstance(value, tp.Sequence):
+            if len(value) != size:
+                raise ValueError('Iterable is not the correct size')
+            bits = [v if isinstance(v, B) else B(v) for v in value]
+        else:
+            raise TypeError('Cannot construct {} from {}'.format(type(self), value))
+        self._bits = bits
+
+    @classmethod
+    def _from_bits_(cls, bits):
+        bv = cls.__new__(cls)
+        bv._bits = bits
+        return bv
+
+    def _zero_(self):
+        return self._bit_t_(0)
+
+    @classmethod
+    def make_constant(cls, value, size=None):
+        if size is None:
+            return cls(value)
+        else:
+            return cls.unsized_t[size](value)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self._bits})'
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            bits = self._bits[index]
+            return type(self).unsized_t[len(bits)]._from_bits_(bits)
+        elif isinstance(index, int):
+            if index < 0:
+                index = self.size+index
+            if not (0 <= index < self.size):
+                raise IndexError()
+            return self._bits[index]
+        else:
+            raise TypeError()
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            positions = range(*index.indices(self.size))
+            value = _coerce(type(self).unsized_t[len(positions)], value)
+            for i, bit in zip(positions, value._bits):
+                self._bits[i] = bit
+            return
+        if index < 0:
+            index = self.size+index
+        if not (0 <= index < self.size):
+            raise IndexError()
+        B = self._bit_t_
+        self._bits[index] = value if isinstance(value, B) else B(value)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return iter(self._bits)
+
+    @property
+    def num_bits(self):
+        return self.size
+
+    @property
+    def bits(self):
+        return list(self._bits)
+
+    def __bool__(self):
+        raise TypeError(f'{type(self).__name__} cannot be converted to bool')
+
+    def concat(self, other):
+        T = type(self).unsized_t
+        if not isinstance(other, T):
+            raise TypeError(f'value must of type {T}')
+        return T[self.size + other.size]._from_bits_(self._bits + other._bits)
+
+    def bvnot(self):
+        return type(self)._from_bits_([~x for x in self._bits])
+
+    @bv_cast
+    def bvand(self, other):
+        return type(self)._from_bits_([x & y for x, y in zip(self._bits, other._bits)])
+
+    @bv_cast
+    def bvor(self, other):
+        return type(self)._from_bits_([x | y for x, y in zip(self._bits, other._bits)])
+
+    @bv_cast
+    def bvxor(self, other):
+        return type(self)._from_bits_([x ^ y for x, y in zip(self._bits, other._bits)])
+
+    def _shift(self, other, left, fill):
+        bits = self._bits
+        n = len(bits)
+        overflow = self._zero_()
+        for i, s in enumerate(other._bits):
+            step = 1 << i
+            if step >= n:
+                overflow = overflow | s
+                continue
+            if left:
+                shifted = [fill] * step + bits[:-step]
+            else:
+                shifted = bits[step:] + [fill] * step
+            bits = [_mux(s, a, b) for a, b in zip(shifted, bits)]
+        return type(self)._from_bits_([_mux(overflow, fill, b) for b in bits])
+
+    @bv_cast
+    def bvshl(self, other):
+        return self._shift(other, True, self._zero_())
+
+    @bv_cast
+    def bvlshr(self, other):
+        return self._shift(other, False, self._zero_())
+
+    @bv_cast
+    def bvashr(self, other):
+        return self._shift(other, False, self._bits[-1])
+
+    def _rotate(self, other, left):
+        bits = self._bits
+        n = len(bits)
+        for i, s in enumerate(other._bits):
+            step = (1 << i) % n
+            if not step:
+                continue
+            if not left:
+                step = n - step
+            rotated = bits[-step:] + bits[:-step]
+            bits = [_mux(s, a, b) for a, b in zip(rotated, bits)]
+        return type(self)._from_bits_(bits)
+
+    @bv_cast
+    def bvrol(self, other):
+        return self._rotate(other, True)
+
+    @bv_cast
+    def bvror(self, other):
+        return self._rotate(other, False)
+
+    @bv_cast
+    def bvcomp(self, other):
+        return type(self).unsized_t[1]._from_bits_([self.bveq(other)])
+
+    @bv_cast
+    def bveq(self, other):
+        return ~_reduce(lambda a, b: a | b, (x ^ y for x, y in zip(self._bits, other._bits)))
+
+    @bv_cast
+    def bvne(self, other):
+        return ~self.bveq(other)
+
+    def _uge(self, xs, ys):
+        _, no_borrow = _add(xs, [~y for y in ys], ~self._zero_())
+        return no_borrow
+
+    @bv_cast
+    def bvult(self, other):
+        return ~self._uge(self._bits, other._bits)
+
+    @bv_cast
+    def bvule(self, other):
+        return self._uge(other._bits, self._bits)
+
+    @bv_cast
+    def bvugt(self, other):
+        return ~self._uge(other._bits, self._bits)
+
+    @bv_cast
+    def bvuge(self, other):
+        return self._uge(self._bits, other._bits)
+
+    @staticmethod
+    def _flip_msb(xs):
+        return xs[:-1] + [~xs[-1]]
+
+    @bv_cast
+    def bvslt(self, other):
+        return ~self._uge(self._flip_msb(self._bits), self._flip_msb(other._bits))
+
+    @bv_cast
+    def bvsle(self, other):
+        return self._uge(self._flip_msb(other._bits), self._flip_msb(self._bits))
+
+    @bv_cast
+    def bvsgt(self, other):
+        return ~self._uge(self._flip_msb(other._bits), self._flip_msb(self._bits))
+
+    @bv_cast
+    def bvsge(self, other):
+        return self._uge(self._flip_msb(self._bits), self._flip_msb(other._bits))
+
+    def bvneg(self):
+        return type(self)._from_bits_(_neg(self._bits, self._zero_()))
+
+    def adc(self, other, carry):
+        """
+        add with carry
+
+        returns a two element tuple of the form (result, carry)
+
+        """
+        T = type(self)
+        other = _coerce(T, other)
+        carry = _coerce(T.unsized_t[1], carry)
+        bits, c = _add(self._bits, other._bits, carry._bits[0])
+        return T._from_bits_(bits), c
+
+    def ite(self, t_branch, f_branch):
+        return self.bvne(0).ite(t_branch, f_branch)
+
+    @bv_cast
+    def bvadd(self, other):
+        bits, _ = _add(self._bits, other._bits, self._zero_())
+        return type(self)._from_bits_(bits)
+
+    @bv_cast
+    def bvsub(self, other):
+        bits, _ = _add(self._bits, [~y for y in other._bits], ~self._zero_())
+        return type(self)._from_bits_(bits)
+
+    @bv_cast
+    def bvmul(self, other):
+        xs = self._bits
+        n = len(xs)
+        zero = self._zero_()
+        acc = [x & other._bits[0] for x in xs]
+        for i in range(1, n):
+            y = other._bits[i]
+            pp = [x & y for x in xs[:n-i]]
+            high, _ = _add(acc[i:], pp, zero)
+            acc = acc[:i] + high
+        return type(self)._from_bits_(acc)
+
+    @bv_cast
+    def bvudiv(self, other):
+        q, _ = _udivrem(self._bits, other._bits, self._zero_())
+        return type(self)._from_bits_(q)
+
+    @bv_cast
+    def bvurem(self, other):
+        _, r = _udivrem(self._bits, other._bits, self._zero_())
+        return type(self)._from_bits_(r)
+
+    def _sdivrem(self, other):
+        # floor division to match BitVector (python) semantics
+        xs, ys = self._bits, other._bits
+        zero = self._zero_()
+        sx, sy = xs[-1], ys[-1]
+        ax = [_mux(sx, n, p) for n, p in zip(_neg(xs, zero), xs)]
+        ay = [_mux(sy, n, p) for n, p in zip(_neg(ys, zero), ys)]
+        q, r = _udivrem(ax, ay, zero)
+        neg_q = sx ^ sy
+        q = [_mux(neg_q, n, p) for n, p in zip(_neg(q, zero), q)]
+        r = [_mux(sx, n, p) for n, p in zip(_neg(r, zero), r)]
+        adjust = neg_q & _reduce(lambda a, b: a | b, r)
+        q_dec, _ = _add(q, [~zero] * len(q), zero)
+        r_inc, _ = _add(r, ys, zero)
+        q = [_mux(adjust, a, b) for a, b in zip(q_dec, q)]
+        r = [_mux(adjust, a, b) for a, b in zip(r_inc, r)]
+        y_zero = ~_reduce(lambda a, b: a | b, ys)
+        q = [y_zero | b for b in q]
+        r = [_mux(y_zero, a, b) for a, b in zip(xs, r)]
+        return q, r
+
+    @bv_cast
+    def bvsdiv(self, other):
+        q, _ = self._sdivrem(other)
+        return type(self)._from_bits_(q)
+
+    @bv_cast
+    def bvsrem(self, other):
+        _, r = self._sdivrem(other)
+        return type(self)._from_bits_(r)
+
+    def __invert__(self): return self.bvnot()
+
+    __and__ = dispatch_oper(bvand)
+    __rand__ = dispatch_roper(__and__)
+
+    __or__ = dispatch_oper(bvor)
+    __ror__ = dispatch_roper(__or__)
+
+    __xor__ = dispatch_oper(bvxor)
+    __rxor__ = dispatch_roper(__xor__)
+
+    __lshift__ = dispatch_oper(bvshl)
+    __rlshift__ = dispatch_roper(__lshift__)
+
+    __rshift__ = dispatch_oper(bvlshr)
+    __rrshift__ = dispatch_roper(__rshift__)
+
+    def __neg__(self): return self.bvneg()
+
+    __add__ = dispatch_oper(bvadd)
+    __radd__ = dispatch_roper(__add__)
+
+    __sub__ = dispatch_oper(bvsub)
+    __rsub__ = dispatch_roper(__sub__)
+
+    __mul__ = dispatch_oper(bvmul)
+    __rmul__ = dispatch_roper(__mul__)
+
+    __floordiv__ = dispatch_oper(bvudiv)
+    __rfloordiv__ = dispatch_roper(__floordiv__)
+
+    __mod__ = dispatch_oper(bvurem)
+    __rmod__ = dispatch_roper(__mod__)
+
+    __eq__ = dispatch_oper(bveq)
+    __ne__ = dispatch_oper(bvne)
+    __ge__ = dispatch_oper(bvuge)
+    __gt__ = dispatch_oper(bvugt)
+    __le__ = dispatch_oper(bvule)
+    __lt__ = dispatch_oper(bvult)
+
+    def repeat(self, r):
+        r = int(r)
+        if r <= 0:
+            raise ValueError()
+        return type(self).unsized_t[r * self.size]._from_bits_(self._bits * r)
+
+    def sext(self, ext):
+        ext = int(ext)
+        if ext < 0:
+            raise ValueError()
+        T = type(self).unsized_t[self.size + ext]
+        return T._from_bits_(self._bits + [self._bits[-1]] * ext)
+
+    def ext(self, ext):
+        return self.zext(ext)
+
+    def zext(self, ext):
+        ext = int(ext)
+        if ext < 0:
+            raise ValueError()
+        T = type(self).unsized_t[self.size + ext]
+        return T._from_bits_(self._bits + [self._zero_()] * ext)
@@ -0,0 +1,211 @@
+'''
+Bit sliced family for evaluating many stimuli at once.
+
+Each SlicedBit holds a python int whose bit k is the value of that bit for
+stimulus (lane) k.  Logic operations therefore evaluate every lane with a
+single python operation and the vector operations, which are built from
+logic operations by BitBlastedVector, evaluate every lane with a handful of
+operations per bit.  Constants are stored as 0 / -1 (all lanes set) so no
+lane count is needed until the values are converted back with from_sliced.
+
+    a = to_sliced([BitVector[8](x) for x in xs])
+    b = to_sliced([BitVector[8](y) for y in ys])
+    from_sliced(a + b, len(xs))  # == [BitVector[8](x + y) for ...]
+'''
+import typing as tp
+
+from .bit_vector_abc import AbstractBit, TypeFamily
+from .bit_vector_util import build_ite
+from .bit_vector import Bit, BitVector, UIntVector, SIntVector, _make
+from .bit_blast import BitBlastedVector, bit_ite, dispatch_oper, dispatch_roper
+
+__all__ = ['SlicedBit', 'SlicedBitVector', 'SlicedNumVector']
+__all__ += ['SlicedUIntVector', 'SlicedSIntVector']
+__all__ += ['to_sliced', 'from_sliced']
+
+
+def bit_cast(fn):
+    def wrapped(self, other):
+        if isinstance(other, SlicedBit):
+            return fn(self, other)
+        else:
+            try:
+                other = SlicedBit(other)
+            except (TypeError, ValueError):
+                return NotImplemented
+            return fn(self, other)
+    return wrapped
+
+
+class SlicedBit(AbstractBit):
+    __slots__ = ('_value',)
+
+    @staticmethod
+    def get_family() -> TypeFamily:
+        return _Family_
+
+    def __init__(self, value):
+        if isinstance(value, SlicedBit):
+            value = value._value
+        elif isinstance(value, (bool, Bit)):
+            value = -int(bool(value))
+        elif isinstance(value, int):
+            if value not in {0, 1}:
+                raise ValueError('Bit must have value 0 or 1 not {}'.format(value))
+            value = -value
+        else:
+            raise TypeError("Can't coerce {} to SlicedBit".format(type(value)))
+        self._value = value
+
+    @classmethod
+    def _from_lanes_(cls, lanes : int) -> 'SlicedBit':
+        bit = cls.__new__(cls)
+        bit._value = lanes
+        return bit
+
+    def lanes(self, count : int) -> int:
+        '''
+        The first count lanes packed in an int, lane k at bit k
+        '''
+        return self._value & ((1 << count) - 1)
+
+    @bit_cast
+    def __eq__(self, other):
+        return type(self)._from_lanes_(~(self._value ^ other._value))
+
+    @bit_cast
+    def __ne__(self, other):
+        return type(self)._from_lanes_(self._value ^ other._value)
+
+    def __invert__(self):
+        return type(self)._from_lanes_(~self._value)
+
+    @bit_cast
+    def __and__(self, other):
+        return type(self)._from_lanes_(self._value & other._value)
+
+    @bit_cast
+    def __or__(self, other):
+        return type(self)._from_lanes_(self._value | other._value)
+
+    @bit_cast
+    def __xor__(self, other):
+        return type(self)._from_lanes_(self._value ^ other._value)
+
+    __rand__ = __and__
+    __ror__ = __or__
+    __rxor__ = __xor__
+
+    __hash__ = None
+
+    def ite(self, t_branch, f_branch):
+        return build_ite(bit_ite, self, t_branch, f_branch)
+
+    def __bool__(self):
+        raise TypeError('SlicedBit cannot be converted to bool')
+
+    def __repr__(self):
+        return f'SlicedBit({self._value:#x})'
+
+
+class SlicedBitVector(BitBlastedVector):
+    __slots__ = ()
+    _bit_t_ = SlicedBit
+
+    @staticmethod
+    def get_family() -> TypeFamily:
+        return _Family_
+
+
+class SlicedNumVector(SlicedBitVector):
+    __slots__ = ()
+
+
+class SlicedUIntVector(SlicedNumVector):
+    __slots__ = ()
+
+
+class SlicedSIntVector(SlicedNumVector):
+    __slots__ = ()
+
+    __rshift__ = dispatch_oper(BitBlastedVector.bvashr)
+    __rrshift__ = dispatch_roper(__rshift__)
+
+    __floordiv__ = dispatch_oper(BitBlastedVector.bvsdiv)
+    __rfloordiv__ = dispatch_roper(__floordiv__)
+
+    __mod__ = dispatch_oper(BitBlastedVector.bvsrem)
+    __rmod__ = dispatch_roper(__mod__)
+
+    __ge__ = dispatch_oper(BitBlastedVector.bvsge)
+    __gt__ = dispatch_oper(BitBlastedVector.bvsgt)
+    __lt__ = dispatch_oper(BitBlastedVector.bvslt)
+    __le__ = dispatch_oper(BitBlastedVector.bvsle)
+
+    def ext(self, other):
+        return self.sext(other)
+
+
+_Family_ = TypeFamily(SlicedBit, SlicedBitVector, SlicedUIntVector, SlicedSIntVector)
+
+# concrete unsized type <-> sliced unsized type, most specific first
+_SLICED_T = (
+    (SIntVector, SlicedSIntVector),
+    (UIntVector, SlicedUIntVector),
+    (BitVector, SlicedBitVector),
+)
+
+
+def to_sliced(values : tp.Iterable, T : tp.Optional[type] = None):
+    '''
+    Transpose a sequence of concrete values (one per lane) to sliced form.
+    If T is given the values are first converted to T, otherwise they must
+    all be of the same Bit or BitVector[n] type.
+    '''
+    if T is not None:
+        values = [T(v) for v in values]
+    else:
+        values = list(values)
+    if not values:
+        raise ValueError('Cannot slice an empty sequence')
+    T = type(values[0])
+    if not all(type(v) is T for v in values):
+        raise TypeError('values must all have the same type')
+
+    if issubclass(T, Bit):
+        s = ''.join('1' if v else '0' for v in reversed(values))
+        return SlicedBit._from_lanes_(int(s, 2))
+
+    for C, SC in _SLICED_T:
+        if issubclass(T, C):
+            break
+    else:
+        raise TypeError(f'Cannot slice values of type {T}')
+    fmt = f'0{T.size}b'
+    # rows are msb first, lane 0 last so each column reads as a lane int
+    rows = [format(v._value, fmt) for v in reversed(values)]
+    bits = [SlicedBit._from_lanes_(int(''.join(col), 2)) for col in zip(*rows)]
+    bits.reverse()
+    return SC[T.size]._from_bits_(bits)
+
+
+def from_sliced(value, count : int) -> list:
+    '''
+    Transpose the first count lanes of a sliced value to a list of
+    concrete values.
+    '''
+    fmt = f'0{count}b'
+    if isinstance(value, SlicedBit):
+        return [Bit(c == '1') for c in reversed(format(value.lanes(count), fmt))]
+
+    for C, SC in _SLICED_T:
+        if isinstance(value, SC):
+            break
+    else:
+        raise TypeError(f'Cannot unslice {type(value)}')
+    T = C[value.size]
+    cols = [format(b.lanes(count), fmt) for b in reversed(value._bits)]
+    # each row now reads as the msb first binary string of one lane
+    values = [_make(T, int(''.join(row), 2)) for row in zip(*cols)]
+    values.reverse()
+    return values
@@ -1,5 +1,6 @@
 import typing as tp
 from .bit_vector_abc import AbstractBitVector, AbstractBit, TypeFamily, InconsistentSizeError
+from .bit_vector_abc import ArithFlags, MutableBitVectorMixin
 from .bit_vector_util import build_ite
 from .util import Method
 from .compatibility import IntegerTypes, StringTypes
@@ -39,24 +40,48 @@ def bit_cast(fn : tp.Callable[['Bit', 'Bit'], 'Bit']) -> tp.Callable[['Bit', tp.
 
 
 class Bit(AbstractBit):
+    # Bits are immutable so each Bit type holds exactly two instances,
+    # Bit(x) returns the interned one instead of allocating.
+    __slots__ = ('_value',)
+    _interned_ = {}
+
     @staticmethod
     def get_family() -> TypeFamily:
         return _Family_
 
-    def __init__(self, value):
-        if isinstance(value, Bit):
-            self._value = value._value
-        elif isinstance(value, bool):
-            self._value = value
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._interned_ = {}
+
+    def __new__(cls, value):
+        if value is True or value is False:
+            pass
+        elif type(value) is int:
+            if value not in {0, 1}:
+                raise ValueError('Bit must have value 0 or 1 not {}'.format(value))
+            value = bool(value)
+        elif isinstance(value, Bit):
+            value = value._value
         elif isinstance(value, int):
             if value not in {0, 1}:
                 raise ValueError('Bit must have value 0 or 1 not {}'.format(value))
-            self._value = bool(value)
+            value = bool(value)
         elif hasattr(value, '__bool__'):
-            self._value = bool(value)
+            value = bool(value)
         else:
             raise TypeError("Can't coerce {} to Bit".format(type(value)))
 
+        try:
+            return cls._interned_[value]
+        except KeyError:
+            pass
+        bit = super().__new__(cls)
+        bit._value = value
+        return cls._interned_.setdefault(value, bit)
+
+    def __reduce__(self):
+        return type(self), (self._value,)
+
     def __invert__(self):
         return type(self)(not self._value)
 
@@ -132,7 +157,11 @@ class Bit(AbstractBit):
         return cls(random.getrandbits(1))
 
 def _coerce(T : tp.Type['BitVector'], val : tp.Any) -> 'BitVector':
-    if not isinstance(val, BitVector):
+    if type(val) is int:
+        return _make(T, val & T._mask_)
+    elif type(val) is T:
+        return val
+    elif not isinstance(val, BitVector):
         return T(val)
     elif val.size != T.size:
         raise InconsistentSizeError('Inconsistent size')
@@ -147,9 +176,43 @@ def bv_cast(fn : tp.Callable[['BitVector', 'BitVector'], tp.Any]) -> tp.Callable
     return wrapped
 
 
+def _make(T : tp.Type['BitVector'], value : int) -> 'BitVector':
+    # Trusted constructor: value must already be masked to T.size
+    bv = object.__new__(T)
+    bv._value = value
+    return bv
 
+
+# Overhead target for a binary operator on two operands of the same type:
+# three python frames (dispatch, the op, _make) and no temporary objects.
+# tests/test_bv_overhead.py checks the frame budget.
 def dispatch_oper(method: tp.MethodDescriptorType):
+    # method is wrapped by bv_cast, when the operand already has the
+    # same type coercion is a no-op so call the wrapped op directly.
+    fast = getattr(method, '__wrapped__', method)
     def oper(self, other):
+        if type(other) is type(self):
+            return fast(self, other)
+        try:
+            return method(self, other)
+        except InconsistentSizeError as e:
+            raise e from None
+        except TypeError:
+            return NotImplemented
+
+    return Method(oper)
+
+
+def dispatch_oper_by_name(name: str):
+    # dispatches to the method called name of the type of self so
+    # subclasses can override it, the fast path is kept for the methods
+    # of BitVector.
+    base = getattr(BitVector, name)
+    fast = getattr(base, '__wrapped__', base)
+    def oper(self, other):
+        method = getattr(type(self), name)
+        if method is base and type(other) is type(self):
+            return fast(self, other)
         try:
             return method(self, other)
         except InconsistentSizeError as e:
@@ -162,10 +225,11 @@ def dispatch_oper(method: tp.MethodDescriptorType):
 
 # A little inefficient because of double _coerce but whate;er
 def dispatch_roper(method: Method):
+    method = method.m if isinstance(method, Method) else method
     def roper(self, other):
         try:
             other = _coerce(type(self), other)
-        except inconsistentsizeerror as e:
+        except InconsistentSizeError as e:
             raise e from None
         except TypeError:
             return NotImplemented
@@ -175,10 +239,21 @@ def dispatch_roper(method: Method):
 
 
 class BitVector(AbstractBitVector):
+    __slots__ = ('_value',)
+
     @staticmethod
     def get_family() -> TypeFamily:
         return _Family_
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        size = cls._info_[1]
+        if size is not None:
+            cls._mask_ = (1 << size) - 1
+            # Bit of the family (which subclass families may override),
+            # cached for the comparisons
+            cls._bit_t_ = cls.get_family().Bit
+
     def __init__(self, value=0):
         if isinstance(value, BitVector):
             if value.size > self.size:
@@ -201,8 +276,7 @@ class BitVector(AbstractBitVector):
                 warnings.warn('Truncating value {} to {}'.format(value, type(self)), stacklevel=3)
         else:
             raise TypeError('Cannot construct {} from {}'.format(type(self), value))
-        mask = (1 << self.size) - 1
-        self._value = value & mask
+        self._value = value & self._mask_
 
     @classmethod
     def make_constant(cls, value, size=None):
@@ -214,6 +288,9 @@ class BitVector(AbstractBitVector):
     def __hash__(self):
         return hash(f"{type(self)}{self._value}")
 
+    def __reduce__(self):
+        return _make, (type(self), self._value)
+
     def __str__(self):
         return str(int(self))
 
@@ -225,31 +302,58 @@ class BitVector(AbstractBitVector):
         return self._value
 
     def __setitem__(self, index, value):
+        size = self.size
         if isinstance(index, slice):
-            raise NotImplementedError()
+            start, stop, step = index.indices(size)
+            positions = range(start, stop, step)
+            width = len(positions)
+            value = _coerce(type(self).unsized_t[width], value)._value
+            if step == 1:
+                mask = ((1 << width) - 1) << start
+                self._value = (self._value & ~mask) | (value << start)
+            else:
+                v = self._value
+                for k, i in enumerate(positions):
+                    v = (v & ~(1 << i)) | (((value >> k) & 1) << i)
+                self._value = v
         else:
             if not (isinstance(value, bool) or isinstance(value, Bit) or (isinstance(value, int) and value in {0, 1})):
                 raise ValueError("Second argument __setitem__ on a single BitVector index should be a boolean or 0 or 1, not {value}".format(value=value))
 
             if index < 0:
-                index = self.size+index
+                index = size+index
 
-            if not (0 <= index < self.size):
+            if not (0 <= index < size):
                 raise IndexError()
 
-            mask = type(self)(1 << index)
-            self._value = Bit(value).ite(self | mask,  self & ~mask)._value
+            if value:
+                self._value |= 1 << index
+            else:
+                self._value &= ~(1 << index)
+
+    def _assign_(self, other):
+        self._value = other._value
 
     def __getitem__(self, index : tp.Union[int, slice]) -> tp.Union['BitVector', Bit]:
         if isinstance(index, slice):
-            v = self.bits()[index]
-            return type(self).unsized_t[len(v)](v)
+            size = self.size
+            start, stop, step = index.indices(size)
+            if step == 1:
+                width = max(stop - start, 0)
+                value = (self._value >> start) & ((1 << width) - 1)
+            else:
+                # Strided slices are resolved on the binary string (lsb
+                # first) so the per bit work happens in C
+                bits = self.binary_string()[::-1][index]
+                width = len(bits)
+                value = int(bits[::-1], 2) if width else 0
+            return _make(type(self).unsized_t[width], value)
         elif isinstance(index, int):
             if index < 0:
                 index = self.size+index
             if not (0 <= index < self.size):
                 raise IndexError()
-            return Bit((self._value >> index) & 1)
+            return self._bit_t_((self._value >> index) & 1)
         else:
             raise TypeError()
 
@@ -264,79 +368,99 @@ class BitVector(AbstractBitVector):
         T = type(self).unsized_t
         if not isinstance(other, T):
             raise TypeError(f'value must of type {T}')
-        return T[self.size+other.size](self.value | (other.value << self.size))
+        return _make(T[self.size+other.size], self._value | (other._value << self.size))
 
     def bvnot(self):
-        return type(self)(~self.as_uint())
+        return _make(type(self), ~self._value & self._mask_)
 
     @bv_cast
     def bvand(self, other):
-        return type(self)(self.as_uint() & other.as_uint())
+        return _make(type(self), self._value & other._value)
 
     @bv_cast
     def bvor(self, other):
-        return type(self)(self.as_uint() | other.as_uint())
+        return _make(type(self), self._value | other._value)
 
     @bv_cast
     def bvxor(self, other):
-        return type(self)(self.as_uint() ^ other.as_uint())
+        return _make(type(self), self._value ^ other._value)
 
     @bv_cast
     def bvshl(self, other):
-        return type(self)(self.as_uint() << other.as_uint())
+        shift = other._value
+        # self._mask_.bit_length() is self.size without the property lookup
+        if shift >= self._mask_.bit_length():
+            return _make(type(self), 0)
+        return _make(type(self), (self._value << shift) & self._mask_)
 
     @bv_cast
     def bvlshr(self, other):
-        return type(self)(self.as_uint() >> other.as_uint())
+        return _make(type(self), self._value >> other._value)
 
     @bv_cast
     def bvashr(self, other):
-        return type(self)(self.as_sint() >> other.as_uint())
+        return _make(type(self), (self.as_sint() >> other._value) & self._mask_)
 
     @bv_cast
     def bvrol(self, other):
-        other = (len(self) - other.as_uint()) % len(self)
-        return self[other:].concat(self[:other])
+        size = self.size
+        shift = other._value % size
+        value = self._value
+        return _make(type(self), ((value << shift) | (value >> (size - shift))) & self._mask_)
 
     @bv_cast
     def bvror(self, other):
-        other = other.as_uint() % len(self)
-        return self[other:].concat(self[:other])
+        size = self.size
+        shift = other._value % size
+        value = self._value
+        return _make(type(self), ((value >> shift) | (value << (size - shift))) & self._mask_)
 
     @bv_cast
     def bvcomp(self, other):
-        return type(self).unsized_t[1](self.as_uint() == other.as_uint())
+        return _make(type(self).unsized_t[1], int(self._value == other._value))
 
     @bv_cast
     def bveq(self, other):
-        return self.get_family().Bit(self.as_uint() == other.as_uint())
+        return self._bit_t_(self._value == other._value)
 
     @bv_cast
     def bvne(self, other):
-        return self.get_family().Bit(self.as_uint() != other.as_uint())
+        return self._bit_t_(self._value != other._value)
 
     @bv_cast
     def bvuge(self, other):
-        return self.get_family().Bit(self.as_uint() >= other.as_uint())
+        return self._bit_t_(self._value >= other._value)
 
     @bv_cast
     def bvugt(self, other):
-        return self.get_family().Bit(self.as_uint() > other.as_uint())
+        return self._bit_t_(self._value > other._value)
 
     @bv_cast
     def bvule(self, other):
-        return self.get_family().Bit(self.as_uint() <= other.as_uint())
+        return self._bit_t_(self._value <= other._value)
 
     @bv_cast
     def bvult(self, other):
-        return self.get_family().Bit(self.as_uint() < other.as_uint())
+        return self._bit_t_(self._value < other._value)
 
     @bv_cast
     def bvslt(self, other):
-        return self.get_family().Bit(self.as_sint() < other.as_sint())
+        return self._bit_t_(self.as_sint() < other.as_sint())
+
+    @bv_cast
+    def bvsle(self, other):
+        return self._bit_t_(self.as_sint() <= other.as_sint())
+
+    @bv_cast
+    def bvsgt(self, other):
+        return self._bit_t_(self.as_sint() > other.as_sint())
+
+    @bv_cast
+    def bvsge(self, other):
+        return self._bit_t_(self.as_sint() >= other.as_sint())
 
     def bvneg(self):
-        return type(self)(~self.as_uint() + 1)
+        return _make(type(self), -self._value & self._mask_)
 
     def adc(self, other : 'BitVector', carry : Bit) -> tp.Tuple['BitVector', Bit]:
         """
@@ -356,48 +480,74 @@ class BitVector(AbstractBitVector):
         res = a + b + c
         return res[0:-1], res[-1]
 
+    def add_with_flags(self, other, carry=0) -> ArithFlags:
+        T = type(self)
+        other = _coerce(T, other)
+        carry = _coerce(T.unsized_t[1], carry)
+        return T._flags_(self._value, other._value, carry._value)
+
+    def sub_with_flags(self, other, carry=1) -> ArithFlags:
+        T = type(self)
+        other = _coerce(T, other)
+        carry = _coerce(T.unsized_t[1], carry)
+        return T._flags_(self._value, ~other._value & T._mask_, carry._value)
+
+    @classmethod
+    def _flags_(cls, a : int, b : int, c : int) -> ArithFlags:
+        mask = cls._mask_
+        msb = (mask >> 1) + 1
+        total = a + b + c
+        res = total & mask
+        return ArithFlags(
+            _make(cls, res),
+            cls._bit_t_(total > mask),
+            cls._bit_t_((a ^ res) & (b ^ res) & msb != 0),
+            cls._bit_t_(res == 0),
+            cls._bit_t_(res & msb != 0),
+        )
+
     def ite(self, t_branch, f_branch):
         return self.bvne(0).ite(t_branch, f_branch)
 
     @bv_cast
     def bvadd(self, other):
-        return type(self)(self.as_uint() + other.as_uint())
+        return _make(type(self), (self._value + other._value) & self._mask_)
 
     @bv_cast
     def bvsub(self, other):
-        return type(self)(self.as_uint() - other.as_uint())
+        return _make(type(self), (self._value - other._value) & self._mask_)
 
     @bv_cast
     def bvmul(self, other):
-        return type(self)(self.as_uint() * other.as_uint())
+        return _make(type(self), (self._value * other._value) & self._mask_)
 
     @bv_cast
     def bvudiv(self, other):
-        other = other.as_uint()
+        other = other._value
         if other == 0:
-            return type(self)((1 << self.size) - 1)
-        return type(self)(self.as_uint() // other)
+            return _make(type(self), self._mask_)
+        return _make(type(self), self._value // other)
 
     @bv_cast
     def bvurem(self, other):
-        other = other.as_uint()
+        other = other._value
         if other == 0:
             return self
-        return type(self)(self.as_uint() % other)
+        return _make(type(self), self._value % other)
 
     @bv_cast
     def bvsdiv(self, other):
         other = other.as_sint()
         if other == 0:
-            return type(self)((1 << self.size) - 1)
-        return type(self)(self.as_sint() // other)
+            return _make(type(self), self._mask_)
+        return _make(type(self), (self.as_sint() // other) & self._mask_)
 
     @bv_cast
     def bvsrem(self, other):
         other = other.as_sint()
         if other == 0:
             return self
-        return type(self)(self.as_sint() % other)
+        return _make(type(self), (self.as_sint() % other) & self._mask_)
 
     def __invert__(self): return self.bvnot()
 
@@ -414,7 +564,7 @@ class BitVector(AbstractBitVector):
     __rlshift__ = dispatch_roper(__lshift__)
 
     __rshift__ = dispatch_oper(bvlshr)
-    __rrshift__ = dispatch_oper(__rshift__)
+    __rrshift__ = dispatch_roper(__rshift__)
 
     def __neg__(self): return self.bvneg()
 
@@ -445,8 +595,9 @@ class BitVector(AbstractBitVector):
 
     def as_sint(self):
         value = self._value
-        if self[-1]:
-            value = value - (1 << self.size)
+        mask = self._mask_
+        if value > (mask >> 1):
+            value = value - mask - 1
         return value
 
     as_int = as_sint
@@ -458,7 +609,10 @@ class BitVector(AbstractBitVector):
         return bool(int(self))
 
     def binary_string(self):
-        return "".join(str(int(i)) for i in reversed(self.bits()))
+        size = self.size
+        if size == 0:
+            return ''
+        return format(self._value, f'0{size}b')
 
     def as_binary_string(self):
         return "0b" + self.binary_string()
@@ -474,15 +628,24 @@ class BitVector(AbstractBitVector):
         if r <= 0:
             raise ValueError()
 
-        return type(self).unsized_t[r * self.size](r * self.bits())
+        size = self.size
+        T = type(self).unsized_t[r * size]
+        if size == 0:
+            return _make(T, 0)
+        # multiplying by the repunit 0..01 0..01 ... 0..01 places r copies
+        repunit = ((1 << (r * size)) - 1) // self._mask_
+        return _make(T, self._value * repunit)
 
     def sext(self, ext):
         ext = int(ext)
         if ext < 0:
             raise ValueError()
 
-        T = type(self).unsized_t
-        return self.concat(T[1](self[-1]).repeat(ext))
+        size = self.size
+        value = self._value
+        if size and value >> (size - 1):
+            value |= ((1 << ext) - 1) << size
+        return _make(type(self).unsized_t[size + ext], value)
 
     def ext(self, ext):
         return self.zext(ext)
@@ -492,8 +655,38 @@ class BitVector(AbstractBitVector):
         if ext < 0:
             raise ValueError()
 
-        T = type(self).unsized_t
-        return self.concat(T[ext](0))
+        return _make(type(self).unsized_t[self.size + ext], self._value)
+
+    def popcount(self):
+        return _make(type(self), bin(self._value).count('1'))
+
+    def clz(self):
+        return _make(type(self), self.size - self._value.bit_length())
+
+    def ctz(self):
+        value = self._value
+        if value == 0:
+            return _make(type(self), self.size)
+        return _make(type(self), (value & -value).bit_length() - 1)
+
+    def ffs(self):
+        value = self._value
+        return _make(type(self), (value & -value).bit_length())
+
+    def reverse(self):
+        size = self.size
+        if size == 0:
+            return self
+        return _make(type(self), int(format(self._value, f'0{size}b')[::-1], 2))
+
+    def reduce_and(self):
+        return self._bit_t_(self._value == self._mask_)
+
+    def reduce_or(self):
+        return self._bit_t_(self._value != 0)
+
+    def reduce_xor(self):
+        return self._bit_t_(bin(self._value).count('1') & 1)
 
     @staticmethod
     def random(width):
@@ -501,10 +694,12 @@ class BitVector(AbstractBitVector):
 
 
 class NumVector(BitVector):
+    __slots__ = ()
     __hash__ = BitVector.__hash__
 
 
 class UIntVector(NumVector):
+    __slots__ = ()
     __hash__ = NumVector.__hash__
 
     @staticmethod
@@ -513,80 +708,72 @@ class UIntVector(NumVector):
 
 
 class SIntVector(NumVector):
+    __slots__ = ()
     __hash__ = NumVector.__hash__
 
     def __int__(self):
         return self.as_sint()
 
-    def __rshift__(self, other):
-        try:
-            return self.bvashr(other)
-        except InconsistentSizeError as e:
-            raise e from None
-        except TypeError:
-            return NotImplemented
-
+    __rshift__ = dispatch_oper_by_name('bvashr')
     __rrshift__ = dispatch_roper(__rshift__)
 
-    def __floordiv__(self, other):
-        try:
-            return self.bvsdiv(other)
-        except InconsistentSizeError as e:
-            raise e from None
-        except TypeError:
-            return NotImplemented
-
+    __floordiv__ = dispatch_oper_by_name('bvsdiv')
     __rfloordiv__ = dispatch_roper(__floordiv__)
 
-    def __mod__(self, other):
-        try:
-            return self.bvsrem(other)
-        except InconsistentSizeError as e:
-            raise e from None
-        except TypeError:
-            return NotImplemented
-
+    __mod__ = dispatch_oper_by_name('bvsrem')
     __rmod__ = dispatch_roper(__mod__)
 
-    def __ge__(self, other):
-        try:
-            return self.bvsge(other)
-        except InconsistentSizeError as e:
-            raise e from None
-        except TypeError:
-            return NotImplemented
+    __ge__ = dispatch_oper_by_name('bvsge')
+    __gt__ = dispatch_oper_by_name('bvsgt')
+    __lt__ = dispatch_oper_by_name('bvslt')
+    __le__ = dispatch_oper_by_name('bvsle')
 
-    def __gt__(self, other):
-        try:
-            return self.bvsgt(other)
-        except InconsistentSizeError as e:
-            raise e from None
-        except TypeError:
-            return NotImplemented
+    @staticmethod
+    def random(width):
+        w = width - 1
+        return SIntVector[width](random.randint(-(1 << w), (1 << w) - 1))
 
-    def __lt__(self, other):
-        try:
-            return self.bvslt(other)
-        except InconsistentSizeError as e:
-            raise e from None
-        except TypeError:
-            return NotImplemented
+    def ext(self, other):
+        return self.sext(other)
 
-    def __le__(self, other):
+def _inplace(fn):
+    def iop(self, other):
         try:
-            return self.bvsle(other)
+            other = _coerce(type(self), other)
         except InconsistentSizeError as e:
             raise e from None
         except TypeError:
             return NotImplemented
+        self._value = fn(self._value, other._value, self._mask_)
+        return self
+    return iop
 
-    @staticmethod
-    def random(width):
-        w = width - 1
-        return SIntVector[width](random.randint(-(1 << w), (1 << w) - 1))
 
-    def ext(self, other):
-        return self.sext(other)
+def _shl(a, b, mask):
+    if b >= mask.bit_length():
+        return 0
+    return (a << b) & mask
+
+
+class MutableBitVector(MutableBitVectorMixin, BitVector):
+    '''
+    BitVector whose value can be updated in place:
+
+        acc = MutableBitVector[16](0)
+        acc += x        # no new object
+        acc[4:8] = 0xf
+    '''
+    __slots__ = ()
+
+    __iadd__ = _inplace(lambda a, b, mask: (a + b) & mask)
+    __isub__ = _inplace(lambda a, b, mask: (a - b) & mask)
+    __imul__ = _inplace(lambda a, b, mask: (a * b) & mask)
+    __iand__ = _inplace(lambda a, b, mask: a & b)
+    __ior__ = _inplace(lambda a, b, mask: a | b)
+    __ixor__ = _inplace(lambda a, b, mask: a ^ b)
+    __ilshift__ = _inplace(_shl)
+    __irshift__ = _inplace(lambda a, b, mask: a >> b)
+
 
 def overflow(a, b, res):
     msb_a = a[-1]
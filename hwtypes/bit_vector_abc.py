@@ -1,14 +1,19 @@
 from abc import ABCMeta, abstractmethod
 from collections import namedtuple
+import copyreg
+import operator
 import typing as tp
 import functools as ft
 import weakref
 import warnings
 
-from .util import _issubclass
+from .util import _issubclass, _reduce_type
 
 TypeFamily = namedtuple('TypeFamily', ['Bit', 'BitVector', 'Unsigned', 'Signed'])
 
+# Result of add_with_flags / sub_with_flags
+ArithFlags = namedtuple('ArithFlags', ['result', 'carry', 'overflow', 'zero', 'negative'])
+
 # Should be raised when bv[k].op(bv[j]) and j != k
 
 class InconsistentSizeError(TypeError): pass
@@ -71,6 +76,14 @@ class AbstractBitVectorMeta(type): #:(ABCMeta):
 
         return t
 
+    def __init_subclass__(mcs, **kwargs):
+        super().__init_subclass__(**kwargs)
+        copyreg.pickle(mcs, _reduce_type)
+
+    def _pickle_reduce_(cls):
+        if cls.is_sized and cls._info_[0] is not None:
+            return operator.getitem, (cls.unsized_t, cls.size)
+        return cls.__qualname__
 
     def __getitem__(cls, idx : int) -> 'AbstractBitVectorMeta':
         mcs = type(cls)
@@ -91,7 +104,7 @@ class AbstractBitVectorMeta(type): #:(ABCMeta):
         bases.extend(b[idx] for b in cls.__bases__ if isinstance(b, mcs))
         bases = tuple(bases)
         class_name = '{}[{}]'.format(cls.__name__, idx)
-        t = mcs(class_name, bases, {}, info=(cls,idx))
+        t = mcs(class_name, bases, {'__slots__' : ()}, info=(cls,idx))
         t.__module__ = cls.__module__
         mcs._class_cache[cls, idx] = t
         return t
@@ -121,8 +134,11 @@ class AbstractBitVectorMeta(type): #:(ABCMeta):
     def __repr__(cls):
         return cls.__name__
 
+copyreg.pickle(AbstractBitVectorMeta, _reduce_type)
 
 class AbstractBit(metaclass=ABCMeta):
+    __slots__ = ()
+
     @staticmethod
     def get_family() -> TypeFamily:
         return _Family_
@@ -155,6 +171,8 @@ class AbstractBit(metaclass=ABCMeta):
         pass
 
 class AbstractBitVector(metaclass=AbstractBitVectorMeta):
+    __slots__ = ()
+
     @staticmethod
     def get_family() -> TypeFamily:
         return _Family_
@@ -322,6 +340,181 @@ class AbstractBitVector(metaclass=AbstractBitVectorMeta):
     def zext(self, other) -> 'AbstractBitVector':
         pass
 
+    # Arithmetic with flags.  The flags are all derived from the single
+    # widened sum self.zext(1) + other.zext(1) + carry so symbolic families
+    # share the adder term between them.
+
+    def add_with_flags(self, other, carry=0) -> ArithFlags:
+        '''
+        self + other + carry, returns ArithFlags(result, carry, overflow,
+        zero, negative) where carry is the unsigned carry out and overflow
+        the signed overflow
+        '''
+        T = type(self)
+        size = self.size
+        if not isinstance(other, AbstractBitVector):
+            other = self.make_constant(other)
+        carry = T.unsized_t[1](carry)
+
+        total = self.zext(1).bvadd(other.zext(1)).bvadd(carry.zext(size))
+        result = total[:size]
+        negative = result[size - 1]
+        overflow = (self[size - 1] ^ negative) & (other[size - 1] ^ negative)
+        zero = result.bveq(self.make_constant(0))
+        return ArithFlags(result, total[size], overflow, zero, negative)
+
+    def sub_with_flags(self, other, carry=1) -> ArithFlags:
+        '''
+        self - other - (1 - carry) computed as self + ~other + carry.  As
+        on ARM the carry is an inverted borrow: it is 1 (no borrow) for a
+        plain subtraction and the carry out is 0 iff self < other unsigned.
+        '''
+        if not isinstance(other, AbstractBitVector):
+            other = self.make_constant(other)
+        return self.add_with_flags(other.bvnot(), carry)
+
+    def uadd_sat(self, other) -> 'AbstractBitVector':
+        flags = self.add_with_flags(other)
+        ones = self.make_constant((1 << self.size) - 1)
+        return flags.carry.ite(ones, flags.result)
+
+    def usub_sat(self, other) -> 'AbstractBitVector':
+        flags = self.sub_with_flags(other)
+        return flags.carry.ite(flags.result, self.make_constant(0))
+
+    def _signed_sat(self, flags) -> 'AbstractBitVector':
+        # on overflow the sign of the result is the inverse of the true sign
+        smin = self.make_constant(1 << (self.size - 1))
+        smax = self.make_constant((1 << (self.size - 1)) - 1)
+        return flags.overflow.ite(flags.negative.ite(smax, smin), flags.result)
+
+    def sadd_sat(self, other) -> 'AbstractBitVector':
+        return self._signed_sat(self.add_with_flags(other))
+
+    def ssub_sat(self, other) -> 'AbstractBitVector':
+        return self._signed_sat(self.sub_with_flags(other))
+
+    # Bit counting and reductions.  The default implementations only use the
+    # bitwise, shift and add ops of the family and have logarithmic depth
+    # in the size, families may override them with native implementations.
+    # Counts are returned as bit vectors of the same size.
+
+    def popcount(self) -> 'AbstractBitVector':
+        size = self.size
+        x = self
+        width = 1
+        while width < size:
+            # add adjacent groups of width bits
+            mask = self.make_constant(_group_mask(size, width))
+            shift = self.make_constant(width)
+            x = x.bvand(mask).bvadd(x.bvlshr(shift).bvand(mask))
+            width *= 2
+        return x
+
+    def clz(self) -> 'AbstractBitVector':
+        # smear the msb set to the right, the leading zeros are the zeros left
+        size = self.size
+        x = self
+        shift = 1
+        while shift < size:
+            x = x.bvor(x.bvlshr(self.make_constant(shift)))
+            shift *= 2
+        return x.bvnot().popcount()
+
+    def ctz(self) -> 'AbstractBitVector':
+        one = self.make_constant(1)
+        return self.bvnot().bvand(self.bvsub(one)).popcount()
+
+    def ffs(self) -> 'AbstractBitVector':
+        '''
+        1 + the index of the least significant bit set, 0 if no bit is set
+        '''
+        zero = self.make_constant(0)
+        one = self.make_constant(1)
+        return self.bveq(zero).ite(zero, self.ctz().bvadd(one))
+
+    def reverse(self) -> 'AbstractBitVector':
+        # concat the reversed halves, swapped, as a balanced tree
+        def _reverse(lo, hi):
+            if hi - lo == 1:
+                return self[lo:hi]
+            mid = (lo + hi) // 2
+            return _reverse(mid, hi).concat(_reverse(lo, mid))
+        return _reverse(0, self.size)
+
+    def reduce_and(self) -> AbstractBit:
+        return self.bveq(self.make_constant((1 << self.size) - 1))
+
+    def reduce_or(self) -> AbstractBit:
+        return self.bvne(self.make_constant(0))
+
+    def reduce_xor(self) -> AbstractBit:
+        size = self.size
+        x = self
+        shift = 1
+        while shift < size:
+            x = x.bvxor(x.bvlshr(self.make_constant(shift)))
+            shift *= 2
+        return x[0]
+
 BitVectorMeta = AbstractBitVectorMeta
 
+
+def _inplace(op):
+    def iop(self, other):
+        self._assign_(op(self, other))
+        return self
+    iop.__name__ = f'__i{op.__name__.strip("_")}__'
+    return iop
+
+
+class MutableBitVectorMixin:
+    '''
+    Mixin for bit vector types whose values can be updated in place, i.e.
+    acc += x and reg[i:j] = v update acc / reg instead of rebinding the
+    name to a new object.  Mutable values are not hashable.
+
+    Families mix it into a bit vector type (e.g. MutableBitVector) which
+    must provide _assign_(other) setting the value of self to the value of
+    other (of the same family and size), and may override the in place ops
+    with implementations which don't allocate.
+    '''
+    __slots__ = ()
+    __hash__ = None
+
+    def assign(self, value) -> None:
+        '''
+        Set the value of self, value is coerced as by the constructor
+        '''
+        self._assign_(type(self)(value))
+
+    def copy(self):
+        return type(self)(self)
+
+    def freeze(self) -> AbstractBitVector:
+        '''
+        Immutable (hashable) copy of self
+        '''
+        return type(self).get_family().BitVector[self.size](self)
+
+    __iadd__ = _inplace(operator.add)
+    __isub__ = _inplace(operator.sub)
+    __imul__ = _inplace(operator.mul)
+    __ifloordiv__ = _inplace(operator.floordiv)
+    __imod__ = _inplace(operator.mod)
+    __iand__ = _inplace(operator.and_)
+    __ior__ = _inplace(operator.or_)
+    __ixor__ = _inplace(operator.xor)
+    __ilshift__ = _inplace(operator.lshift)
+    __irshift__ = _inplace(operator.rshift)
+
+
+def _group_mask(size : int, width : int) -> int:
+    # the low width bits of every group of 2*width bits
+    group = (1 << width) - 1
+    mask = 0
+    for i in range(0, size, 2 * width):
+        mask |= group << i
+    return mask & ((1 << size) - 1)
+
 _Family_ = TypeFamily(AbstractBit, AbstractBitVector, None, None)
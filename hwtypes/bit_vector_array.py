@@ -0,0 +1,843 @@
+'''
+Batched concrete bit vectors backed by numpy.
+
+A BitVectorArray[n] holds a whole batch of n bit values and implements the
+same SMT-LIB semantics as BitVector[n] lane by lane, so family generic code
+written against a TypeFamily runs over every sample of the batch in a single
+call.
+
+Layout:
+    n <= 64 : one uint64 lane per value, the array has the batch shape
+    n >  64 : little endian uint64 words, the array has shape batch + (words,)
+
+Scalars (python ints, Bit, BitVector) are stored as a batch of one and
+broadcast against the other operand.  Note that unlike BitVector a sequence
+passed to the constructor is treated as a batch of values not as a list of
+bits.
+'''
+import typing as tp
+import functools as ft
+import warnings
+
+from .bit_vector_abc import AbstractBitVector, AbstractBit, TypeFamily, InconsistentSizeError
+from .bit_vector_util import build_ite
+from .bit_vector import Bit, BitVector, UIntVector, SIntVector
+from .compatibility import IntegerTypes
+from .util import Method
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__all__ = ['BitArray', 'BitVectorArray', 'NumVectorArray']
+__all__ += ['UIntVectorArray', 'SIntVectorArray']
+
+_WORD_SIZE = 64
+_WORD_MASK = (1 << _WORD_SIZE) - 1
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError('BitVectorArray requires numpy')
+
+
+def _as_batch(arr):
+    # scalars are stored as a batch of one so that ops between two constants
+    # never hit numpy scalar arithmetic (which warns on wrap around)
+    if arr.ndim == 0:
+        return arr.reshape(1)
+    return arr
+
+
+def bit_cast(fn):
+    @ft.wraps(fn)
+    def wrapped(self, other):
+        if isinstance(other, BitArray):
+            return fn(self, other)
+        else:
+            try:
+                other = BitArray(other)
+            except TypeError:
+                return NotImplemented
+            return fn(self, other)
+    return wrapped
+
+
+class BitArray(AbstractBit):
+    @staticmethod
+    def get_family() -> TypeFamily:
+        return _Family_
+
+    def __init__(self, value):
+        _require_numpy()
+        if isinstance(value, BitArray):
+            self._value = value._value
+        elif isinstance(value, np.ndarray):
+            if value.dtype.kind not in 'biu':
+                raise TypeError(f"Can't coerce array of {value.dtype} to BitArray")
+            self._value = _as_batch(value.astype(bool))
+        elif isinstance(value, (bool, IntegerTypes, Bit)):
+            if isinstance(value, IntegerTypes) and value not in {0, 1}:
+                raise ValueError('Bit must have value 0 or 1 not {}'.format(value))
+            self._value = np.array([bool(value)])
+        elif isinstance(value, tp.Sequence):
+            self._value = _as_batch(np.array([bool(v) for v in value], dtype=bool))
+        elif hasattr(value, '__bool__'):
+            self._value = np.array([bool(value)])
+        else:
+            raise TypeError("Can't coerce {} to BitArray".format(type(value)))
+
+    @classmethod
+    def _from_array_(cls, arr):
+        obj = cls.__new__(cls)
+        obj._value = arr
+        return obj
+
+    def __invert__(self):
+        return type(self)._from_array_(~self._value)
+
+    @bit_cast
+    def __eq__(self, other):
+        return type(self)._from_array_(self._value == other._value)
+
+    @bit_cast
+    def __ne__(self, other):
+        return type(self)._from_array_(self._value != other._value)
+
+    @bit_cast
+    def __and__(self, other):
+        return type(self)._from_array_(self._value & other._value)
+
+    @bit_cast
+    def __rand__(self, other):
+        return type(self)._from_array_(other._value & self._value)
+
+    @bit_cast
+    def __or__(self, other):
+        return type(self)._from_array_(self._value | other._value)
+
+    @bit_cast
+    def __ror__(self, other):
+        return type(self)._from_array_(other._value | self._value)
+
+    @bit_cast
+    def __xor__(self, other):
+        return type(self)._from_array_(self._value ^ other._value)
+
+    @bit_cast
+    def __rxor__(self, other):
+        return type(self)._from_array_(other._value ^ self._value)
+
+    __hash__ = None
+
+    def ite(self, t_branch, f_branch):
+        def _ite(select, t_branch, f_branch):
+            return t_branch._where_(select._value, f_branch)
+
+        return build_ite(_ite, self, t_branch, f_branch)
+
+    def _where_(self, select, other):
+        return type(self)._from_array_(np.where(select, self._value, other._value))
+
+    @property
+    def value(self):
+        return self._value
+
+    @property
+    def batch_shape(self):
+        return self._value.shape
+
+    def __bool__(self) -> bool:
+        if self._value.size != 1:
+            raise TypeError('BitArray with more than one element cannot be converted to bool')
+        return bool(self._value.item())
+
+    def __int__(self) -> int:
+        return int(bool(self))
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self._value.tolist()})'
+
+    def to_list(self) -> tp.List[Bit]:
+        return [Bit(v) for v in self._value.ravel().tolist()]
+
+
+def _coerce(T : tp.Type['BitVectorArray'], val : tp.Any) -> 'BitVectorArray':
+    if not isinstance(val, BitVectorArray):
+        return T(val)
+    elif val.size != T.size:
+        raise InconsistentSizeError('Inconsistent size')
+    else:
+        return val
+
+
+def bv_cast(fn : tp.Callable[['BitVectorArray', 'BitVectorArray'], tp.Any]) -> tp.Callable[['BitVectorArray', tp.Any], tp.Any]:
+    @ft.wraps(fn)
+    def wrapped(self : 'BitVectorArray', other : tp.Any) -> tp.Any:
+        other = _coerce(type(self), other)
+        return fn(self, other)
+    return wrapped
+
+
+def dispatch_oper(method: tp.MethodDescriptorType):
+    def oper(self, other):
+        try:
+            return method(self, other)
+        except InconsistentSizeError as e:
+            raise e from None
+        except TypeError:
+            return NotImplemented
+
+    return Method(oper)
+
+
+def dispatch_roper(method: Method):
+    def roper(self, other):
+        try:
+            other = _coerce(type(self), other)
+        except InconsistentSizeError as e:
+            raise e from None
+        except TypeError:
+            return NotImplemented
+        return method(other, self)
+
+    return Method(roper)
+
+
+class BitVectorArray(AbstractBitVector):
+    # concrete type of a single lane, used by to_list
+    _scalar_t_ = BitVector
+
+    @staticmethod
+    def get_family() -> TypeFamily:
+        return _Family_
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        size = cls._info_[1]
+        if size is not None:
+            cls._mask_ = (1 << size) - 1
+            cls._words_ = max((size + _WORD_SIZE - 1) // _WORD_SIZE, 1)
+            cls._wide_ = size > _WORD_SIZE
+
+    def __init__(self, value=0):
+        _require_numpy()
+        T = type(self)
+        if isinstance(value, BitVectorArray):
+            if value.size == self.size:
+                self._value = value._value
+                return
+            elif value.size > self.size:
+                warnings.warn('Truncating value from {} to {}'.format(type(value), type(self)), stacklevel=3)
+            self._value = T._from_obj_(value._to_obj_())._value
+        elif isinstance(value, BitArray):
+            self._value = T._from_obj_(value._value.astype(object))._value
+        elif isinstance(value, np.ndarray):
+            self._value = T._from_ndarray_(value)
+        elif isinstance(value, (Bit, BitVector)):
+            self._value = T._from_ints_([int(value)])._value
+        elif isinstance(value, IntegerTypes):
+            self._value = T._from_ints_([value])._value
+        elif isinstance(value, tp.Sequence):
+            self._value = T._from_ints_([int(v) for v in value])._value
+        elif hasattr(value, '__int__'):
+            self._value = T._from_ints_([int(value)])._value
+        else:
+            raise TypeError('Cannot construct {} from {}'.format(type(self), value))
+
+    @classmethod
+    def _from_words_(cls, arr):
+        # trusted constructor, arr must already be in the layout of cls
+        obj = cls.__new__(cls)
+        obj._value = arr
+        return obj
+
+    @classmethod
+    def _from_obj_(cls, obj):
+        # obj is an object array of python ints
+        obj = _as_batch(np.asarray(obj, dtype=object)) & cls._mask_
+        if not cls._wide_:
+            return cls._from_words_(obj.astype(np.uint64))
+        words = [((obj >> (_WORD_SIZE * k)) & _WORD_MASK).astype(np.uint64)
+                 for k in range(cls._words_)]
+        return cls._from_words_(np.stack(words, axis=-1))
+
+    @classmethod
+    def _from_ints_(cls, ints):
+        obj = np.empty(len(ints), dtype=object)
+        obj[:] = ints
+        return cls._from_obj_(obj)
+
+    @classmethod
+    def _from_ndarray_(cls, value):
+        kind = value.dtype.kind
+        if kind == 'O':
+            return cls._from_obj_(value)._value
+        elif kind not in 'biu':
+            raise TypeError('Cannot construct {} from array of {}'.format(cls, value.dtype))
+        value = _as_batch(value)
+        low = value.astype(np.uint64)
+        if not cls._wide_:
+            return low & np.uint64(cls._mask_)
+        high = np.where(value < 0, np.uint64(_WORD_MASK), np.uint64(0)) if kind == 'i' else np.zeros_like(low)
+        words = [low] + [high] * (cls._words_ - 1)
+        return np.stack(words, axis=-1) & cls._word_mask_()
+
+    @classmethod
+    def _word_mask_(cls):
+        mask = cls._mask_
+        return np.array([(mask >> (_WORD_SIZE * k)) & _WORD_MASK for k in range(cls._words_)], dtype=np.uint64)
+
+    def _to_obj_(self):
+        if not self._wide_:
+            return self._value.astype(object)
+        acc = self._value[..., 0].astype(object)
+        for k in range(1, self._words_):
+            acc = acc | (self._value[..., k].astype(object) << (_WORD_SIZE * k))
+        return acc
+
+    def _to_sobj_(self):
+        obj = self._to_obj_()
+        n = self.size
+        return np.where(obj >> (n - 1), obj - (1 << n), obj)
+
+    def _as_int64_(self):
+        # signed view of a narrow vector
+        n = self.size
+        if n == _WORD_SIZE:
+            return self._value.view(np.int64)
+        sign = 1 << (n - 1)
+        return (self._value ^ np.uint64(sign)).astype(np.int64) - sign
+
+    def _new_(self, arr):
+        return type(self)._from_words_(arr)
+
+    def _obj_op_(self, fn, *args):
+        return type(self)._from_obj_(fn(*args))
+
+    @classmethod
+    def make_constant(cls, value, size=None):
+        if size is None:
+            return cls(value)
+        else:
+            return cls.unsized_t[size](value)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self._to_obj_().tolist()})'
+
+    @property
+    def value(self):
+        return self._value
+
+    @property
+    def batch_shape(self):
+        if self._wide_:
+            return self._value.shape[:-1]
+        return self._value.shape
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            positions = range(*index.indices(self.size))
+            width = len(positions)
+            value = _coerce(type(self).unsized_t[width], value)
+            if not width:
+                return
+            start = positions.start
+            if positions.step == 1 and not self._wide_:
+                mask = np.uint64(((1 << width) - 1) << start)
+                self._value = (self._value & ~mask) | (value._value << np.uint64(start))
+                return
+            obj = self._to_obj_()
+            v = value._to_obj_()
+            if positions.step == 1:
+                mask = ((1 << width) - 1) << start
+                obj = (obj & ~mask) | (v << start)
+            else:
+                for k, i in enumerate(positions):
+                    obj = (obj & ~(1 << i)) | (((v >> k) & 1) << i)
+            self._value = type(self)._from_obj_(obj)._value
+            return
+        if index < 0:
+            index = self.size+index
+        if not (0 <= index < self.size):
+            raise IndexError()
+        value = BitArray(value)
+        mask = type(self)(1 << index)
+        self._value = value.ite(self | mask, self & ~mask)._value
+
+    def __getitem__(self, index : tp.Union[int, slice]) -> tp.Union['BitVectorArray', BitArray]:
+        size = self.size
+        if isinstance(index, slice):
+            idxs = range(*index.indices(size))
+            T = type(self).unsized_t[len(idxs)]
+            if idxs.step == 1 and not self._wide_:
+                start = idxs.start
+                return T._from_words_((self._value >> np.uint64(start)) & np.uint64(T._mask_))
+            obj = self._to_obj_()
+            if idxs.step == 1:
+                return T._from_obj_(obj >> idxs.start)
+            acc = obj & 0
+            for k, i in enumerate(idxs):
+                acc = acc | (((obj >> i) & 1) << k)
+            return T._from_obj_(acc)
+        elif isinstance(index, int):
+            if index < 0:
+                index = size+index
+            if not (0 <= index < size):
+                raise IndexError()
+            if self._wide_:
+                word, index = divmod(index, _WORD_SIZE)
+                v = self._value[..., word]
+            else:
+                v = self._value
+            return BitArray._from_array_(((v >> np.uint64(index)) & np.uint64(1)).astype(bool))
+        else:
+            raise TypeError()
+
+    @property
+    def num_bits(self):
+        return self.size
+
+    def __len__(self):
+        return self.size
+
+    def concat(self, other):
+        T = type(self).unsized_t
+        if not isinstance(other, T):
+            raise TypeError(f'value must of type {T}')
+        R = T[self.size+other.size]
+        if not R._wide_:
+            a, b = np.broadcast_arrays(self._value, other._value)
+            return R._from_words_(a | (b << np.uint64(self.size)))
+        return R._from_obj_(self._to_obj_() | (other._to_obj_() << self.size))
+
+    def bvnot(self):
+        if self._wide_:
+            return self._new_(~self._value & self._word_mask_())
+        return self._new_(~self._value & np.uint64(self._mask_))
+
+    @bv_cast
+    def bvand(self, other):
+        return self._new_(self._value & other._value)
+
+    @bv_cast
+    def bvor(self, other):
+        return self._new_(self._value | other._value)
+
+    @bv_cast
+    def bvxor(self, other):
+        return self._new_(self._value ^ other._value)
+
+    @bv_cast
+    def bvshl(self, other):
+        n = self.size
+        if self._wide_:
+            a, b = self._to_obj_(), other._to_obj_()
+            return self._obj_op_(lambda: np.where(b < n, a << np.minimum(b, n), 0))
+        b = other._value
+        v = (self._value << np.minimum(b, np.uint64(_WORD_SIZE - 1))) & np.uint64(self._mask_)
+        return self._new_(np.where(b < n, v, np.uint64(0)))
+
+    @bv_cast
+    def bvlshr(self, other):
+        n = self.size
+        if self._wide_:
+            a, b = self._to_obj_(), other._to_obj_()
+            return self._obj_op_(lambda: a >> np.minimum(b, n))
+        b = other._value
+        v = self._value >> np.minimum(b, np.uint64(_WORD_SIZE - 1))
+        return self._new_(np.where(b < n, v, np.uint64(0)))
+
+    @bv_cast
+    def bvashr(self, other):
+        n = self.size
+        if self._wide_:
+            a, b = self._to_sobj_(), other._to_obj_()
+            return self._obj_op_(lambda: a >> np.minimum(b, n))
+        b = np.minimum(other._value, np.uint64(n - 1)).astype(np.int64)
+        v = (self._as_int64_() >> b).astype(np.uint64)
+        return self._new_(v & np.uint64(self._mask_))
+
+    def _rotate_(self, left):
+        n = self.size
+        r = left % n
+        if self._wide_:
+            a = self._to_obj_()
+            return self._obj_op_(lambda: (a << r) | (a >> (n - r)))
+        r = r.astype(np.uint64)
+        a = self._value
+        # shifts by n are undefined when n is the word size so avoid them
+        safe = np.where(r == 0, np.uint64(1), r)
+        v = ((a << safe) | (a >> (np.uint64(n) - safe))) & np.uint64(self._mask_)
+        return self._new_(np.where(r == 0, a, v))
+
+    @bv_cast
+    def bvrol(self, other):
+        return self._rotate_(other._to_obj_() if self._wide_ else other._value)
+
+    @bv_cast
+    def bvror(self, other):
+        n = self.size
+        if self._wide_:
+            return self._rotate_(n - other._to_obj_() % n)
+        return self._rotate_(np.uint64(n) - other._value % np.uint64(n))
+
+    @bv_cast
+    def bvcomp(self, other):
+        return type(self).unsized_t[1](self.bveq(other))
+
+    @bv_cast
+    def bveq(self, other):
+        v = self._value == other._value
+        if self._wide_:
+            v = v.all(axis=-1)
+        return BitArray._from_array_(v)
+
+    @bv_cast
+    def bvne(self, other):
+        return ~self.bveq(other)
+
+    def _ult_(self, a, b):
+        if not self._wide_:
+            return a < b
+        a, b = np.broadcast_arrays(a, b)
+        lt = np.zeros(a.shape[:-1], dtype=bool)
+        decided = np.zeros(a.shape[:-1], dtype=bool)
+        for k in reversed(range(self._words_)):
+            ak, bk = a[..., k], b[..., k]
+            lt |= ~decided & (ak < bk)
+            decided |= ak != bk
+        return lt
+
+    def _flip_sign_(self):
+        n = self.size
+        if self._wide_:
+            flip = np.zeros(self._words_, dtype=np.uint64)
+            flip[-1] = np.uint64(1 << ((n - 1) % _WORD_SIZE))
+            return self._value ^ flip
+        return self._value ^ np.uint64(1 << (n - 1))
+
+    @bv_cast
+    def bvult(self, other):
+        return BitArray._from_array_(self._ult_(self._value, other._value))
+
+    @bv_cast
+    def bvule(self, other):
+        return ~other.bvult(self)
+
+    @bv_cast
+    def bvugt(self, other):
+        return other.bvult(self)
+
+    @bv_cast
+    def bvuge(self, other):
+        return ~self.bvult(other)
+
+    @bv_cast
+    def bvslt(self, other):
+        return BitArray._from_array_(self._ult_(self._flip_sign_(), other._flip_sign_()))
+
+    @bv_cast
+    def bvsle(self, other):
+        return ~other.bvslt(self)
+
+    @bv_cast
+    def bvsgt(self, other):
+        return other.bvslt(self)
+
+    @bv_cast
+    def bvsge(self, other):
+        return ~self.bvslt(other)
+
+    def bvneg(self):
+        return type(self)(0).bvsub(self)
+
+    def adc(self, other : 'BitVectorArray', carry : BitArray) -> tp.Tuple['BitVectorArray', BitArray]:
+        """
+        add with carry
+
+        returns a two element tuple of the form (result, carry)
+
+        """
+        T = type(self)
+        other = _coerce(T, other)
+        carry = _coerce(T.unsized_t[1], carry)
+
+        a = self.zext(1)
+        b = other.zext(1)
+        c = carry.zext(T.size)
+
+        res = a + b + c
+        return res[0:-1], res[-1]
+
+    def ite(self, t_branch, f_branch):
+        return self.bvne(0).ite(t_branch, f_branch)
+
+    def _where_(self, select, other):
+        if self._wide_:
+            select = select[..., None]
+        return self._new_(np.where(select, self._value, other._value))
+
+    def _wide_add_(self, a, b, carry):
+        a, b = np.broadcast_arrays(a, b)
+        out = np.empty_like(a)
+        carry = np.full(a.shape[:-1], carry, dtype=np.uint64)
+        for k in range(self._words_):
+            s = a[..., k] + b[..., k]
+            c = (s < a[..., k]).astype(np.uint64)
+            t = s + carry
+            c |= (t < s).astype(np.uint64)
+            out[..., k] = t
+            carry = c
+        return out & self._word_mask_()
+
+    @bv_cast
+    def bvadd(self, other):
+        if self._wide_:
+            return self._new_(self._wide_add_(self._value, other._value, 0))
+        return self._new_((self._value + other._value) & np.uint64(self._mask_))
+
+    @bv_cast
+    def bvsub(self, other):
+        if self._wide_:
+            return self._new_(self._wide_add_(self._value, other.bvnot()._value, 1))
+        return self._new_((self._value - other._value) & np.uint64(self._mask_))
+
+    @bv_cast
+    def bvmul(self, other):
+        if self._wide_:
+            return self._obj_op_(lambda a, b: a * b, self._to_obj_(), other._to_obj_())
+        return self._new_((self._value * other._value) & np.uint64(self._mask_))
+
+    @bv_cast
+    def bvudiv(self, other):
+        mask = self._mask_
+        if self._wide_:
+            a, b = self._to_obj_(), other._to_obj_()
+            return self._obj_op_(lambda: np.where(b == 0, mask, a // np.where(b == 0, 1, b)))
+        b = other._value
+        q = self._value // np.where(b == 0, np.uint64(1), b)
+        return self._new_(np.where(b == 0, np.uint64(mask), q))
+
+    @bv_cast
+    def bvurem(self, other):
+        if self._wide_:
+            a, b = self._to_obj_(), other._to_obj_()
+            return self._obj_op_(lambda: np.where(b == 0, a, a % np.where(b == 0, 1, b)))
+        b = other._value
+        r = self._value % np.where(b == 0, np.uint64(1), b)
+        return self._new_(np.where(b == 0, self._value, r))
+
+    @bv_cast
+    def bvsdiv(self, other):
+        mask = self._mask_
+        if self._wide_:
+            a, b = self._to_sobj_(), other._to_sobj_()
+            return self._obj_op_(lambda: np.where(b == 0, mask, a // np.where(b == 0, 1, b)))
+        a, b = self._as_int64_(), other._as_int64_()
+        with np.errstate(over='ignore'):
+            q = (a // np.where(b == 0, 1, b)).astype(np.uint64)
+        return self._new_(np.where(b == 0, np.uint64(mask), q & np.uint64(mask)))
+
+    @bv_cast
+    def bvsrem(self, other):
+        if self._wide_:
+            a, b = self._to_sobj_(), other._to_sobj_()
+            return self._obj_op_(lambda: np.where(b == 0, a, a % np.where(b == 0, 1, b)))
+        a, b = self._as_int64_(), other._as_int64_()
+        r = (a % np.where(b == 0, 1, b)).astype(np.uint64) & np.uint64(self._mask_)
+        return self._new_(np.where(b == 0, self._value, r))
+
+    def __invert__(self): return self.bvnot()
+
+    __and__ = dispatch_oper(bvand)
+    __rand__ = dispatch_roper(__and__)
+
+    __or__ = dispatch_oper(bvor)
+    __ror__ = dispatch_roper(__or__)
+
+    __xor__ = dispatch_oper(bvxor)
+    __rxor__ = dispatch_roper(__xor__)
+
+    __lshift__ = dispatch_oper(bvshl)
+    __rlshift__ = dispatch_roper(__lshift__)
+
+    __rshift__ = dispatch_oper(bvlshr)
+    __rrshift__ = dispatch_roper(__rshift__)
+
+    def __neg__(self): return self.bvneg()
+
+    __add__ = dispatch_oper(bvadd)
+    __radd__ = dispatch_roper(__add__)
+
+    __sub__ = dispatch_oper(bvsub)
+    __rsub__ = dispatch_roper(__sub__)
+
+    __mul__ = dispatch_oper(bvmul)
+    __rmul__ = dispatch_roper(__mul__)
+
+    __floordiv__ = dispatch_oper(bvudiv)
+    __rfloordiv__ = dispatch_roper(__floordiv__)
+
+    __mod__ = dispatch_oper(bvurem)
+    __rmod__ = dispatch_roper(__mod__)
+
+    __eq__ = dispatch_oper(bveq)
+    __ne__ = dispatch_oper(bvne)
+    __ge__ = dispatch_oper(bvuge)
+    __gt__ = dispatch_oper(bvugt)
+    __le__ = dispatch_oper(bvule)
+    __lt__ = dispatch_oper(bvult)
+
+    def as_uint(self):
+        if self._wide_:
+            return self._to_obj_()
+        return self._value
+
+    def as_sint(self):
+        if self._wide_:
+            return self._to_sobj_()
+        return self._as_int64_()
+
+    as_int = as_sint
+
+    def __int__(self):
+        if self._value.size != self._words_:
+            raise TypeError('BitVectorArray with more than one element cannot be converted to int')
+        return int(self._to_obj_().item())
+
+    def __bool__(self):
+        return bool(int(self))
+
+    def to_list(self):
+        T = self._scalar_t_[self.size]
+        return [T(v) for v in self._to_obj_().ravel().tolist()]
+
+    def repeat(self, r):
+        r = int(r)
+        if r <= 0:
+            raise ValueError()
+        n = self.size
+        obj = self._to_obj_()
+        acc = obj
+        for k in range(1, r):
+            acc = acc | (obj << (k * n))
+        return type(self).unsized_t[r * n]._from_obj_(acc)
+
+    def sext(self, ext):
+        ext = int(ext)
+        if ext < 0:
+            raise ValueError()
+        return type(self).unsized_t[self.size + ext]._from_obj_(self._to_sobj_())
+
+    def ext(self, ext):
+        return self.zext(ext)
+
+    def zext(self, ext):
+        ext = int(ext)
+        if ext < 0:
+            raise ValueError()
+        T = type(self).unsized_t[self.size + ext]
+        if not T._wide_:
+            return T._from_words_(self._value)
+        return T._from_obj_(self._to_obj_())
+
+
+class NumVectorArray(BitVectorArray):
+    pass
+
+
+class UIntVectorArray(NumVectorArray):
+    _scalar_t_ = UIntVector
+
+
+class SIntVectorArray(NumVectorArray):
+    _scalar_t_ = SIntVector
+
+    def __int__(self):
+        if self._value.size != self._words_:
+            raise TypeError('SIntVectorArray with more than one element cannot be converted to int')
+        return int(self._to_sobj_().item())
+
+    def __rshift__(self, other):
+        try:
+            return self.bvashr(other)
+        except InconsistentSizeError as e:
+            raise e from None
+        except TypeError:
+            return NotImplemented
+
+    __rrshift__ = dispatch_roper(__rshift__)
+
+    def __floordiv__(self, other):
+        try:
+            return self.bvsdiv(other)
+        except InconsistentSizeError as e:
+            raise e from None
+        except TypeError:
+            return NotImplemented
+
+    __rfloordiv__ = dispatch_roper(__floordiv__)
+
+    def __mod__(self, other):
+        try:
+            return self.bvsrem(other)
+        except InconsistentSizeError as e:
+            raise e from None
+        except TypeError:
+            return NotImplemented
+
+    __rmod__ = dispatch_roper(__mod__)
+
+    def __ge__(self, other):
+        try:
+            return self.bvsge(other)
+        except InconsistentSizeError as e:
+            raise e from None
+        except TypeError:
+            return NotImplemented
+
+    def __gt__(self, other):
+        try:
+            return self.bvsgt(other)
+        except InconsistentSizeError as e:
+            raise e from None
+        except TypeError:
+            return NotImplemented
+
+    def __lt__(self, other):
+        try:
+            return self.bvslt(other)
+        except InconsistentSizeError as e:
+            raise e from None
+        except TypeError:
+            return NotImplemented
+
+    def __le__(self, other):
+        try:
+            return self.bvsle(other)
+        except InconsistentSizeError as e:
+            raise e from None
+        except TypeError:
+            return NotImplemented
+
+    def ext(self, other):
+        return self.sext(other)
+
+
+_Family_ = TypeFamily(BitArray, BitVectorArray, UIntVectorArray, SIntVectorArray)
+
+
+def _array_type(T : type) -> type:
+    '''
+    Batch type holding values of the concrete scalar type T
+    '''
+    if issubclass(T, Bit):
+        return BitArray
+    elif issubclass(T, SIntVector):
+        return SIntVectorArray[T.size]
+    elif issubclass(T, UIntVector):
+        return UIntVectorArray[T.size]
+    else:
+        return BitVectorArray[T.size]
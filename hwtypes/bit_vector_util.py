@@ -2,6 +2,7 @@ from abc import abstractmethod
 import functools as ft
 import inspect
 import types
+import weakref
 
 from .util import Method
 from .bit_vector_abc import InconsistentSizeError
@@ -51,32 +52,107 @@ class BitVectorProtocol(metaclass=BitVectorProtocolMeta):
 # used as a tag
 class PolyBase: pass
 
+
+# The methods of a polymorphic type only depend on the types of the
+# branches, the select does not.  So the methods are built once per type
+# pair on a base class (cached) and each select gets a thin subclass of
+# the base which carries the select as a class attribute.  Keeping the
+# select on the type means type(self)(val) is sufficient to cast val.
+#
+# _selects_ of a select class maps the key of each polymorphic type
+# involved (types may be nested) to its select.
+
+
+def _type_selects(T):
+    return getattr(T, '_selects_', {})
+
+
+def _strip_select(T):
+    # the select independent base of a (sized) select class
+    try:
+        U = T._poly_unsized_base_
+    except AttributeError:
+        return T
+    if issubclass(T, AbstractBitVector):
+        return U[T.size]
+    return U
+
+
+def _merge_selects(select, t_selects, f_selects):
+    selects = dict(f_selects)
+    for k, t in t_selects.items():
+        f = selects.get(k)
+        if f is None or f is t:
+            selects[k] = t
+        else:
+            # the same polymorphic type on both branches
+            selects[k] = select.ite(t, f)
+    return selects
+
+
+# (unsized base, selects) : select class.  The select classes keep their
+# selects alive so their ids are not reused while the entry exists.
+_select_class_cache = weakref.WeakValueDictionary()
+
+
+def _select_class(T, selects):
+    '''
+    The subclass of the (stripped) polymorphic type T with selects
+    '''
+    U = T.unsized_t if issubclass(T, AbstractBitVector) else T
+    cache_key = U, frozenset((k, id(s)) for k, s in selects.items())
+    try:
+        return _select_class_cache[cache_key]
+    except KeyError:
+        pass
+    select = selects[U._poly_key_]
+    meta, namespace, _ = types.prepare_class(f'{U._poly_name_}, {select}]', (U,))
+    namespace['_selects_'] = selects
+    namespace['_poly_unsized_base_'] = U
+    S = meta(f'{U._poly_name_}, {select}]', (U,), namespace)
+    S.__module__ = U.__module__
+    if issubclass(T, AbstractBitVector):
+        S = S[T.size]
+    _select_class_cache[cache_key] = S
+    return S
+
+
 class PolyType(type):
-    def __getitem__(cls, args):
-        # From a typing perspective it would be better to make select an
-        # argument to init instead of making it a type param.  This would
-        # allow types to be cached etc... However, making it an init arg
-        # means type(self)(val) is no longer sufficient to to cast val.
-        # Instead one would need to write type(self)(val, self._select_) or
-        # equivalent and hence would require a major change in the engineering
-        # of bitvector types (they would need to be aware of polymorphism).
-        # Note we can't cache as select is not necessarily hashable.
+    # (PolyType, T0, T1) : base of the polymorphic types of T0 and T1.  The
+    # number of type pairs is small so the classes are kept alive.
+    _class_cache = {}
 
+    def __getitem__(cls, args):
         T0, T1, select = args
-
-        if not cls._type_check(T0, T1):
-            raise TypeError(f'Cannot construct {cls} from {T0} and {T1}')
         if not isinstance(select, AbstractBit):
             raise TypeError('select must be a Bit')
-        if (T0.get_family() is not T1.get_family()
-            or T0.get_family() is not select.get_family()):
+        base = cls._base(T0, T1)
+        if base.get_family() is not select.get_family():
             raise TypeError('Cannot construct PolyTypes across families')
+        selects = dict(_type_selects(T1))
+        selects.update(_type_selects(T0))
+        selects[base._poly_key_] = select
+        return _select_class(base, selects)
+
+    def _base(cls, T0, T1):
+        T0 = _strip_select(T0)
+        T1 = _strip_select(T1)
+        mcs = type(cls)
+        key = cls, T0, T1
+        try:
+            return mcs._class_cache[key]
+        except KeyError:
+            pass
 
+        if not cls._type_check(T0, T1):
+            raise TypeError(f'Cannot construct {cls} from {T0} and {T1}')
+        if T0.get_family() is not T1.get_family():
+            raise TypeError('Cannot construct PolyTypes across families')
 
         # stupid generator to make sure PolyBase is not replicated
         # and always comes last
         bases = *(b for b in cls._get_bases(T0, T1) if b is not PolyBase), PolyBase
-        class_name = f'{cls.__name__}[{T0.__name__}, {T1.__name__}, {select}]'
+        class_name = f'{cls.__name__}[{T0.__name__}, {T1.__name__}]'
         meta, namespace, _ = types.prepare_class(class_name, bases)
 
         d0 = dict(inspect.getmembers(T0))
@@ -89,11 +165,17 @@ class PolyType(type):
 
             m0 = inspect.getattr_static(T0, k)
             m1 = inspect.getattr_static(T1, k)
-            namespace[k] = build_VCall(select, m0, m1)
-
+            # Only methods dispatch on select, data attributes, slot
+            # descriptors, class and static methods are left to the mro
+            if not (inspect.isfunction(m0) and inspect.isfunction(m1)):
+                continue
+            namespace[k] = build_VCall(key, m0, m1)
 
+        namespace['_poly_key_'] = key
+        namespace['_poly_name_'] = class_name[:-1]
         new_cls = meta(class_name, bases, namespace)
         final = cls._finalize(new_cls, T0, T1)
+        mcs._class_cache[key] = final
         return final
 
 
@@ -163,15 +245,22 @@ class PolyBit(metaclass=PolyType):
     def _finalize(cls, new_class, T0, T1):
         return new_class
 
-def build_VCall(select, m0, m1):
+def build_VCall(key, m0, m1):
     if m0 is m1:
         return m0
     else:
-        def VCall(*args, **kwargs):
-            v0 = m0(*args, **kwargs)
-            v1 = m1(*args, **kwargs)
-            if v0 is NotImplemented or v0 is NotImplemented:
+        def VCall(self, *args, **kwargs):
+            v0 = m0(self, *args, **kwargs)
+            v1 = m1(self, *args, **kwargs)
+            if v0 is NotImplemented or v1 is NotImplemented:
                 return NotImplemented
+            elif v0 is None and v1 is None:
+                # __init__ and friends
+                return None
+            try:
+                select = _type_selects(type(self))[key]
+            except KeyError:
+                raise TypeError(f'{type(self)} was constructed without a select') from None
             return select.ite(v0, v1)
         return Method(VCall)
 
@@ -182,62 +271,87 @@ def get_branch_type(branch):
     else:
         return type(branch)
 
-def determine_return_type(select, t_branch, f_branch):
-    def _recurse(t_branch, f_branch):
-        tb_t = get_branch_type(t_branch)
-        fb_t = get_branch_type(f_branch)
-
-        if (isinstance(tb_t, tuple)
-            and isinstance(fb_t, tuple)
-            and len(tb_t) == len(fb_t)):
-            try:
-                return tuple(_recurse(t, f) for t, f in zip(t_branch, f_branch))
-            except (TypeError, InconsistentSizeError):
-                raise TypeError(f'Branches have inconsistent types: '
-                                f'{tb_t} and {fb_t}')
-        elif (isinstance(tb_t, tuple)
-              or isinstance(fb_t, tuple)):
-            raise TypeError(f'Branches have inconsistent types: {tb_t} and {fb_t}')
-        elif issubclass(tb_t, AbstractBit) and issubclass(fb_t, AbstractBit):
-            if tb_t is fb_t:
-                return tb_t
-            return PolyBit[tb_t, fb_t, select]
-        elif issubclass(tb_t, AbstractBitVector) and issubclass(fb_t, AbstractBitVector):
-            if tb_t is fb_t:
-                return tb_t
-            return PolyVector[tb_t, fb_t, select]
-        elif tb_t is fb_t and issubclass(tb_t, BitVectorProtocol):
-            def from_bv_args(val):
-                return tb_t._from_bitvector_(tb_t._bitvector_t_()(val))
-            return from_bv_args
-        else:
-            raise TypeError(f'tb_t: {tb_t}, fb_t: {fb_t}')
+def _leaf_plan(select_t, tb_t, fb_t):
+    # tb_t and fb_t are stripped of their selects (see _strip_select), the
+    # selects are read from the branches
+    if issubclass(tb_t, AbstractBit) and issubclass(fb_t, AbstractBit):
+        poly_t = PolyBit
+    elif issubclass(tb_t, AbstractBitVector) and issubclass(fb_t, AbstractBitVector):
+        poly_t = PolyVector
+    elif tb_t is fb_t and issubclass(tb_t, BitVectorProtocol):
+        bv_t = tb_t._bitvector_t_()
+        from_bv = tb_t._from_bitvector_
+        def plan(ite, select, t_branch, f_branch):
+            return from_bv(bv_t(ite(select, t_branch._to_bitvector_(), f_branch._to_bitvector_())))
+        return plan
+    else:
+        raise TypeError(f'tb_t: {tb_t}, fb_t: {fb_t}')
+
+    if tb_t is fb_t and not issubclass(tb_t, PolyBase):
+        def plan(ite, select, t_branch, f_branch):
+            return tb_t(ite(select, t_branch, f_branch))
+        return plan
+    elif tb_t is fb_t:
+        # the same polymorphic type, the selects of the branches are muxed
+        def plan(ite, select, t_branch, f_branch):
+            T = type(t_branch)
+            if T is not type(f_branch):
+                selects = _merge_selects(select, _type_selects(T), _type_selects(type(f_branch)))
+                T = _select_class(tb_t, selects)
+            return T(ite(select, t_branch, f_branch))
+        return plan
+
+    if not issubclass(select_t, AbstractBit):
+        raise TypeError('select must be a Bit')
+    T = poly_t._base(tb_t, fb_t)
+    if T.get_family() is not select_t.get_family():
+        raise TypeError('Cannot construct PolyTypes across families')
+    key = T._poly_key_
+    def plan(ite, select, t_branch, f_branch):
+        selects = _merge_selects(select, _type_selects(type(t_branch)), _type_selects(type(f_branch)))
+        selects[key] = select
+        return _select_class(T, selects)(ite(select, t_branch, f_branch))
+    return plan
+
+
+@ft.lru_cache(maxsize=1024)
+def _ite_plan(select_t, tb_t, fb_t):
+    '''
+    Compiles an ite over branches of types tb_t and fb_t (as returned by
+    _branch_sig) to a function plan(ite, select, t_branch, f_branch)
+    which muxes the leaves with ite and builds the result in one pass.
+    '''
+    if (isinstance(tb_t, tuple)
+        and isinstance(fb_t, tuple)
+        and len(tb_t) == len(fb_t)):
+        try:
+            plans = tuple(_ite_plan(select_t, t, f) for t, f in zip(tb_t, fb_t))
+        except (TypeError, InconsistentSizeError):
+            raise TypeError(f'Branches have inconsistent types: '
+                            f'{tb_t} and {fb_t}')
+        def plan(ite, select, t_branch, f_branch):
+            return tuple(p(ite, select, t, f)
+                         for p, t, f in zip(plans, t_branch, f_branch))
+        return plan
+    elif (isinstance(tb_t, tuple)
+          or isinstance(fb_t, tuple)):
+        raise TypeError(f'Branches have inconsistent types: {tb_t} and {fb_t}')
+    else:
+        return _leaf_plan(select_t, tb_t, fb_t)
 
-    return _recurse(t_branch, f_branch)
 
-def coerce_branch(r_type, branch):
-    if isinstance(r_type, tuple):
-        assert isinstance(branch, tuple)
-        assert len(r_type) == len(branch)
-        return tuple(coerce_branch(t, arg) for t, arg in zip(r_type, branch))
+def _branch_sig(branch):
+    if isinstance(branch, tuple):
+        return tuple(map(_branch_sig, branch))
     else:
-        return r_type(branch)
-
-def push_ite(ite, select, t_branch, f_branch):
-    def _recurse(t_branch, f_branch):
-        if isinstance(t_branch, tuple):
-            assert isinstance(f_branch, tuple)
-            assert len(t_branch) == len(f_branch)
-            return tuple(_recurse(t, f) for t, f in  zip(t_branch, f_branch))
-        elif isinstance(t_branch, BitVectorProtocol):
-            assert type(t_branch) is type(f_branch)
-            return _recurse(t_branch._to_bitvector_(), f_branch._to_bitvector_())
-        else:
-            return ite(select, t_branch, f_branch)
-    return _recurse(t_branch, f_branch)
+        return _strip_select(type(branch))
+
 
 def build_ite(ite, select, t_branch, f_branch):
-    r_type = determine_return_type(select, t_branch, f_branch)
-    r_val = push_ite(ite, select, t_branch, f_branch)
-    r_val = coerce_branch(r_type, r_val)
-    return r_val
+    tb_t = _strip_select(type(t_branch))
+    fb_t = _strip_select(type(f_branch))
+    if isinstance(t_branch, tuple):
+        tb_t = _branch_sig(t_branch)
+    if isinstance(f_branch, tuple):
+        fb_t = _branch_sig(f_branch)
+    return _ite_plan(type(select), tb_t, fb_t)(ite, select, t_branch, f_branch)
@@ -0,0 +1,276 @@
+'''
+Lazy exhaustive iteration over the values of a type.
+
+    d = Domain(BitVector[16])
+    len(d)          # 65536
+    d[1234]         # BitVector[16](1234), decoded on access
+    d.index(x)      # position of x in d
+
+    # split a sweep over workers
+    for x in d.shard(worker, workers): ...
+    for arr in d.arrays(4096): ...  # numpy backed batches
+
+Values are numbered by their bit pattern for Bit and BitVector[n] (so for
+SIntVector[n] the non negative values come first), by declaration order for
+Enums, in lexicographic (mixed radix) order for tuples and products (the last
+field varies fastest) and variant after variant for sum types.  Variants of
+a Sum are ordered by name as its fields are unordered.
+
+Slices, shards and strides of a domain are domains over a sub range of the
+indices, nothing is materialized until a value is accessed.  Domains pickle
+as their type and range so they can be sent to worker processes.
+'''
+import bisect
+import typing as tp
+
+from .bit_vector import Bit, BitVector, _make
+from .bit_vector_array import BitArray, np, _require_numpy, _array_type
+from .adt import Tuple, Sum, Enum, TaggedUnion
+
+__all__ = ['Domain']
+
+
+def _space(T):
+    '''
+    Returns (size, decode, encode) of the values of T where decode maps an
+    index in range(size) to a value and encode maps a value to its index
+    '''
+    if not isinstance(T, type):
+        raise TypeError(f'Expected a type not {T}')
+    elif issubclass(T, Bit):
+        def encode(v):
+            if not isinstance(v, T):
+                raise ValueError(f'{v!r} is not a {T}')
+            return int(bool(v))
+        return 2, lambda i: T(bool(i)), encode
+    elif issubclass(T, BitVector) and T.is_sized:
+        def encode(v):
+            if type(v) is not T:
+                raise ValueError(f'{v!r} is not a {T}')
+            return v._value
+        return 1 << T.size, lambda i: _make(T, i), encode
+    elif issubclass(T, Enum) and T.is_bound:
+        fields = T.fields
+        index = {elem._value_ : i for i, elem in enumerate(fields)}
+        def encode(v):
+            if not isinstance(v, T):
+                raise ValueError(f'{v!r} is not a {T}')
+            return index[v._value_]
+        return len(fields), fields.__getitem__, encode
+    elif issubclass(T, Tuple) and T.is_bound:
+        return _tuple_space(T)
+    elif issubclass(T, Sum) and T.is_bound:
+        return _sum_space(T)
+    else:
+        raise TypeError(f'Cannot enumerate the values of {T}')
+
+
+def _tuple_space(T):
+    spaces = [_space(t) for t in T.fields]
+    size = 1
+    for s, _, _ in spaces:
+        size *= s
+    rev = spaces[::-1]
+
+    def decode(i):
+        args = []
+        for s, dec, _ in rev:
+            i, r = divmod(i, s)
+            args.append(dec(r))
+        return T(*reversed(args))
+
+    def encode(v):
+        if not isinstance(v, T):
+            raise ValueError(f'{v!r} is not a {T}')
+        acc = 0
+        for (s, _, enc), x in zip(spaces, v._value_):
+            acc = acc * s + enc(x)
+        return acc
+
+    return size, decode, encode
+
+
+def _sum_space(T):
+    if issubclass(T, TaggedUnion):
+        variants = list(T.field_dict.items())
+        tag_of = lambda v: v._tag_
+        build = lambda k, x: T(**{variants[k][0] : x})
+    else:
+        variants = sorted(((t.__name__, t) for t in T.fields), key=lambda x: x[0])
+        tags = {t : k for k, (_, t) in enumerate(variants)}
+        tag_of = lambda v: tags[type(v._value_)]
+        build = lambda k, x: T(x)
+
+    spaces = [_space(t) for _, t in variants]
+    offsets = []
+    size = 0
+    for s, _, _ in spaces:
+        offsets.append(size)
+        size += s
+
+    def decode(i):
+        k = bisect.bisect_right(offsets, i) - 1
+        return build(k, spaces[k][1](i - offsets[k]))
+
+    def encode(v):
+        if not isinstance(v, T):
+            raise ValueError(f'{v!r} is not a {T}')
+        k = tag_of(v)
+        return offsets[k] + spaces[k][2](v._value_)
+
+    return size, decode, encode
+
+
+class Domain(tp.Sequence):
+    '''
+    Sequence of all values of T (or of the values at indices, a range over
+    the full domain), see the module docstring.
+    '''
+    def __init__(self, T : type, indices : tp.Optional[range] = None):
+        size, self._decode, self._encode = _space(T)
+        self._T = T
+        self._size = size
+        if indices is None:
+            indices = range(size)
+        elif not isinstance(indices, range):
+            raise TypeError('indices must be a range')
+        elif indices and not (0 <= min(indices[0], indices[-1])
+                              and max(indices[0], indices[-1]) < size):
+            # only check the ends, O(1) on (possibly huge) ranges
+            raise IndexError(f'indices out of the domain of {T}')
+        self._indices = indices
+
+    def _view(self, indices : range) -> 'Domain':
+        d = object.__new__(Domain)
+        d._T = self._T
+        d._size = self._size
+        d._decode = self._decode
+        d._encode = self._encode
+        d._indices = indices
+        return d
+
+    @property
+    def type(self) -> type:
+        return self._T
+
+    @property
+    def indices(self) -> range:
+        '''
+        The indices of the values of this view in the full domain
+        '''
+        return self._indices
+
+    @property
+    def size(self) -> int:
+        '''
+        Number of values, unlike len also works beyond sys.maxsize
+        '''
+        r = self._indices
+        if r.step > 0:
+            return max(0, (r.stop - r.start + r.step - 1) // r.step)
+        return max(0, (r.start - r.stop - r.step - 1) // -r.step)
+
+    def __len__(self):
+        return len(self._indices)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return self._view(self._indices[idx])
+        return self._decode(self._indices[idx])
+
+    def __iter__(self):
+        T = self._T
+        if issubclass(T, BitVector):
+            for i in self._indices:
+                yield _make(T, i)
+        else:
+            yield from map(self._decode, self._indices)
+
+    def __contains__(self, value):
+        try:
+            return self._encode(value) in self._indices
+        except (ValueError, TypeError, KeyError):
+            return False
+
+    def index(self, value, start : int = 0, stop : tp.Optional[int] = None) -> int:
+        try:
+            i = self._encode(value)
+        except (TypeError, KeyError):
+            raise ValueError(f'{value!r} is not in domain') from None
+        if i not in self._indices:
+            raise ValueError(f'{value!r} is not in domain')
+        pos = self._indices.index(i)
+        start, stop, _ = slice(start, stop).indices(self.size)
+        if not start <= pos < stop:
+            raise ValueError(f'{value!r} is not in domain')
+        return pos
+
+    def count(self, value) -> int:
+        return int(value in self)
+
+    def shard(self, index : int, count : int) -> 'Domain':
+        '''
+        The index-th of count contiguous parts of about equal length
+        '''
+        if not 0 <= index < count:
+            raise IndexError('shard index out of range')
+        n = self.size
+        return self[n * index // count : n * (index + 1) // count]
+
+    def stride(self, index : int, count : int) -> 'Domain':
+        '''
+        The index-th of count interleaved parts, i.e. self[index::count]
+        '''
+        if not 0 <= index < count:
+            raise IndexError('stride index out of range')
+        return self[index::count]
+
+    def chunks(self, size : int) -> tp.Iterator['Domain']:
+        '''
+        Consecutive views of at most size values
+        '''
+        if size < 1:
+            raise ValueError('size must be >= 1')
+        for start in range(0, self.size, size):
+            yield self[start:start + size]
+
+    def to_array(self):
+        '''
+        The values as a BitArray / BitVectorArray[n] batch (requires numpy
+        and T to be Bit or a BitVector[n])
+        '''
+        _require_numpy()
+        T = self._T
+        if not issubclass(T, (Bit, BitVector)):
+            raise TypeError(f'Cannot build an array of {T}')
+        AT = _array_type(T)
+        r = self._indices
+        if r.step < 0:
+            # build the increasing range and flip it
+            r = r[::-1]
+            flip = lambda arr: arr[::-1]
+        else:
+            flip = lambda arr: arr
+
+        if AT is BitArray:
+            return BitArray(flip(np.arange(r.start, r.stop, r.step) != 0))
+        elif AT._wide_:
+            return AT._from_ints_(list(flip(r)))
+        arr = np.arange(self.size, dtype=np.uint64) * np.uint64(r.step)
+        arr += np.uint64(r.start if r else 0)
+        return AT._from_words_(np.ascontiguousarray(flip(arr)))
+
+    def arrays(self, size : int) -> tp.Iterator:
+        '''
+        Consecutive batches of at most size values, see to_array
+        '''
+        for chunk in self.chunks(size):
+            yield chunk.to_array()
+
+    def __reduce__(self):
+        return Domain, (self._T, self._indices)
+
+    def __repr__(self):
+        if self._indices == range(self._size):
+            return f'Domain({self._T!r})'
+        return f'Domain({self._T!r}, {self._indices!r})'
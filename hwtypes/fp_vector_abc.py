@@ -1,10 +1,13 @@
 from abc import ABCMeta, abstractmethod
+import copyreg
+import operator
 import typing as tp
 import weakref
 import warnings
 import enum
 
 from . import AbstractBitVectorMeta, AbstractBitVector, AbstractBit
+from .util import _reduce_type
 
 class RoundingMode(enum.Enum):
     RNE = enum.auto() # roundTiesToEven
@@ -41,6 +44,15 @@ class AbstractFPVectorMeta(ABCMeta):
 
         return t
 
+    def __init_subclass__(mcs, **kwargs):
+        super().__init_subclass__(**kwargs)
+        copyreg.pickle(mcs, _reduce_type)
+
+    def _pickle_reduce_(cls):
+        if cls.is_bound and cls._info_[0] is not None:
+            return operator.getitem, (cls.unbound_t, cls.binding)
+        return cls.__qualname__
+
     def __getitem__(cls, idx : tp.Tuple[int, int, RoundingMode, bool]):
         mcs = type(cls)
         try:
@@ -118,6 +130,8 @@ class AbstractFPVectorMeta(ABCMeta):
         else:
             raise AttributeError('unbound type has no ieee_compliance')
 
+copyreg.pickle(AbstractFPVectorMeta, _reduce_type)
+
 class AbstractFPVector(metaclass=AbstractFPVectorMeta):
     @property
     def size(self) -> int:
@@ -0,0 +1,177 @@
+import typing as tp
+
+from .bit_vector import Bit, BitVector, _coerce, _make, _Family_
+from .bit_vector_abc import InconsistentSizeError
+from .memory_abc import AbstractMemory
+
+__all__ = ['Memory']
+
+
+class Memory(AbstractMemory):
+    '''
+    Concrete memory, see AbstractMemory.
+
+    Storage is sparse: the address space is split in pages of
+    2**page_bits words which are only allocated when written.  A page is a
+    bytearray holding each word little endian in (data_width + 7) // 8
+    bytes.  Unwritten words read as default.
+    '''
+    page_bits = 10
+
+    @staticmethod
+    def get_family():
+        return _Family_
+
+    def __init__(self, default=0):
+        T = type(self)
+        if not T.is_bound:
+            raise TypeError(f'{T} is not bound, use {T}[addr_width, data_width]')
+        if isinstance(default, Memory):
+            if type(default) is not T:
+                raise TypeError(f'Expected {T} not {type(default)}')
+            self._default = default._default
+            self._pages = {k : bytearray(page) for k, page in default._pages.items()}
+        else:
+            self._default = _coerce(T.data_t, default)._value
+            self._pages = {}
+        self._word_bytes = (T.data_width + 7) // 8
+        self._page_bits = min(T.page_bits, T.addr_width)
+
+    def _addr(self, addr) -> int:
+        if type(addr) is int:
+            pass
+        elif isinstance(addr, BitVector):
+            if addr.size != self.addr_width:
+                raise InconsistentSizeError('Inconsistent size')
+            return addr._value
+        else:
+            raise TypeError(f'Expected an address not {type(addr)}')
+        if not 0 <= addr < 1 << self.addr_width:
+            raise IndexError('address out of range')
+        return addr
+
+    def _new_page(self) -> bytearray:
+        word = self._default.to_bytes(self._word_bytes, 'little')
+        return bytearray(word * (1 << self._page_bits))
+
+    def read(self, addr) -> BitVector:
+        addr = self._addr(addr)
+        page = self._pages.get(addr >> self._page_bits)
+        if page is None:
+            return _make(type(self).data_t, self._default)
+        n = self._word_bytes
+        start = (addr & ((1 << self._page_bits) - 1)) * n
+        return _make(type(self).data_t, int.from_bytes(page[start:start + n], 'little'))
+
+    def write(self, addr, value) -> None:
+        addr = self._addr(addr)
+        value = _coerce(type(self).data_t, value)._value
+        idx = addr >> self._page_bits
+        page = self._pages.get(idx)
+        if page is None:
+            page = self._pages[idx] = self._new_page()
+        n = self._word_bytes
+        start = (addr & ((1 << self._page_bits) - 1)) * n
+        page[start:start + n] = value.to_bytes(n, 'little')
+
+    def copy(self) -> 'Memory':
+        return type(self)(self)
+
+    def __eq__(self, other) -> Bit:
+        if not isinstance(other, Memory):
+            return NotImplemented
+        elif type(other) is not type(self):
+            raise TypeError(f'Cannot compare {type(self)} and {type(other)}')
+        written = self._pages.keys() | other._pages.keys()
+        for k in written:
+            a = self._pages.get(k)
+            b = other._pages.get(k)
+            if a is None:
+                a = self._new_page()
+            if b is None:
+                b = other._new_page()
+            if a != b:
+                return Bit(False)
+        if len(written) < 1 << (self.addr_width - self._page_bits) and self._default != other._default:
+            # some page is unwritten in both
+            return Bit(False)
+        return Bit(True)
+
+    def _check_range(self, offset : int, count : int):
+        if offset < 0 or count < 0 or offset + count > 1 << self.addr_width:
+            raise IndexError('address out of range')
+
+    def load_bytes(self, data : bytes, offset : int = 0) -> None:
+        '''
+        Write words packed as in a page (little endian, (data_width + 7) // 8
+        bytes each) to consecutive addresses starting at offset.  Bits above
+        data_width are dropped.
+        '''
+        n = self._word_bytes
+        data = memoryview(data).cast('B')
+        if len(data) % n:
+            raise ValueError(f'data length must be a multiple of {n}')
+        count = len(data) // n
+        self._check_range(offset, count)
+        if self.data_width % 8:
+            # mask the high bits of each word
+            mask = type(self).data_t._mask_
+            frm = int.from_bytes
+            data = b''.join((frm(data[i:i+n], 'little') & mask).to_bytes(n, 'little')
+                            for i in range(0, len(data), n))
+        pb = self._page_bits
+        page_words = 1 << pb
+        addr = offset
+        pos = 0
+        while pos < len(data):
+            idx = addr >> pb
+            start = addr & (page_words - 1)
+            chunk = min(page_words - start, (len(data) - pos) // n)
+            page = self._pages.get(idx)
+            if page is None:
+                page = self._pages[idx] = self._new_page()
+            page[start * n:(start + chunk) * n] = data[pos:pos + chunk * n]
+            pos += chunk * n
+            addr += chunk
+
+    def load(self, values : tp.Iterable, offset : int = 0) -> None:
+        T = type(self).data_t
+        n = self._word_bytes
+        self.load_bytes(b''.join(_coerce(T, v)._value.to_bytes(n, 'little') for v in values), offset)
+
+    def dump_bytes(self, offset : int = 0, count : tp.Optional[int] = None) -> bytes:
+        '''
+        The words at count consecutive addresses starting at offset packed
+        as in load_bytes
+        '''
+        if count is None:
+            count = (1 << self.addr_width) - offset
+        self._check_range(offset, count)
+        n = self._word_bytes
+        pb = self._page_bits
+        page_words = 1 << pb
+        default = None
+        chunks = []
+        addr = offset
+        end = offset + count
+        while addr < end:
+            start = addr & (page_words - 1)
+            chunk = min(page_words - start, end - addr)
+            page = self._pages.get(addr >> pb)
+            if page is None:
+                if default is None:
+                    default = self._new_page()
+                page = default
+            chunks.append(page[start * n:(start + chunk) * n])
+            addr += chunk
+        return b''.join(chunks)
+
+    def dump(self, offset : int = 0, count : tp.Optional[int] = None) -> tp.List[BitVector]:
+        data = self.dump_bytes(offset, count)
+        T = type(self).data_t
+        n = self._word_bytes
+        frm = int.from_bytes
+        return [_make(T, frm(data[i:i+n], 'little')) for i in range(0, len(data), n)]
+
+    def __repr__(self):
+        return f'{type(self)}(pages={len(self._pages)})'
@@ -0,0 +1,196 @@
+from abc import ABCMeta, abstractmethod
+import copyreg
+import operator
+import typing as tp
+import weakref
+
+from .bit_vector_abc import AbstractBitVector, AbstractBit
+from .util import _reduce_type
+
+__all__ = ['AbstractMemoryMeta', 'AbstractMemory']
+
+
+class AbstractMemoryMeta(ABCMeta):
+    # MemoryType, (addr_width, data_width) : MemoryType[addr_width, data_width]
+    _class_cache = weakref.WeakValueDictionary()
+
+    def __new__(mcs, name, bases, namespace, info=(None, None), **kwargs):
+        if '_info_' in namespace:
+            raise TypeError('class attribute _info_ is reversed by the type machinery')
+
+        binding = info[1]
+        for base in bases:
+            if getattr(base, 'is_bound', False):
+                if binding is None:
+                    binding = base.binding
+                elif binding != base.binding:
+                    raise TypeError("Can't inherit from multiple memory types")
+
+        namespace['_info_'] = info[0], binding
+        t = super().__new__(mcs, name, bases, namespace, **kwargs)
+
+        if binding is None:
+            #class is unbound so t.unbound_t -> t
+            t._info_ = t, binding
+        elif info[0] is None:
+            #class inherited from bound type so there is no unbound_t
+            t._info_ = None, binding
+
+        return t
+
+    def __init_subclass__(mcs, **kwargs):
+        super().__init_subclass__(**kwargs)
+        copyreg.pickle(mcs, _reduce_type)
+
+    def _pickle_reduce_(cls):
+        if cls.is_bound and cls._info_[0] is not None:
+            return operator.getitem, (cls.unbound_t, cls.binding)
+        return cls.__qualname__
+
+    def __getitem__(cls, idx : tp.Tuple[int, int]):
+        mcs = type(cls)
+        try:
+            return mcs._class_cache[cls, idx]
+        except KeyError:
+            pass
+
+        if cls.is_bound:
+            raise TypeError(f'{cls} is already bound')
+
+        if not isinstance(idx, tuple) or len(idx) != 2 or tuple(map(type, idx)) != (int, int):
+            raise IndexError('Constructing a memory type requires:\n'
+                    'address bits : int, data bits : int')
+
+        addr_width, data_width = idx
+        if addr_width <= 0 or data_width <= 0:
+            raise ValueError('address bits and data bits must be greater than 0')
+
+        bases = [cls]
+        bases.extend(b[idx] for b in cls.__bases__ if isinstance(b, AbstractMemoryMeta))
+        bases = tuple(bases)
+        class_name = f'{cls.__name__}[{addr_width},{data_width}]'
+        t = mcs(class_name, bases, {}, info=(cls, idx))
+        t.__module__ = cls.__module__
+        mcs._class_cache[cls, idx] = t
+        return t
+
+    @property
+    def unbound_t(cls) -> 'AbstractMemoryMeta':
+        t = cls._info_[0]
+        if t is not None:
+            return t
+        else:
+            raise AttributeError('type {} has no unbound_t'.format(cls))
+
+    @property
+    def is_bound(cls) -> bool:
+        return cls.binding is not None
+
+    @property
+    def binding(cls):
+        return cls._info_[1]
+
+    @property
+    def addr_width(cls) -> int:
+        if cls.is_bound:
+            return cls.binding[0]
+        else:
+            raise AttributeError('unbound type has no addr_width')
+
+    @property
+    def data_width(cls) -> int:
+        if cls.is_bound:
+            return cls.binding[1]
+        else:
+            raise AttributeError('unbound type has no data_width')
+
+    @property
+    def addr_t(cls) -> type:
+        return cls.get_family().BitVector[cls.addr_width]
+
+    @property
+    def data_t(cls) -> type:
+        return cls.get_family().BitVector[cls.data_width]
+
+    def __repr__(cls):
+        return cls.__name__
+
+copyreg.pickle(AbstractMemoryMeta, _reduce_type)
+
+
+class AbstractMemory(metaclass=AbstractMemoryMeta):
+    '''
+    Memory of 2**addr_width words of data_width bits.  Addresses and words
+    are bit vectors of the family of the memory (ints are coerced).
+
+        mem = Memory[16, 8]()
+        mem[addr] = value       # updates mem
+        x = mem[addr]
+        mem2 = mem.store(addr, value)  # functional update, mem is unchanged
+    '''
+    __hash__ = None
+
+    @staticmethod
+    @abstractmethod
+    def get_family():
+        pass
+
+    @property
+    def addr_width(self) -> int:
+        return type(self).addr_width
+
+    @property
+    def data_width(self) -> int:
+        return type(self).data_width
+
+    @abstractmethod
+    def read(self, addr) -> AbstractBitVector:
+        pass
+
+    @abstractmethod
+    def write(self, addr, value) -> None:
+        pass
+
+    def store(self, addr, value) -> 'AbstractMemory':
+        '''
+        Returns a copy of self with value written at addr
+        '''
+        mem = self.copy()
+        mem.write(addr, value)
+        return mem
+
+    @abstractmethod
+    def copy(self) -> 'AbstractMemory':
+        pass
+
+    @abstractmethod
+    def __eq__(self, other) -> AbstractBit:
+        pass
+
+    def __ne__(self, other) -> AbstractBit:
+        return ~(self == other)
+
+    def __getitem__(self, addr) -> AbstractBitVector:
+        return self.read(addr)
+
+    def __setitem__(self, addr, value):
+        self.write(addr, value)
+
+    def __len__(self) -> int:
+        return 1 << self.addr_width
+
+    def load(self, values : tp.Iterable, offset : int = 0) -> None:
+        '''
+        Write the values to consecutive addresses starting at offset
+        '''
+        for k, v in enumerate(values, offset):
+            self.write(k, v)
+
+    def dump(self, offset : int = 0, count : tp.Optional[int] = None) -> tp.List[AbstractBitVector]:
+        '''
+        The words at the count (by default all remaining) consecutive
+        addresses starting at offset
+        '''
+        if count is None:
+            count = len(self) - offset
+        return [self.read(k) for k in range(offset, offset + count)]
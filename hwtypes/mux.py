@@ -0,0 +1,112 @@
+'''
+N-way selection primitives.
+
+    x = mux(values, sel)              # values[sel]
+    x = onehot_mux(values, onehot)    # values[i] where onehot[i] is set
+    x = priority_select(conds, values)  # values[i] for the first conds[i] set
+
+The selects may be of any family.  Symbolic selects build a balanced tree
+of ite (so the depth is logarithmic in the number of values).  Values may
+be anything ite accepts (bits, bit vectors, tuples of those, ...) and the
+result is typed by the rules of ite, e.g. selecting among SIntVector[8]
+and UIntVector[8] values gives a polymorphic value.
+
+Concrete selects (Bit, BitVector) index the values directly and return the
+selected value itself, no ite is built so its type is not unified with the
+types of the other values.
+'''
+import typing as tp
+
+from .bit_vector import Bit, BitVector
+from .bit_vector_abc import AbstractBit, AbstractBitVector
+
+__all__ = ['mux', 'onehot_mux', 'priority_select']
+
+
+def _check_values(values : tp.Sequence, n : int, what : str) -> tp.List:
+    values = list(values)
+    if not values:
+        raise ValueError('Expected at least one value')
+    elif len(values) > n:
+        raise ValueError(f'{len(values)} values cannot be selected by {what}')
+    return values
+
+
+def mux(values : tp.Sequence, sel : AbstractBitVector):
+    '''
+    values[sel], indices past the end select the last value.  A concrete
+    sel returns the selected value itself.
+    '''
+    if not isinstance(sel, AbstractBitVector):
+        raise TypeError(f'Expected a bit vector select not {type(sel)}')
+    values = _check_values(values, 1 << sel.size, f'a {sel.size} bit select')
+    if isinstance(sel, BitVector):
+        return values[min(sel._value, len(values) - 1)]
+
+    # pad to a power of two with the last value so the indices past the
+    # end select it, then reduce pairs level by level from the lsb of sel
+    last = values[-1]
+    k = (len(values) - 1).bit_length()
+    values += [last] * ((1 << k) - len(values))
+    for j in range(k):
+        s = sel[j]
+        # pairs of padding need no ite
+        values = [values[i] if values[i] is values[i + 1] else s.ite(values[i + 1], values[i])
+                  for i in range(0, len(values), 2)]
+    v = values[0]
+    if 0 < k < sel.size:
+        # the remaining bits of sel can only index past the end
+        v = sel[k:].reduce_or().ite(last, v)
+    return v
+
+
+def onehot_mux(values : tp.Sequence, onehot : AbstractBitVector):
+    '''
+    values[i] where onehot[i] is the bit set.  If several bits are set the
+    most significant one wins, if none is set values[0] is selected.  A
+    concrete onehot returns the selected value itself.
+    '''
+    if not isinstance(onehot, AbstractBitVector):
+        raise TypeError(f'Expected a bit vector select not {type(onehot)}')
+    if len(values) != onehot.size:
+        raise ValueError(f'Expected {onehot.size} values not {len(values)}')
+    values = _check_values(values, onehot.size, 'a one hot select')
+    if isinstance(onehot, BitVector):
+        return values[max(onehot._value.bit_length() - 1, 0)]
+
+    def tree(lo, hi):
+        if hi - lo == 1:
+            return values[lo]
+        mid = (lo + hi) // 2
+        return onehot[mid:hi].reduce_or().ite(tree(mid, hi), tree(lo, mid))
+    return tree(0, len(values))
+
+
+def priority_select(conds : tp.Sequence[AbstractBit], values : tp.Sequence):
+    '''
+    values[i] for the first i such that conds[i] is set.  If no condition
+    is set the last value is selected (so the last condition is a don't
+    care).  Concrete conditions return the selected value itself.
+    '''
+    conds = list(conds)
+    if len(conds) != len(values):
+        raise ValueError(f'Expected {len(conds)} values not {len(values)}')
+    values = _check_values(values, len(conds), 'the conditions')
+    if not all(isinstance(c, AbstractBit) for c in conds):
+        raise TypeError('Expected bit conditions')
+    if all(isinstance(c, Bit) for c in conds):
+        for c, v in zip(conds, values):
+            if c:
+                return v
+        return values[-1]
+
+    BV = type(conds[0]).get_family().BitVector
+    # pack the conditions, cond i is bit i
+    cbits = BV[len(conds)](conds)
+
+    def tree(lo, hi):
+        if hi - lo == 1:
+            return values[lo]
+        mid = (lo + hi) // 2
+        return cbits[lo:mid].reduce_or().ite(tree(lo, mid), tree(mid, hi))
+    return tree(0, len(values))
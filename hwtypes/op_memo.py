@@ -0,0 +1,185 @@
+'''
+Memo of the operations of the symbolic families (SMTBit, SMTBitVector,
+z3Bit, z3BitVector).
+
+Symbolic models compute the same sub expressions again and again (a[3],
+x + 1, ... in unrolled loops).  Operations are memoized on the operation,
+the type of self and the identity of the operand terms (terms are hash
+consed by pysmt and z3), so repeating an operation returns a wrapper of the
+same term without building and simplifying the term again.  Operands of
+commutative operations are put in a canonical order, so x + y and y + x
+share an entry.  Integer constants coerced by the operations (the 1 of
+x + 1) are memoized too.
+
+The memo keeps the terms, each hit returns a fresh wrapper, so updating a
+result in place (e.g. with __setitem__) does not change the other results
+of the same operation.
+
+Each SymbolicContext has its own memo, a LRU bounded by its size (the
+functions below apply to the memo of the current context):
+
+    set_op_memo_size(1 << 20)
+    set_op_memo_size(0)     # disable
+    op_memo_info()          # OpMemoInfo(hits, misses, maxsize, currsize)
+
+Mutable and polymorphic values are never memoized as their wrappers can't
+be shared.  Entries are specific to the simplification policy (see
+simplify_policy) they were built under.
+'''
+from collections import namedtuple, OrderedDict
+import functools as ft
+import threading
+
+from .bit_vector_abc import MutableBitVectorMixin
+from .bit_vector_util import PolyBase
+from .simplify_policy import get_simplify_policy
+from .symbolic_context import current_context
+
+__all__ = ['OpMemoInfo', 'set_op_memo_size', 'get_op_memo_size', 'clear_op_memo', 'op_memo_info']
+
+OpMemoInfo = namedtuple('OpMemoInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+_NOMEMO = (MutableBitVectorMixin, PolyBase)
+
+
+class _OpMemo:
+    def __init__(self, maxsize : int):
+        self.maxsize = maxsize
+        # key : (copy of the result, operand terms), the operand terms are
+        # kept alive so their ids are not reused while the entry exists
+        self.table = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # a context (e.g. the default one) may be used by several threads
+        self.lock = threading.Lock()
+
+    def lookup(self, key):
+        table = self.table
+        with self.lock:
+            try:
+                result, _ = table[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            table.move_to_end(key)
+            self.hits += 1
+        return _copy(result)
+
+    def store(self, key, result, keep):
+        table = self.table
+        # the caller owns result, keep a copy which is never handed out
+        entry = _copy(result), keep
+        with self.lock:
+            table[key] = entry
+            while len(table) > self.maxsize:
+                table.popitem(last=False)
+
+
+def _copy(value):
+    # a new wrapper of the same term (without running __init__)
+    new = object.__new__(type(value))
+    new.__dict__.update(value.__dict__)
+    return new
+
+
+_DEFAULT_SIZE = 1 << 16
+
+
+def _get_memo() -> _OpMemo:
+    # each symbolic context has its own memo as the term ids are only
+    # unique within a context
+    ctx = current_context()
+    memo = ctx.op_memo
+    if memo is None:
+        with ctx._lock:
+            memo = ctx.op_memo
+            if memo is None:
+                memo = ctx.op_memo = _OpMemo(_DEFAULT_SIZE)
+    return memo
+
+
+def get_op_memo_size() -> int:
+    return _get_memo().maxsize
+
+
+def set_op_memo_size(maxsize : int) -> None:
+    '''
+    Sets the number of memoized operations, 0 disables the memo
+    '''
+    if not isinstance(maxsize, int) or maxsize < 0:
+        raise ValueError('maxsize must be a non negative int')
+    memo = _get_memo()
+    with memo.lock:
+        memo.maxsize = maxsize
+        table = memo.table
+        while len(table) > maxsize:
+            table.popitem(last=False)
+
+
+def clear_op_memo() -> None:
+    memo = _get_memo()
+    with memo.lock:
+        memo.table.clear()
+        memo.hits = memo.misses = 0
+
+
+def op_memo_info() -> OpMemoInfo:
+    memo = _get_memo()
+    return OpMemoInfo(memo.hits, memo.misses, memo.maxsize, len(memo.table))
+
+
+def memo_op(term_id, commutative : bool = False):
+    '''
+    Memoizes a method fn(self, *args) whose args are ints or values of the
+    family.  term_id maps a value to the id of its term.  The operands of
+    commutative methods are keyed in a canonical order.
+    '''
+    def deco(fn):
+        @ft.wraps(fn)
+        def wrapped(self, *args):
+            T = type(self)
+            memo = _get_memo()
+            if not memo.maxsize or issubclass(T, _NOMEMO):
+                return fn(self, *args)
+            ids = [term_id(self)]
+            keep = [self._value]
+            for a in args:
+                if isinstance(a, int):
+                    ids.append(a)
+                else:
+                    try:
+                        ids.append(term_id(a))
+                    except AttributeError:
+                        # not a value of the family, let fn deal with it
+                        return fn(self, *args)
+                    keep.append(a._value)
+            if commutative and ids[1] < ids[0]:
+                ids[0], ids[1] = ids[1], ids[0]
+            # values built under another simplification policy have
+            # different terms
+            key = (fn, T, get_simplify_policy(), *ids)
+            r = memo.lookup(key)
+            if r is None:
+                r = fn(self, *args)
+                memo.store(key, r, keep)
+            return r
+        return wrapped
+    return deco
+
+
+def memo_const(fn):
+    '''
+    Memoizes a constructor of constants fn(T, value : int)
+    '''
+    @ft.wraps(fn)
+    def wrapped(T, value):
+        memo = _get_memo()
+        if not memo.maxsize or issubclass(T, _NOMEMO):
+            return fn(T, value)
+        key = (fn, T, get_simplify_policy(), value)
+        r = memo.lookup(key)
+        if r is None:
+            r = fn(T, value)
+            memo.store(key, r, ())
+        return r
+    return wrapped
@@ -0,0 +1,236 @@
+'''
+Incremental solving of constraints of the pysmt family.
+
+A Session keeps one backend solver for many queries:
+
+    x = SMTBitVector[8](name='x')
+    with Session() as s:
+        s.add(x > 3)
+        with s.scope():                 # push / pop
+            s.add(x < 2)
+            assert not s.check()
+        if s.check():
+            s.get_value(x)              # BitVector[8]
+        a = s.assumption(x == 7)        # enabled per check
+        assert s.check(a)
+
+Values are mapped to the concrete family: SMTBit to Bit, SMTBitVector[n]
+to BitVector[n] (SMTUIntVector / SMTSIntVector to UIntVector /
+SIntVector), SMTInt to int and SMTFPVector to FPVector.
+
+concretize maps a whole structure of values (tuples, lists and ADT
+instances of values) to the concrete family in one pass over a model:
+
+    with Session() as s:
+        ...
+        if s.check():
+            inst = concretize(s, inst)     # e.g. a Product of SMT values
+
+Terms shared by the values are evaluated once.
+
+The solver is created in the environment of the symbolic context (see
+symbolic_context) current when the session is created, constraints must
+be built in that context.
+'''
+import contextlib
+
+from pysmt.substituter import MGSubstituter
+
+from .adt import Tuple, Sum
+from .adt_util import rebind_type
+from .bit_vector import Bit, BitVector, UIntVector, SIntVector
+from .fp_vector import FPVector
+from .smt_bit_vector import SMTBit, SMTBitVector, SMTUIntVector, SMTSIntVector
+from .smt_fp_vector import SMTFPVector
+from .smt_int import SMTInt
+from .symbolic_context import current_context
+
+__all__ = ['Session', 'concretize']
+
+
+class Session:
+    def __init__(self, *, solver : str = 'z3', logic=None):
+        self._ctx = current_context()
+        self._solver = self._ctx.env.factory.Solver(name=solver, logic=logic)
+        self._levels = 0
+        self._sat = None
+        self.num_checks = 0
+
+    def add(self, *constraints : SMTBit) -> None:
+        for c in constraints:
+            self._solver.add_assertion(_to_term(c))
+        self._sat = None
+
+    def push(self, levels : int = 1) -> None:
+        self._solver.push(levels)
+        self._levels += levels
+        self._sat = None
+
+    def pop(self, levels : int = 1) -> None:
+        if levels > self._levels:
+            raise ValueError(f'Cannot pop {levels} levels, only {self._levels} were pushed')
+        self._solver.pop(levels)
+        self._levels -= levels
+        self._sat = None
+
+    @contextlib.contextmanager
+    def scope(self):
+        '''
+        Constraints added in the with block are dropped at its end
+        '''
+        self.push()
+        try:
+            yield self
+        finally:
+            self.pop()
+
+    @property
+    def levels(self) -> int:
+        return self._levels
+
+    def assumption(self, constraint : SMTBit) -> SMTBit:
+        '''
+        Returns a fresh literal which implies constraint.  The constraint
+        only holds in the checks the literal is passed to.
+        '''
+        # the literal belongs to the context of the session
+        with self._ctx:
+            lit = SMTBit(prefix='__assumption')
+            self.add(~lit | constraint)
+        return lit
+
+    def check(self, *assumptions : SMTBit) -> bool:
+        '''
+        Returns whether the constraints (and the assumptions) are
+        satisfiable
+        '''
+        self.num_checks += 1
+        terms = [_to_term(a) for a in assumptions]
+        self._sat = self._solver.solve(terms or None)
+        return self._sat
+
+    def get_value(self, value):
+        '''
+        The value of value (or of each element of a tuple / list of values)
+        in the model of the last check
+        '''
+        if not self._sat:
+            raise RuntimeError('get_value requires a satisfiable check')
+        if isinstance(value, (tuple, list)):
+            return type(value)(self.get_value(v) for v in value)
+        return _from_constant(value, self._solver.get_value(_to_term(value)))
+
+    def get_model(self):
+        '''
+        The pysmt model of the last check
+        '''
+        if not self._sat:
+            raise RuntimeError('get_model requires a satisfiable check')
+        return self._solver.get_model()
+
+    def reset(self) -> None:
+        '''
+        Drops all constraints (the backend solver is kept)
+        '''
+        self._solver.reset_assertions()
+        self._levels = 0
+        self._sat = None
+
+    def close(self) -> None:
+        self._solver.exit()
+
+    def __enter__(self) -> 'Session':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def concretize(model, values):
+    '''
+    Maps values (a value or a structure of tuples, lists and ADT instances
+    of values) to the concrete family.  model is a Session or a pysmt
+    model.  Other objects (ints, concrete values, enums, ...) are returned
+    as they are.
+    '''
+    if isinstance(model, Session):
+        model = model.get_model()
+    terms = {}
+    _collect_terms(values, terms)
+    _evaluate(model, terms)
+    return _build(values, terms)
+
+
+def _collect_terms(value, terms):
+    if isinstance(value, _LEAF_TYPES):
+        terms.setdefault(_to_term(value))
+    elif isinstance(value, (tuple, list)):
+        for v in value:
+            _collect_terms(v, terms)
+    elif isinstance(value, (Tuple, Sum)):
+        for v in value.value_dict.values():
+            if v is not None:
+                _collect_terms(v, terms)
+
+
+def _evaluate(model, terms):
+    # substitutes the values of the free variables in all the terms with
+    # one substituter, so shared subterms are substituted once
+    env = model.environment
+    fvo = env.fvo
+    symbols = set()
+    for t in terms:
+        symbols.update(fvo.get_free_variables(t))
+    assignment = model.get_values(symbols)
+    substituter = MGSubstituter(env)
+    substituter.invalidate_memoization = False
+    simplify = env.simplifier.simplify
+    for t in terms:
+        terms[t] = simplify(substituter.substitute(t, assignment))
+
+
+def _build(value, terms):
+    if isinstance(value, _LEAF_TYPES):
+        return _from_constant(value, terms[_to_term(value)])
+    elif isinstance(value, (tuple, list)):
+        return type(value)(_build(v, terms) for v in value)
+    elif isinstance(value, (Tuple, Sum)):
+        T = rebind_type(type(value), BitVector.get_family())
+        return T._from_kwargs({k: _build(v, terms)
+                               for k, v in value.value_dict.items()
+                               if v is not None})
+    return value
+
+
+def _concrete_t(T):
+    if issubclass(T, SMTSIntVector):
+        return SIntVector
+    elif issubclass(T, SMTUIntVector):
+        return UIntVector
+    return BitVector
+
+
+def _from_constant(value, constant):
+    if not constant.is_constant():
+        raise ValueError(f'Expected a constant not {constant}')
+    constant = constant.constant_value()
+    if isinstance(value, SMTBit):
+        return Bit(constant)
+    elif isinstance(value, SMTBitVector):
+        return _concrete_t(type(value))[value.size](constant)
+    elif isinstance(value, SMTFPVector):
+        T = type(value)
+        FP = FPVector[T.exponent_size, T.mantissa_size, T.mode, T.ieee_compliance]
+        return FP.reinterpret_from_bv(BitVector[T.size](constant))
+    return constant
+
+
+_LEAF_TYPES = (SMTBit, SMTBitVector, SMTInt, SMTFPVector)
+
+
+def _to_term(value):
+    if isinstance(value, (SMTBit, SMTBitVector, SMTInt)):
+        return value.value
+    elif isinstance(value, SMTFPVector):
+        return value._value
+    raise TypeError(f'Expected a value of the pysmt family not {type(value)}')
@@ -0,0 +1,129 @@
+'''
+When the symbolic families (SMTBit, SMTBitVector, SMTInt, z3Bit,
+z3BitVector) simplify their terms.
+
+    set_simplify_policy(SimplifyPolicy.DEFERRED)
+    with simplify_policy(SimplifyPolicy.PERIODIC, period=64):
+        ...
+
+Policies:
+    EAGER     every constructed value is simplified (the default).  Terms
+              stay small and constant operands fold immediately, but
+              building a deep datapath costs a simplifier pass per
+              operation.  pysmt memoizes the simplifier so each node is
+              visited once, z3.simplify is not memoized so the z3 families
+              revisit the whole term on every operation (quadratic in the
+              depth).
+    NONE      terms are never simplified, construction only builds the
+              term.  Cheapest to build, terms keep every constant
+              operation and solvers / exports see the raw terms.
+    DEFERRED  construction does not simplify, a value built under DEFERRED
+              simplifies its term the first time it is queried through
+              the value property (which is what solvers, substitute,
+              exports etc. use), whatever the policy is at that time.
+              Building costs as much as NONE and each queried term is
+              simplified once, so this is the best choice for large
+              designs which are built once and queried at the end.
+    PERIODIC  one constructed value in period is simplified.  Bounds the
+              growth of unsimplified terms at about 1/period of the cost
+              of EAGER.
+
+set_simplify_policy sets the default policy of the process (EAGER
+initially).  simplify_policy overrides it in the current thread only for
+the duration of the with block, so threads building models (in their own
+symbolic contexts) don't change each other's policy.
+
+Operations of the families always work on the raw terms so the policy only
+changes when the simplifier runs, not the meaning of the values.  Values
+built under one policy remain valid under another.
+'''
+import contextlib
+import enum
+import threading
+import typing as tp
+
+__all__ = ['SimplifyPolicy', 'get_simplify_policy', 'set_simplify_policy', 'simplify_policy']
+
+
+class SimplifyPolicy(enum.Enum):
+    EAGER = 'eager'
+    NONE = 'none'
+    DEFERRED = 'deferred'
+    PERIODIC = 'periodic'
+
+
+_DEFAULT_PERIOD = 64
+
+
+class _Setting:
+    def __init__(self, policy : SimplifyPolicy, period : int):
+        self.policy = policy
+        self.period = period
+        self.count = 0
+
+
+class _Local(threading.local):
+    # the scoped override of the thread, None when the default applies
+    setting = None
+
+
+_default = _Setting(SimplifyPolicy.EAGER, _DEFAULT_PERIOD)
+_local = _Local()
+
+
+def _setting() -> _Setting:
+    setting = _local.setting
+    return _default if setting is None else setting
+
+
+def _make_setting(policy, period) -> _Setting:
+    policy = SimplifyPolicy(policy)
+    if period is None:
+        period = _DEFAULT_PERIOD
+    elif not isinstance(period, int) or period < 1:
+        raise ValueError('period must be a positive int')
+    return _Setting(policy, period)
+
+
+def get_simplify_policy() -> SimplifyPolicy:
+    return _setting().policy
+
+
+def set_simplify_policy(policy : SimplifyPolicy, *, period : tp.Optional[int] = None) -> None:
+    '''
+    Sets the default policy of the process, period is only used by
+    PERIODIC.  Threads in a simplify_policy block keep their override.
+    '''
+    global _default
+    _default = _make_setting(policy, period)
+
+
+@contextlib.contextmanager
+def simplify_policy(policy : SimplifyPolicy, *, period : tp.Optional[int] = None):
+    '''
+    Sets the policy of the current thread for the duration of the with block
+    '''
+    setting = _make_setting(policy, period)
+    saved = _local.setting
+    _local.setting = setting
+    try:
+        yield
+    finally:
+        _local.setting = saved
+
+
+def _simplify_on_construct() -> bool:
+    setting = _setting()
+    if setting.policy is SimplifyPolicy.EAGER:
+        return True
+    elif setting.policy is SimplifyPolicy.PERIODIC:
+        setting.count += 1
+        if setting.count >= setting.period:
+            setting.count = 0
+            return True
+    return False
+
+
+def _defer_simplify() -> bool:
+    # whether a value constructed now simplifies its term when queried
+    return _setting().policy is SimplifyPolicy.DEFERRED
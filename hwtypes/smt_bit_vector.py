@@ -2,33 +2,34 @@ import typing as tp
 import itertools as it
 import functools as ft
 from .bit_vector_abc import AbstractBitVector, AbstractBit, TypeFamily, InconsistentSizeError
+from .bit_vector_abc import MutableBitVectorMixin
+from .simplify_policy import _simplify_on_construct, _defer_simplify
+from .op_memo import memo_op, memo_const
 from .bit_vector_util import build_ite
 from .util import Method
 
 from abc import abstractmethod
 
 import pysmt
-import pysmt.shortcuts as smt
+from .symbolic_context import current_context, shortcuts as smt
 from pysmt.typing import  BVType, BOOL
 
 
-from collections import defaultdict
 import re
 import warnings
-import weakref
 
 import random
 
 __ALL__ = ['SMTBitVector', 'SMTNumVector', 'SMTSIntVector', 'SMTUIntVector']
 
-_var_counters = defaultdict(it.count)
-_name_table = weakref.WeakValueDictionary()
-
 def _gen_name(prefix='V'):
-    name = f'{prefix}_{next(_var_counters[prefix])}'
-    while name in _name_table:
-        name = f'{prefix}_{next(_var_counters[prefix])}'
-    return name
+    return current_context().gen_smt_name(prefix)
+
+def _name_taken(name):
+    return name in current_context().smt_names
+
+def _register_name(name, value):
+    current_context().register_smt_name(name, value)
 
 _name_re = re.compile(r'V_\d+')
 
@@ -43,6 +44,11 @@ class _AUTOMATIC:
 SMYBOLIC = _SMYBOLIC()
 AUTOMATIC = _AUTOMATIC()
 
+def _term_id(value):
+    return value._value.node_id()
+
+_memo_op = ft.partial(memo_op, _term_id)
+
 def bit_cast(fn):
     @ft.wraps(fn)
     def wrapped(self, other):
@@ -69,25 +75,25 @@ class SMTBit(AbstractBit):
         elif name is not AUTOMATIC:
             if not isinstance(name, str):
                 raise TypeError('Name must be string')
-            elif name in _name_table:
+            elif _name_taken(name):
                 raise ValueError(f'Name {name} already in use')
             elif _name_re.fullmatch(name):
                 warnings.warn('Name looks like an auto generated name, this might break things')
-            _name_table[name] = self
+            _register_name(name, self)
         elif prefix is not AUTOMATIC:
             name = _gen_name(prefix)
-            _name_table[name] = self
+            _register_name(name, self)
         elif name is AUTOMATIC and value is SMYBOLIC:
             name = _gen_name()
-            _name_table[name] = self
+            _register_name(name, self)
 
         if value is SMYBOLIC:
             self._value = smt.Symbol(name, BOOL)
         elif isinstance(value, pysmt.fnode.FNode):
-            if value.get_type().is_bool_type():
+            if smt.get_type(value).is_bool_type():
                 self._value = value
             else:
-                raise TypeError(f'Expected bool type not {value.get_type()}')
+                raise TypeError(f'Expected bool type not {smt.get_type(value)}')
         elif isinstance(value, SMTBit):
             if name is not AUTOMATIC and name != value.name:
                 warnings.warn('Changing the name of a SMTBit does not cause a new underlying smt variable to be created')
@@ -104,7 +110,9 @@ class SMTBit(AbstractBit):
             raise TypeError("Can't coerce {} to Bit".format(type(value)))
 
         self._name = name
-        self._value = smt.simplify(self._value)
+        self._deferred = _defer_simplify()
+        if _simplify_on_construct():
+            self._value = smt.simplify(self._value)
 
     def __repr__(self):
         if self._name is not AUTOMATIC:
@@ -114,54 +122,64 @@ class SMTBit(AbstractBit):
 
     @property
     def value(self):
+        if self._deferred:
+            self._value = smt.simplify(self._value)
+            self._deferred = False
         return self._value
 
     @bit_cast
+    @_memo_op(commutative=True)
     def __eq__(self, other : 'SMTBit') -> 'SMTBit':
-        return type(self)(smt.Iff(self.value, other.value))
+        return type(self)(smt.Iff(self._value, other._value))
 
     @bit_cast
+    @_memo_op(commutative=True)
     def __ne__(self, other : 'SMTBit') -> 'SMTBit':
-        return type(self)(smt.Not(smt.Iff(self.value, other.value)))
+        return type(self)(smt.Not(smt.Iff(self._value, other._value)))
 
+    @_memo_op()
     def __invert__(self) -> 'SMTBit':
-        return type(self)(smt.Not(self.value))
+        return type(self)(smt.Not(self._value))
 
     @bit_cast
+    @_memo_op(commutative=True)
     def __and__(self, other : 'SMTBit') -> 'SMTBit':
-        return type(self)(smt.And(self.value, other.value))
+        return type(self)(smt.And(self._value, other._value))
 
     @bit_cast
     def __rand__(self, other):
-        return type(self)(smt.And(other.value, self.value))
+        return type(self)(smt.And(other._value, self._value))
 
     @bit_cast
+    @_memo_op(commutative=True)
     def __or__(self, other : 'SMTBit') -> 'SMTBit':
-        return type(self)(smt.Or(self.value, other.value))
+        return type(self)(smt.Or(self._value, other._value))
 
     @bit_cast
     def __ror__(self, other : 'SMTBit') -> 'SMTBit':
-        return type(self)(smt.Or(other.value, self.value))
+        return type(self)(smt.Or(other._value, self._value))
 
     @bit_cast
+    @_memo_op(commutative=True)
     def __xor__(self, other : 'SMTBit') -> 'SMTBit':
-        return type(self)(smt.Xor(self.value, other.value))
+        return type(self)(smt.Xor(self._value, other._value))
 
     @bit_cast
+    @_memo_op(commutative=True)
     def __xor__(self, other : 'SMTBit') -> 'SMTBit':
-        return type(self)(smt.Xor(other.value, self.value))
+        return type(self)(smt.Xor(other._value, self._value))
 
     def ite(self, t_branch, f_branch):
         def _ite(select, t_branch, f_branch):
-            return smt.Ite(select.value, t_branch.value, f_branch.value)
+            return smt.Ite(select._value, t_branch._value, f_branch._value)
 
 
         return build_ite(_ite, self, t_branch, f_branch)
 
     def substitute(self, *subs : tp.List[tp.Tuple['SMTBit', 'SMTBit']]):
         return SMTBit(
-            self.value.substitute(
-                {from_.value:to.value for from_, to in subs}
+            smt.substitute(self._value,
+                {from_._value:to._value for from_, to in subs}
             )
         )
 
@@ -170,6 +188,8 @@ class SMTBit(AbstractBit):
 
 
 def _coerce(T : tp.Type['SMTBitVector'], val : tp.Any) -> 'SMTBitVector':
+    if type(val) is int:
+        return _const(T, val)
     if not isinstance(val, SMTBitVector):
         return T(val)
     elif val.size != T.size:
@@ -178,6 +198,11 @@ def _coerce(T : tp.Type['SMTBitVector'], val : tp.Any) -> 'SMTBitVector':
         return val
 
 
+@memo_const
+def _const(T, val : int):
+    return T(val)
+
+
 def bv_cast(fn : tp.Callable[['SMTBitVector', 'SMTBitVector'], tp.Any]) -> tp.Callable[['SMTBitVector', tp.Any], tp.Any]:
     @ft.wraps(fn)
     def wrapped(self : 'SMTBitVector', other : tp.Any) -> tp.Any:
@@ -233,17 +258,17 @@ class SMTBitVector(AbstractBitVector):
         elif name is not AUTOMATIC:
             if not isinstance(name, str):
                 raise TypeError('Name must be string')
-            elif name in _name_table:
+            elif _name_taken(name):
                 raise ValueError(f'Name {name} already in use')
             elif _name_re.fullmatch(name):
                 warnings.warn('Name looks like an auto generated name, this might break things')
-            _name_table[name] = self
+            _register_name(name, self)
         elif prefix is not AUTOMATIC:
             name = _gen_name(prefix)
-            _name_table[name] = self
+            _register_name(name, self)
         elif name is AUTOMATIC and value is SMYBOLIC:
             name = _gen_name()
-            _name_table[name] = self
+            _register_name(name, self)
 
         self._name = name
 
@@ -252,7 +277,7 @@ class SMTBitVector(AbstractBitVector):
         if value is SMYBOLIC:
             self._value = smt.Symbol(name, T)
         elif isinstance(value, pysmt.fnode.FNode):
-            t = value.get_type()
+            t = smt.get_type(value)
             if t is T:
                 self._value = value
             else:
@@ -265,21 +290,21 @@ class SMTBitVector(AbstractBitVector):
 
             if ext < 0:
                 warnings.warn('Truncating value from {} to {}'.format(type(value), type(self)))
-                self._value = value[:self.size].value
+                self._value = value[:self.size]._value
             elif ext > 0:
-                self._value = value.zext(ext).value
+                self._value = value.zext(ext)._value
             else:
-                self._value = value.value
+                self._value = value._value
 
         elif isinstance(value, SMTBit):
-            self._value = smt.Ite(value.value, smt.BVOne(self.size), smt.BVZero(self.size))
+            self._value = smt.Ite(value._value, smt.BVOne(self.size), smt.BVZero(self.size))
 
         elif isinstance(value, tp.Sequence):
             if len(value) != self.size:
                 raise ValueError('Iterable is not the correct size')
             cls = type(self)
             B1 = cls.unsized_t[1]
-            self._value = ft.reduce(lambda acc, elem : acc.concat(elem), map(B1, value)).value
+            self._value = ft.reduce(lambda acc, elem : acc.concat(elem), map(B1, value))._value
         elif isinstance(value, int):
             self._value =  smt.BV(value % (1 << self.size), self.size)
 
@@ -289,8 +314,10 @@ class SMTBitVector(AbstractBitVector):
         else:
             raise TypeError("Can't coerce {} to SMTBitVector".format(type(value)))
 
-        self._value = smt.simplify(self._value)
-        assert self._value.get_type() is T
+        self._deferred = _defer_simplify()
+        if _simplify_on_construct():
+            self._value = smt.simplify(self._value)
+        assert smt.get_type(self._value) is T
 
     def make_constant(self, value, size:tp.Optional[int]=None):
         if size is None:
@@ -299,6 +326,9 @@ class SMTBitVector(AbstractBitVector):
 
     @property
     def value(self):
+        if self._deferred:
+            self._value = smt.simplify(self._value)
+            self._deferred = False
         return self._value
 
     @property
@@ -333,8 +363,8 @@ class SMTBitVector(AbstractBitVector):
             elif step != 1:
                 raise IndexError('SMT extract does not support step != 1')
 
-            v = self.value[start:stop-1]
-            return type(self).unsized_t[v.get_type().width](v)
+            v = smt.BVExtract(self._value, start, stop-1)
+            return type(self).unsized_t[stop - start](v)
         elif isinstance(index, int):
             if index < 0:
                 index = size+index
@@ -342,131 +372,180 @@ class SMTBitVector(AbstractBitVector):
             if not (0 <= index < size):
                 raise IndexError()
 
-            v = self.value[index]
-            return self.get_family().Bit(smt.Equals(v, smt.BV(1, 1)))
+            return self._get_bit_(index)
         else:
             raise TypeError()
 
 
+    @_memo_op()
+    def _get_bit_(self, index):
+        v = smt.BVExtract(self._value, index, index)
+        return self.get_family().Bit(smt.Equals(v, smt.BV(1, 1)))
+
     def __setitem__(self, index, value):
+        size = self.size
         if isinstance(index, slice):
-            raise NotImplementedError()
+            start, stop, step = index.indices(size)
+            if step != 1:
+                raise IndexError('SMT extract does not support step != 1')
+            stop = max(start, stop)
+            value = _coerce(type(self).unsized_t[stop - start], value)
         else:
             if not (isinstance(value, bool) or isinstance(value, SMTBit) or (isinstance(value, int) and value in {0, 1})):
                 raise ValueError("Second argument __setitem__ on a single BitVector index should be a bit, boolean or 0 or 1, not {value}".format(value=value))
 
             if index < 0:
-                index = self.size+index
+                index = size+index
 
-            if not (0 <= index < self.size):
+            if not (0 <= index < size):
                 raise IndexError()
 
-            mask = type(self)(1 << index)
-            self._value = SMTBit(value).ite(self | mask,  self & ~mask)._value
-
+            start, stop = index, index + 1
+            value = type(self).unsized_t[1](SMTBit(value))
+
+        if start == stop:
+            return
+        # splice the new bits between extracts of the old ones
+        v = self._value
+        new = value._value
+        if stop < size:
+            new = smt.BVConcat(smt.BVExtract(v, stop, size - 1), new)
+        if start > 0:
+            new = smt.BVConcat(new, smt.BVExtract(v, 0, start - 1))
+        self._assign_(type(self)(new))
+
+    def _assign_(self, other):
+        self._name = AUTOMATIC
+        self._value = other._value
+        self._deferred = other._deferred
 
     def __len__(self):
         return self.size
 
+    @_memo_op()
     def concat(self, other):
         T = type(self).unsized_t
         if not isinstance(other, T):
             raise TypeError(f'value must of type {T} not {type(other)}')
-        return T[self.size + other.size](smt.BVConcat(other.value, self.value))
+        return T[self.size + other.size](smt.BVConcat(other._value, self._value))
 
+    @_memo_op()
     def bvnot(self):
-        return type(self)(smt.BVNot(self.value))
+        return type(self)(smt.BVNot(self._value))
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvand(self, other):
-        return type(self)(smt.BVAnd(self.value, other.value))
+        return type(self)(smt.BVAnd(self._value, other._value))
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvnand(self, other):
-        return type(self)(smt.BVNot(smt.BVAnd(self.value, other.value)))
+        return type(self)(smt.BVNot(smt.BVAnd(self._value, other._value)))
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvor(self, other):
-        return type(self)(smt.BVOr(self.value, other.value))
+        return type(self)(smt.BVOr(self._value, other._value))
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvnor(self, other):
-        return type(self)(smt.BVNot(smt.BVOr(self.value, other.value)))
+        return type(self)(smt.BVNot(smt.BVOr(self._value, other._value)))
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvxor(self, other):
-        return type(self)(smt.BVXor(self.value, other.value))
+        return type(self)(smt.BVXor(self._value, other._value))
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvxnor(self, other):
-        return type(self)(smt.BVNot(smt.BVXor(self.value, other.value)))
+        return type(self)(smt.BVNot(smt.BVXor(self._value, other._value)))
 
     @bv_cast
+    @_memo_op()
     def bvshl(self, other):
-        return type(self)(smt.BVLShl(self.value, other.value))
+        return type(self)(smt.BVLShl(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvlshr(self, other):
-        return type(self)(smt.BVLShr(self.value, other.value))
+        return type(self)(smt.BVLShr(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvashr(self, other):
-        return type(self)(smt.BVAShr(self.value, other.value))
+        return type(self)(smt.BVAShr(self._value, other._value))
 
     @int_cast
+    @_memo_op()
     def bvrol(self, other):
-        return type(self)(smt.get_env().formula_manager.BVRol(self.value, other))
+        return type(self)(smt.get_env().formula_manager.BVRol(self._value, other))
 
     @int_cast
+    @_memo_op()
     def bvror(self, other):
-        return type(self)(smt.get_env().formula_manager.BVRor(self.value, other))
+        return type(self)(smt.get_env().formula_manager.BVRor(self._value, other))
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvcomp(self, other):
-        return type(self).unsized_t[1](smt.BVComp(self.value, other.value))
+        return type(self).unsized_t[1](smt.BVComp(self._value, other._value))
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bveq(self,  other):
-        return self.get_family().Bit(smt.Equals(self.value, other.value))
+        return self.get_family().Bit(smt.Equals(self._value, other._value))
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvne(self, other):
-        return self.get_family().Bit(smt.NotEquals(self.value, other.value))
+        return self.get_family().Bit(smt.NotEquals(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvult(self, other):
-        return self.get_family().Bit(smt.BVULT(self.value, other.value))
+        return self.get_family().Bit(smt.BVULT(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvule(self, other):
-        return self.get_family().Bit(smt.BVULE(self.value, other.value))
+        return self.get_family().Bit(smt.BVULE(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvugt(self, other):
-        return self.get_family().Bit(smt.BVUGT(self.value, other.value))
+        return self.get_family().Bit(smt.BVUGT(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvuge(self, other):
-        return self.get_family().Bit(smt.BVUGE(self.value, other.value))
+        return self.get_family().Bit(smt.BVUGE(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvslt(self, other):
-        return self.get_family().Bit(smt.BVSLT(self.value, other.value))
+        return self.get_family().Bit(smt.BVSLT(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvsle(self, other):
-        return self.get_family().Bit(smt.BVSLE(self.value, other.value))
+        return self.get_family().Bit(smt.BVSLE(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvsgt(self, other):
-        return self.get_family().Bit(smt.BVSGT(self.value, other.value))
+        return self.get_family().Bit(smt.BVSGT(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvsge(self, other):
-        return self.get_family().Bit(smt.BVSGE(self.value, other.value))
+        return self.get_family().Bit(smt.BVSGE(self._value, other._value))
 
+    @_memo_op()
     def bvneg(self):
-        return type(self)(smt.BVNeg(self.value))
+        return type(self)(smt.BVNeg(self._value))
 
     def adc(self, other : 'SMTBitVector', carry : SMTBit) -> tp.Tuple['BitVector', SMTBit]:
         """
@@ -490,32 +569,39 @@ class SMTBitVector(AbstractBitVector):
         return self.bvne(0).ite(t_branch, f_branch)
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvadd(self, other):
-        return type(self)(smt.BVAdd(self.value, other.value))
+        return type(self)(smt.BVAdd(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvsub(self, other):
-        return type(self)(smt.BVSub(self.value, other.value))
+        return type(self)(smt.BVSub(self._value, other._value))
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvmul(self, other):
-        return type(self)(smt.BVMul(self.value, other.value))
+        return type(self)(smt.BVMul(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvudiv(self, other):
-        return type(self)(smt.BVUDiv(self.value, other.value))
+        return type(self)(smt.BVUDiv(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvurem(self, other):
-        return type(self)(smt.BVURem(self.value, other.value))
+        return type(self)(smt.BVURem(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvsdiv(self, other):
-        return type(self)(smt.BVSDiv(self.value, other.value))
+        return type(self)(smt.BVSDiv(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvsrem(self, other):
-        return type(self)(smt.BVSRem(self.value, other.value))
+        return type(self)(smt.BVSRem(self._value, other._value))
 
     def __invert__(self): return self.bvnot()
 
@@ -559,28 +645,31 @@ class SMTBitVector(AbstractBitVector):
     __lt__ = dispatch_oper(bvult)
 
     @int_cast
+    @_memo_op()
     def repeat(self, other):
-        return type(self)(smt.get_env().formula_manager.BVRepeat(self.value, other))
+        return type(self)(smt.get_env().formula_manager.BVRepeat(self._value, other))
 
     @int_cast
+    @_memo_op()
     def sext(self, ext):
         if ext < 0:
             raise ValueError()
-        return type(self).unsized_t[self.size + ext](smt.BVSExt(self.value, ext))
+        return type(self).unsized_t[self.size + ext](smt.BVSExt(self._value, ext))
 
     def ext(self, ext):
         return self.zext(ext)
 
     @int_cast
+    @_memo_op()
     def zext(self, ext):
         if ext < 0:
             raise ValueError()
-        return type(self).unsized_t[self.size + ext](smt.BVZExt(self.value, ext))
+        return type(self).unsized_t[self.size + ext](smt.BVZExt(self._value, ext))
 
     def substitute(self, *subs : tp.List[tp.Tuple["SBV", "SBV"]]):
         return SMTBitVector[self.size](
-            self.value.substitute(
-                {from_.value:to.value for from_, to in subs}
+            smt.substitute(self._value,
+                {from_._value:to._value for from_, to in subs}
             )
         )
 
@@ -679,4 +768,10 @@ class SMTSIntVector(SMTNumVector):
 
 
 
+class SMTMutableBitVector(MutableBitVectorMixin, SMTBitVector):
+    '''
+    SMTBitVector whose term can be updated in place, e.g. acc += x or
+    reg[i] = b replace the term held by acc / reg
+    '''
+
 _Family_ = TypeFamily(SMTBit, SMTBitVector, SMTUIntVector, SMTSIntVector)
@@ -1,10 +1,11 @@
 import weakref
 
 import pysmt
-import pysmt.shortcuts as shortcuts
 from pysmt.typing import  BVType, BOOL, FunctionType
 
 from .smt_bit_vector import SMTBit, SMTBitVector, SMTSIntVector, SMYBOLIC, AUTOMATIC
+from .smt_bit_vector import _name_taken, _register_name
+from .symbolic_context import shortcuts as smt
 from .fp_vector_abc import AbstractFPVector, RoundingMode
 
 # using None to represent cls
@@ -35,10 +36,36 @@ _SIGS = [
     ('fp_is_positive', None, BOOL,),
 ]
 
-_name_table = weakref.WeakValueDictionary()
+# environment : type : name : uninterpreted function, the functions are
+# declared in the environment of the symbolic context they are used in
 _uf_table = weakref.WeakKeyDictionary()
 
 
+def _ufs(cls):
+    env = smt.get_env()
+    try:
+        table = _uf_table[env]
+    except KeyError:
+        table = _uf_table[env] = weakref.WeakKeyDictionary()
+    try:
+        return table[cls]
+    except KeyError:
+        pass
+    ufs = {}
+    T = BVType(cls.size)
+    for method_name, *args in _SIGS:
+        args = [T if x is None else x for x in args]
+        rtype = args[-1]
+        params = args[:-1]
+        name = '.'.join((cls.__name__, method_name))
+        ufs[method_name] = smt.Symbol(name, FunctionType(rtype, params))
+
+    ufs['to_sbv'] = dict()
+    ufs['to_ubv'] = dict()
+    table[cls] = ufs
+    return ufs
+
+
 class SMTFPVector(AbstractFPVector):
     def __init__(self, value=SMYBOLIC, *, name=AUTOMATIC):
         if name is not AUTOMATIC and value is not SMYBOLIC:
@@ -46,53 +73,40 @@ class SMTFPVector(AbstractFPVector):
         elif name is not AUTOMATIC:
             if not isinstance(name, str):
                 raise TypeError('Name must be string')
-            elif name in _name_table:
+            elif _name_taken(name):
                 raise ValueError(f'Name {name} already in use')
-            _name_table[name] = self
+            _register_name(name, self)
 
         T = BVType(self.size)
 
         if value is SMYBOLIC:
             if name is AUTOMATIC:
-                value = shortcuts.FreshSymbol(T)
+                value = smt.FreshSymbol(T)
             else:
-                value = shortcuts.Symbol(name, T)
+                value = smt.Symbol(name, T)
         elif isinstance(value, pysmt.fnode.FNode):
-            t = value.get_type()
+            t = smt.get_type(value)
             if t is not T:
                 raise TypeError(f'Expected {T} not {t}')
         elif isinstance(value, type(self)):
             value = value._value
         elif isinstance(value, int):
-            value = shortcuts.BV(value, self.size)
+            value = smt.BV(value, self.size)
         else:
             raise TypeError(f"Can't coerce {value} to SMTFPVector")
 
         self._name = name
         self._value = value
 
-    def __init_subclass__(cls):
-        _uf_table[cls] = ufs = dict()
-        T = BVType(cls.size)
-        for method_name, *args in _SIGS:
-            args = [T if x is None else x for x in args]
-            rtype = args[-1]
-            params = args[:-1]
-            name = '.'.join((cls.__name__, method_name))
-            ufs[method_name] = shortcuts.Symbol(name, FunctionType(rtype, params))
-
-        ufs['to_sbv'] = dict()
-        ufs['to_ubv'] = dict()
-
     @classmethod
     def _fp_method(cls, method_name, *args):
-        uf = _uf_table[cls][method_name]
-        return cls(uf(*args))
+        uf = _ufs(cls)[method_name]
+        return cls(smt.Function(uf, args))
 
     @classmethod
     def _bit_method(cls, method_name, *args):
-        uf = _uf_table[cls][method_name]
-        return SMTBit(uf(*args))
+        uf = _ufs(cls)[method_name]
+        return SMTBit(smt.Function(uf, args))
 
     def fp_abs(self) -> 'SMTFPVector':
         return self._fp_method('fp_abs', self._value)
@@ -168,27 +182,27 @@ class SMTFPVector(AbstractFPVector):
 
     def to_ubv(self, size : int) -> SMTBitVector:
         cls = type(self)
-        ufs = _uf_table[cls]['to_ubv']
+        ufs = _ufs(cls)['to_ubv']
         if size not in ufs:
             name = '.'.join((cls.__name__, f'to_ubv[{size}]'))
-            ufs[size] = shortcuts.Symbol(
+            ufs[size] = smt.Symbol(
                 name,
                 FunctionType(BVType(size), (BVType(self.size),))
             )
 
-        return SMTBitVector[size](ufs[size](self._value))
+        return SMTBitVector[size](smt.Function(ufs[size], (self._value,)))
 
     def to_sbv(self, size : int) -> SMTBitVector:
         cls = type(self)
-        ufs = _uf_table[cls]['to_usbv']
+        ufs = _ufs(cls)['to_sbv']
         if size not in ufs:
             name = '.'.join((cls.__name__, f'to_sbv[{size}]'))
-            ufs[size] = shortcuts.Symbol(
+            ufs[size] = smt.Symbol(
                 name,
                 FunctionType(BVType(size), (BVType(self.size),))
             )
 
-        return SMTBitVector[size](ufs[size](self._value))
+        return SMTBitVector[size](smt.Function(ufs[size], (self._value,)))
 
     def reinterpret_as_bv(self) -> SMTBitVector:
         return SMTBitVector[self.size](self._value)
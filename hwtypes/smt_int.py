@@ -1,8 +1,9 @@
 import functools as ft
-from .smt_bit_vector import SMTBit, SMTBitVector, _gen_name, _name_re, _name_table, SMYBOLIC, AUTOMATIC
+from .smt_bit_vector import SMTBit, SMTBitVector, _gen_name, _name_re, _name_taken, _register_name, SMYBOLIC, AUTOMATIC
+from .simplify_policy import _simplify_on_construct, _defer_simplify
 
 import pysmt
-import pysmt.shortcuts as smt
+from .symbolic_context import shortcuts as smt
 from pysmt.typing import INT
 
 import warnings
@@ -32,31 +33,31 @@ class SMTInt:
         elif name is not AUTOMATIC:
             if not isinstance(name, str):
                 raise TypeError('Name must be string')
-            elif name in _name_table:
+            elif _name_taken(name):
                 raise ValueError(f'Name {name} already in use')
             elif _name_re.fullmatch(name):
                 warnings.warn('Name looks like an auto generated name, this might break things')
-            _name_table[name] = self
+            _register_name(name, self)
         elif prefix is not AUTOMATIC:
             name = _gen_name(prefix)
-            _name_table[name] = self
+            _register_name(name, self)
         elif name is AUTOMATIC and value is SMYBOLIC:
             name = _gen_name()
-            _name_table[name] = self
+            _register_name(name, self)
 
         if value is SMYBOLIC:
             self._value = smt.Symbol(name, INT)
         elif isinstance(value, pysmt.fnode.FNode):
-            if value.get_type().is_int_type():
+            if smt.get_type(value).is_int_type():
                 self._value = value
-            elif value.get_type().is_bv_type():
+            elif smt.get_type(value).is_bv_type():
                 self._value = smt.BVToNatural(value)
             else:
-                raise TypeError(f'Expected int type not {value.get_type()}')
+                raise TypeError(f'Expected int type not {smt.get_type(value)}')
         elif isinstance(value, SMTInt):
             self._value = value._value
         elif isinstance(value, SMTBitVector):
-            self._value = smt.BVToNatural(value.value)
+            self._value = smt.BVToNatural(value._value)
         elif isinstance(value, bool):
             self._value = smt.Int(int(value))
         elif isinstance(value, int):
@@ -67,7 +68,9 @@ class SMTInt:
             raise TypeError("Can't coerce {} to Int".format(type(value)))
 
         self._name = name
-        self._value = smt.simplify(self._value)
+        self._deferred = _defer_simplify()
+        if _simplify_on_construct():
+            self._value = smt.simplify(self._value)
 
     def __repr__(self):
         if self._name is not AUTOMATIC:
@@ -77,6 +80,9 @@ class SMTInt:
 
     @property
     def value(self):
+        if self._deferred:
+            self._value = smt.simplify(self._value)
+            self._deferred = False
         return self._value
 
     def __neg__(self):
@@ -84,54 +90,54 @@ class SMTInt:
 
     @int_cast
     def __sub__(self, other: 'SMTInt') -> 'SMTInt':
-        return SMTInt(self.value - other.value)
+        return SMTInt(smt.Minus(self._value, other._value))
 
     @int_cast
     def __rsub__(self, other: 'SMTInt') -> 'SMTInt':
-        return SMTInt(other.value - self.value)
+        return SMTInt(smt.Minus(other._value, self._value))
 
     @int_cast
     def __add__(self, other: 'SMTInt') -> 'SMTInt':
-        return SMTInt(self.value + other.value)
+        return SMTInt(smt.Plus(self._value, other._value))
 
     def __radd__(self, other: 'SMTInt') -> 'SMTInt':
         return self + other
 
     @int_cast
     def __mul__(self, other: 'SMTInt') -> 'SMTInt':
-        return SMTInt(self.value * other.value)
+        return SMTInt(smt.Times(self._value, other._value))
 
     def __rmul__(self, other: 'SMTInt') -> 'SMTInt':
         return self * other
 
     @int_cast
     def __floordiv__(self, other: 'SMTInt') -> 'SMTInt':
-        return SMTInt(smt.Div(self.value, other.value))
+        return SMTInt(smt.Div(self._value, other._value))
 
     @int_cast
     def __rfloordiv__(self, other: 'SMTInt') -> 'SMTInt':
-        return SMTInt(smt.Div(other.value, self.value))
+        return SMTInt(smt.Div(other._value, self._value))
 
     @int_cast
     def __ge__(self, other: 'SMTInt') -> SMTBit:
-        return SMTBit(self.value >= other.value)
+        return SMTBit(smt.GE(self._value, other._value))
 
     @int_cast
     def __gt__(self, other: 'SMTInt') -> SMTBit:
-        return SMTBit(self.value > other.value)
+        return SMTBit(smt.GT(self._value, other._value))
 
     @int_cast
     def __le__(self, other: 'SMTInt') -> SMTBit:
-        return SMTBit(self.value <= other.value)
+        return SMTBit(smt.LE(self._value, other._value))
 
     @int_cast
     def __lt__(self, other: 'SMTInt') -> SMTBit:
-        return SMTBit(self.value < other.value)
+        return SMTBit(smt.LT(self._value, other._value))
 
     @int_cast
     def __eq__(self, other: 'SMTInt') -> SMTBit:
-        return SMTBit(smt.Equals(self.value, other.value))
+        return SMTBit(smt.Equals(self._value, other._value))
 
     @int_cast
     def __ne__(self, other: 'SMTInt') -> SMTBit:
-        return SMTBit(smt.NotEquals(self.value, other.value))
+        return SMTBit(smt.NotEquals(self._value, other._value))
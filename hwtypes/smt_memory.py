@@ -0,0 +1,102 @@
+import typing as tp
+
+import pysmt
+from .symbolic_context import shortcuts as smt
+from pysmt.typing import ArrayType, BVType
+
+from .smt_bit_vector import SMTBit, SMTBitVector, _Family_, _coerce
+from .smt_bit_vector import SMYBOLIC, AUTOMATIC, _gen_name, _name_taken, _register_name
+from .memory_abc import AbstractMemory
+
+__all__ = ['SMTMemory']
+
+
+class SMTMemory(AbstractMemory):
+    '''
+    Memory as a pysmt array term, see AbstractMemory.  Reads and writes
+    build Select / Store terms so the size of the terms does not depend on
+    the size of the memory.
+
+    SMTMemory[A, D]() is a fresh array variable, SMTMemory[A, D](value)
+    with value an int or SMTBitVector[D] the array holding value everywhere.
+    '''
+    @staticmethod
+    def get_family():
+        return _Family_
+
+    def __init__(self, value=SMYBOLIC, *, name=AUTOMATIC, prefix=AUTOMATIC):
+        T = type(self)
+        if not T.is_bound:
+            raise TypeError(f'{T} is not bound, use {T}[addr_width, data_width]')
+        if (name is not AUTOMATIC or prefix is not AUTOMATIC) and value is not SMYBOLIC:
+            raise TypeError('Can only name symbolic variables')
+        elif name is not AUTOMATIC and prefix is not AUTOMATIC:
+            raise ValueError('Can only set either name or prefix not both')
+        elif name is not AUTOMATIC:
+            if not isinstance(name, str):
+                raise TypeError('Name must be string')
+            elif _name_taken(name):
+                raise ValueError(f'Name {name} already in use')
+            _register_name(name, self)
+        elif value is SMYBOLIC:
+            name = _gen_name('M' if prefix is AUTOMATIC else prefix)
+            _register_name(name, self)
+
+        self._name = name
+        AT = ArrayType(BVType(T.addr_width), BVType(T.data_width))
+        if value is SMYBOLIC:
+            self._value = smt.Symbol(name, AT)
+        elif isinstance(value, pysmt.fnode.FNode):
+            t = smt.get_type(value)
+            if t != AT:
+                raise TypeError(f'Expected {AT} not {t}')
+            self._value = value
+        elif isinstance(value, SMTMemory):
+            if type(value) is not T:
+                raise TypeError(f'Expected {T} not {type(value)}')
+            self._value = value._value
+        else:
+            default = _coerce(T.data_t, value)
+            self._value = smt.Array(BVType(T.addr_width), default._value)
+
+    @property
+    def value(self):
+        return self._value
+
+    def __repr__(self):
+        if self._name is not AUTOMATIC:
+            return f'{type(self)}({self._name})'
+        else:
+            return f'{type(self)}({self._value})'
+
+    def read(self, addr) -> SMTBitVector:
+        addr = _coerce(type(self).addr_t, addr)
+        return type(self).data_t(smt.Select(self._value, addr._value))
+
+    def write(self, addr, value) -> None:
+        T = type(self)
+        addr = _coerce(T.addr_t, addr)
+        value = _coerce(T.data_t, value)
+        self._name = AUTOMATIC
+        self._value = smt.Store(self._value, addr._value, value._value)
+
+    def copy(self) -> 'SMTMemory':
+        return type(self)(self)
+
+    def __eq__(self, other) -> SMTBit:
+        if not isinstance(other, SMTMemory):
+            return NotImplemented
+        elif type(other) is not type(self):
+            raise TypeError(f'Cannot compare {type(self)} and {type(other)}')
+        return SMTBit(smt.Equals(self._value, other._value))
+
+    def ite(self, select : SMTBit, other : 'SMTMemory') -> 'SMTMemory':
+        '''
+        select ? self : other
+        '''
+        if type(other) is not type(self):
+            raise TypeError(f'Expected {type(self)} not {type(other)}')
+        return type(self)(smt.Ite(SMTBit(select)._value, self._value, other._value))
+
+    def substitute(self, *subs : tp.List[tp.Tuple[tp.Any, tp.Any]]) -> 'SMTMemory':
+        return type(self)(smt.substitute(self._value, {a.value : b.value for a, b in subs}))
@@ -0,0 +1,172 @@
+'''
+Bulk seeded random stimulus generation.
+
+    rng = random.Random(seed)
+    xs = random_values(BitVector[16], 1 << 20, rng, corner_prob=0.1)
+    insts = random_values(Inst, 1000, rng)          # ADT types work too
+    arr = random_array(BitVector[16], 1 << 20, rng) # numpy backed batch
+
+The random bits for a whole batch are drawn with a single getrandbits call
+and sliced into values, so the cost per value is a few int operations.  The
+results only depend on the state of rng so runs are reproducible.
+
+Corner cases:  a fraction corner_prob of the values (chosen at random
+positions) is replaced by a corner case pattern drawn according to corner
+weights (by default uniformly):
+    'zero'    0
+    'ones'    all ones (-1)
+    'min'     MIN_INT, only the msb set
+    'max'     MAX_INT, all bits but the msb set
+    'onehot'  a single random bit set
+Corner cases apply to the leaves (bit vectors) of ADT types.  FPVector values
+are generated as random bit patterns.
+'''
+import random
+import typing as tp
+
+from .bit_vector import Bit, BitVector, _make
+from .bit_vector_array import BitArray, np, _require_numpy, _array_type
+from .fp_vector_abc import AbstractFPVector
+from .adt import Tuple, Sum, Enum, TaggedUnion
+
+__all__ = ['random_values', 'random_array', 'CORNER_KINDS']
+
+CORNER_KINDS = ('zero', 'ones', 'min', 'max', 'onehot')
+
+
+def _rng(rng) -> random.Random:
+    if rng is None or isinstance(rng, int):
+        return random.Random(rng)
+    return rng
+
+
+def _random_ints(width : int, count : int, rng : random.Random) -> tp.List[int]:
+    if width == 0 or count == 0:
+        return [0] * count
+    nb = (width + 7) // 8
+    buf = rng.getrandbits(8 * nb * count).to_bytes(nb * count, 'little')
+    frm = int.from_bytes
+    if width == 8 * nb:
+        return [frm(buf[i:i+nb], 'little') for i in range(0, nb * count, nb)]
+    mask = (1 << width) - 1
+    return [frm(buf[i:i+nb], 'little') & mask for i in range(0, nb * count, nb)]
+
+
+def _corner_positions(width, count, rng, corner_prob, corners):
+    '''
+    Returns a list of (index, value) of the corner cases to insert
+    '''
+    if not corner_prob or width == 0 or count == 0:
+        return []
+    if not 0 <= corner_prob <= 1:
+        raise ValueError('corner_prob must be in [0, 1]')
+    if corners is None:
+        kinds, weights = CORNER_KINDS, None
+    else:
+        for kind in corners:
+            if kind not in CORNER_KINDS:
+                raise ValueError(f'Unknown corner case {kind}, expected one of {CORNER_KINDS}')
+        kinds, weights = tuple(corners.keys()), tuple(corners.values())
+
+    mask = (1 << width) - 1
+    msb = 1 << (width - 1)
+    fixed = {'zero' : 0, 'ones' : mask, 'min' : msb, 'max' : mask ^ msb}
+
+    k = round(corner_prob * count)
+    idx = rng.sample(range(count), k)
+    chosen = rng.choices(kinds, weights, k=k)
+    return [(i, fixed[kind] if kind != 'onehot' else 1 << rng.randrange(width))
+            for i, kind in zip(idx, chosen)]
+
+
+def _random_bits(width, count, rng, corner_prob, corners):
+    ints = _random_ints(width, count, rng)
+    for i, v in _corner_positions(width, count, rng, corner_prob, corners):
+        ints[i] = v
+    return ints
+
+
+def _sum_variants(T):
+    if issubclass(T, TaggedUnion):
+        return list(T.field_dict.items())
+    # the fields of a Sum are unordered, sort them so the stream of values
+    # only depends on the seed
+    return sorted(((t.__name__, t) for t in T.fields), key=lambda x: x[0])
+
+
+def random_values(T : type, count : int,
+        rng : tp.Union[random.Random, int, None] = None, *,
+        corner_prob : float = 0.0,
+        corners : tp.Optional[tp.Mapping[str, float]] = None) -> list:
+    '''
+    Returns a list of count random values of type T, which may be Bit,
+    BitVector[n] (or a subclass), FPVector[...] or an ADT type built from
+    those and Enums.
+
+    rng: random.Random to draw from, an int seed or None for a fresh seed
+    corner_prob: fraction of the values replaced by corner cases
+    corners: weights of the corner case kinds, see CORNER_KINDS
+    '''
+    rng = _rng(rng)
+    if not isinstance(T, type):
+        raise TypeError(f'Expected a type not {T}')
+    if issubclass(T, Bit):
+        return [T(bool(v)) for v in _random_ints(1, count, rng)]
+    elif issubclass(T, BitVector) and T.is_sized:
+        return [_make(T, v) for v in _random_bits(T.size, count, rng, corner_prob, corners)]
+    elif issubclass(T, AbstractFPVector) and T.is_bound:
+        BV = BitVector[T.size]
+        return [T.reinterpret_from_bv(_make(BV, v))
+                for v in _random_bits(T.size, count, rng, corner_prob, corners)]
+    elif issubclass(T, Enum) and T.is_bound:
+        return rng.choices(T.fields, k=count)
+    elif issubclass(T, Tuple) and T.is_bound:
+        columns = [random_values(t, count, rng, corner_prob=corner_prob, corners=corners)
+                   for t in T.fields]
+        return [T(*args) for args in zip(*columns)]
+    elif issubclass(T, Sum) and T.is_bound:
+        variants = _sum_variants(T)
+        tags = rng.choices(range(len(variants)), k=count)
+        values = [
+            iter(random_values(t, tags.count(k), rng, corner_prob=corner_prob, corners=corners))
+            for k, (_, t) in enumerate(variants)
+        ]
+        if issubclass(T, TaggedUnion):
+            return [T(**{variants[k][0] : next(values[k])}) for k in tags]
+        return [T(next(values[k])) for k in tags]
+    else:
+        raise TypeError(f'Cannot generate random values of type {T}')
+
+
+def random_array(T : type, count : int,
+        rng : tp.Union[random.Random, int, None] = None, *,
+        corner_prob : float = 0.0,
+        corners : tp.Optional[tp.Mapping[str, float]] = None):
+    '''
+    Like random_values but returns a batch of type BitArray or
+    BitVectorArray[n] (for T Bit, BitVector[n] respectively), built
+    directly from the random bytes without creating a python int per value.
+    '''
+    _require_numpy()
+    rng = _rng(rng)
+    if isinstance(T, type) and issubclass(T, Bit):
+        bits = _random_ints(1, count, rng)
+        return BitArray(np.array(bits, dtype=bool))
+    elif not (isinstance(T, type) and issubclass(T, BitVector) and T.is_sized):
+        raise TypeError(f'Cannot generate a random array of type {T}')
+
+    AT = _array_type(T)
+    words = AT._words_
+    if count == 0:
+        arr = np.zeros((0, words), dtype=np.uint64)
+    else:
+        buf = rng.getrandbits(64 * words * count).to_bytes(8 * words * count, 'little')
+        arr = np.frombuffer(buf, dtype='<u8').astype(np.uint64).reshape(count, words)
+        arr &= AT._word_mask_()
+    if not AT._wide_:
+        arr = arr.reshape(count)
+    patches = _corner_positions(T.size, count, rng, corner_prob, corners)
+    if patches:
+        idx, vals = zip(*patches)
+        arr[list(idx)] = AT._from_ints_(list(vals))._value
+    return AT._from_words_(arr)
@@ -0,0 +1,311 @@
+'''
+Scoped namespaces for the symbolic families.
+
+A SymbolicContext owns a pysmt Environment, a z3 Context, the tables of the
+names of symbolic variables (with their counters), the operation memo and
+the and-inverter graph of the AIG family.
+Values of the symbolic families (SMTBit, SMTBitVector, SMTInt, SMTMemory,
+SMTFPVector, z3Bit, z3BitVector, z3Memory) are created in the current
+context:
+
+    with SymbolicContext() as ctx:
+        x = SMTBitVector[8](name='x')   # the name is only taken in ctx
+        f = (x + 1 == 0)
+        ctx.env.factory.is_sat(f.value)
+
+The current context is per thread, so threads each using their own context
+build independent models concurrently.  Outside of any with block the
+default context is used, it uses the global pysmt environment (which
+pysmt.shortcuts use) and the main z3 context.
+
+Values belong to the context they were created in and must only be
+combined with values of the same context (under that context).
+
+Reclaiming terms:  pysmt interns every term it ever built in the formula
+manager of its environment, so a long running process building models in
+the default context grows without bound.  Terms of a context are freed
+with the context once it is released (and its values are dropped):
+
+    with SymbolicContext() as ctx:
+        ...
+        result = model.constant_value()   # extract plain python results
+    ctx.release()
+
+ContextRecycler does this for a stream of queries, replacing its context
+after a number of queries or once it holds too many terms:
+
+    recycler = ContextRecycler(max_queries=100, max_terms=1 << 20)
+    for job in jobs:
+        with recycler.query() as ctx:
+            ...
+'''
+from collections import defaultdict
+import contextlib
+import itertools as it
+import threading
+import typing as tp
+import weakref
+
+from pysmt.environment import Environment, get_env
+import z3
+
+__all__ = ['SymbolicContext', 'ContextRecycler', 'current_context']
+
+
+class SymbolicContext:
+    def __init__(self):
+        self._init(Environment(), z3.Context())
+
+    def _init(self, env, z3_ctx):
+        self._released = False
+        self._env = env
+        self._z3_ctx = z3_ctx
+        self._lock = threading.RLock()
+        # number of with blocks (of any thread) the context is active in
+        self._active = 0
+        # name : value of the pysmt families
+        self.smt_names = weakref.WeakValueDictionary()
+        self.smt_counters = defaultdict(it.count)
+        # name : value of the z3 families
+        self.z3_names = weakref.WeakValueDictionary()
+        self.z3_counter = it.count()
+        self.z3_free_names = []
+        # see op_memo
+        self.op_memo = None
+        # see aig
+        self.aig = None
+        # name : function of the formula manager, see _Shortcuts
+        self._shortcuts = {}
+
+    @property
+    def env(self) -> Environment:
+        '''
+        The pysmt environment of the context
+        '''
+        self._check_released()
+        return self._env
+
+    @property
+    def z3_ctx(self) -> z3.Context:
+        self._check_released()
+        return self._z3_ctx
+
+    @property
+    def released(self) -> bool:
+        return self._released
+
+    @property
+    def num_terms(self) -> int:
+        '''
+        Number of terms interned by the pysmt environment
+        '''
+        return len(self.env.formula_manager.formulae)
+
+    def _check_released(self):
+        if self._released:
+            raise RuntimeError(f'{self} was released')
+
+    def release(self) -> None:
+        '''
+        Drops the environments, names and memo of the context so their
+        terms can be freed (once no value of the context is referenced).
+        The context can't be used afterwards.
+        '''
+        with self._lock:
+            if self._active:
+                raise RuntimeError(f'Cannot release {self} while it is active')
+            self._released = True
+        self._env = None
+        self._z3_ctx = None
+        self.smt_names = weakref.WeakValueDictionary()
+        self.smt_counters = defaultdict(it.count)
+        self.z3_names = weakref.WeakValueDictionary()
+        self.z3_free_names = []
+        self.op_memo = None
+        self.aig = None
+        self._shortcuts = {}
+
+    def _shortcut(self, name : str):
+        try:
+            return self._shortcuts[name]
+        except KeyError:
+            pass
+        env = self.env
+        if name == 'simplify':
+            fn = env.simplifier.simplify
+        elif name == 'substitute':
+            fn = env.substituter.substitute
+        elif name == 'get_type':
+            fn = env.stc.get_type
+        elif name == 'get_env':
+            fn = lambda: env
+        else:
+            fn = getattr(env.formula_manager, name, None)
+            if not callable(fn) or name.startswith('_'):
+                raise AttributeError(f'{name} is not a term constructor of the formula manager')
+        self._shortcuts[name] = fn
+        return fn
+
+    def gen_smt_name(self, prefix : str = 'V') -> str:
+        with self._lock:
+            counter = self.smt_counters[prefix]
+            name = f'{prefix}_{next(counter)}'
+            while name in self.smt_names:
+                name = f'{prefix}_{next(counter)}'
+            return name
+
+    def register_smt_name(self, name : str, value) -> None:
+        '''
+        Raises ValueError if name is taken
+        '''
+        with self._lock:
+            if name in self.smt_names:
+                raise ValueError(f'Name {name} already in use')
+            self.smt_names[name] = value
+
+    def gen_z3_name(self) -> str:
+        with self._lock:
+            if self.z3_free_names:
+                return self.z3_free_names.pop()
+            name = f'V_{next(self.z3_counter)}'
+            while name in self.z3_names:
+                name = f'V_{next(self.z3_counter)}'
+            return name
+
+    def register_z3_name(self, name : str, value) -> None:
+        '''
+        Raises ValueError if name is taken
+        '''
+        with self._lock:
+            if name in self.z3_names:
+                raise ValueError(f'Name {name} already in use')
+            self.z3_names[name] = value
+
+    def __enter__(self) -> 'SymbolicContext':
+        with self._lock:
+            self._check_released()
+            self._active += 1
+        _stack().append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        stack = _stack()
+        if not stack or stack[-1] is not self:
+            raise RuntimeError('Symbolic contexts must be exited in the reverse order they are entered')
+        stack.pop()
+        with self._lock:
+            self._active -= 1
+
+    def __repr__(self):
+        return f'{type(self).__name__}({id(self):#x})'
+
+
+class _DefaultContext(SymbolicContext):
+    def __init__(self):
+        self._init(None, None)
+        self._shortcuts_env = None
+
+    @property
+    def env(self) -> Environment:
+        # follow the global environment of pysmt, e.g. after reset_env
+        return get_env()
+
+    @property
+    def z3_ctx(self) -> z3.Context:
+        return z3.main_ctx()
+
+    def _shortcut(self, name : str):
+        env = get_env()
+        if self._shortcuts_env is not env:
+            # the global environment was reset
+            self._shortcuts = {}
+            self._shortcuts_env = env
+        return super()._shortcut(name)
+
+    def release(self) -> None:
+        raise RuntimeError('The default context cannot be released')
+
+    def __repr__(self):
+        return f'{type(self).__name__}()'
+
+
+class ContextRecycler:
+    '''
+    Runs queries in a SymbolicContext which is released and replaced after
+    max_queries queries or when a query leaves it with more than max_terms
+    interned terms (a high water mark).  With max_queries=1 every query
+    gets a fresh context.
+    '''
+    def __init__(self, max_queries : tp.Optional[int] = None, max_terms : tp.Optional[int] = None):
+        if max_queries is not None and max_queries < 1:
+            raise ValueError('max_queries must be >= 1')
+        if max_terms is not None and max_terms < 0:
+            raise ValueError('max_terms must be >= 0')
+        self.max_queries = max_queries
+        self.max_terms = max_terms
+        self._ctx = None
+        self._queries = 0
+        self.recycled = 0
+
+    @property
+    def context(self) -> tp.Optional[SymbolicContext]:
+        '''
+        The context of the next query if it was already created
+        '''
+        return self._ctx
+
+    @contextlib.contextmanager
+    def query(self):
+        if self._ctx is None:
+            self._ctx = SymbolicContext()
+            self._queries = 0
+        ctx = self._ctx
+        try:
+            with ctx:
+                yield ctx
+        finally:
+            self._queries += 1
+            if ((self.max_queries is not None and self._queries >= self.max_queries)
+                    or (self.max_terms is not None and ctx.num_terms > self.max_terms)):
+                self.release()
+
+    def release(self) -> None:
+        '''
+        Releases the current context, the next query gets a new one
+        '''
+        if self._ctx is not None:
+            self._ctx.release()
+            self._ctx = None
+            self.recycled += 1
+
+
+_default_context = _DefaultContext()
+_local = threading.local()
+
+
+def _stack() -> tp.List[SymbolicContext]:
+    try:
+        return _local.stack
+    except AttributeError:
+        stack = _local.stack = []
+        return stack
+
+
+def current_context() -> SymbolicContext:
+    stack = _stack()
+    if stack:
+        return stack[-1]
+    return _default_context
+
+
+class _Shortcuts:
+    '''
+    Stand in for pysmt.shortcuts which builds terms in the environment of
+    the current context.  Only the term constructors of the formula
+    manager (and simplify, substitute, get_type, get_env) are available,
+    the functions are cached per context.
+    '''
+    def __getattr__(self, name):
+        return current_context()._shortcut(name)
+
+shortcuts = _Shortcuts()
@@ -0,0 +1,368 @@
+'''
+Compact binary trace format for streams of concrete hwtypes values.
+
+A trace is a table with one row per sample (e.g. per cycle) and a fixed set
+of typed columns.  Columns may be Bit, BitVector[n] (or its subclasses) or
+ADT types built from those and Enums.
+
+File layout:
+    magic       b'HWTRACE1'
+    length      uint32 little endian, length of the header
+    header      pickle of the list of (name, type) of the columns
+    padding     to a multiple of 8 bytes
+    rows        fixed size records, each column stored little endian in
+                the smallest of 1, 2, 4, 8 bytes which holds it (or the
+                number of bytes needed for wider columns)
+
+    with TraceWriter(path, [('a', BitVector[16]), ('op', Bit)]) as w:
+        w.write(a, op)
+
+    with TraceReader(path) as r:
+        r[1000]['a']        # decodes a single value
+        r.column('a')[10:20] # lazy view over part of a column
+
+The reader memory maps the file and only decodes the values accessed.  As
+the header is a pickle only open traces from trusted sources.
+'''
+import mmap
+import pickle
+import struct
+import typing as tp
+
+from .bit_vector import Bit, BitVector, _make
+from .adt import Tuple, Sum, Enum, TaggedUnion
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__all__ = ['TraceWriter', 'TraceReader']
+
+MAGIC = b'HWTRACE1'
+_LEN = struct.Struct('<I')
+
+
+class _Codec:
+    '''
+    Fixed width encoding of the values of type T as non negative ints
+    '''
+    def __init__(self, T):
+        self.T = T
+        if isinstance(T, type) and issubclass(T, Bit):
+            self.nbits = 1
+            self.encode = lambda v: 1 if v else 0
+            self.decode = lambda i: T(bool(i))
+        elif isinstance(T, type) and issubclass(T, BitVector) and T.is_sized:
+            self.nbits = T.size
+            self.encode = lambda v: v._value if type(v) is T else T(v)._value
+            self.decode = lambda i: _make(T, i)
+        elif isinstance(T, type) and issubclass(T, Enum) and T.is_bound:
+            self._build_enum(T)
+        elif isinstance(T, type) and issubclass(T, Tuple) and T.is_bound:
+            self._build_tuple(T)
+        elif isinstance(T, type) and issubclass(T, TaggedUnion) and T.is_bound:
+            self._build_sum(T, list(T.field_dict.values()), tagged=True)
+        elif isinstance(T, type) and issubclass(T, Sum) and T.is_bound:
+            # fields of a Sum are unordered, sort them so the encoding
+            # does not depend on the process which built the type
+            fields = sorted(T.fields, key=lambda t: t.__name__)
+            self._build_sum(T, fields, tagged=False)
+        else:
+            raise TypeError(f'Cannot encode values of type {T}')
+
+    def _build_enum(self, T):
+        fields = T.fields
+        index = {elem._value_ : i for i, elem in enumerate(fields)}
+        self.nbits = max((len(fields) - 1).bit_length(), 1)
+        self.encode = lambda v: index[v._value_]
+        self.decode = lambda i: fields[i]
+
+    def _build_tuple(self, T):
+        codecs = [_Codec(t) for t in T.fields]
+        offsets = []
+        nbits = 0
+        for c in codecs:
+            offsets.append(nbits)
+            nbits += c.nbits
+        self.nbits = nbits
+        layout = [(c, off, (1 << c.nbits) - 1) for c, off in zip(codecs, offsets)]
+
+        def encode(v):
+            acc = 0
+            for (c, off, _), x in zip(layout, v._value_):
+                acc |= c.encode(x) << off
+            return acc
+
+        def decode(i):
+            return T(*(c.decode((i >> off) & mask) for c, off, mask in layout))
+
+        self.encode = encode
+        self.decode = decode
+
+    def _build_sum(self, T, fields, tagged):
+        codecs = [_Codec(t) for t in fields]
+        payload = max(c.nbits for c in codecs)
+        self.nbits = payload + max((len(codecs) - 1).bit_length(), 1)
+        mask = (1 << payload) - 1
+        names = list(T.field_dict)
+
+        if tagged:
+            def encode(v):
+                tag = v._tag_
+                return (tag << payload) | codecs[tag].encode(v._value_)
+
+            def decode(i):
+                tag = i >> payload
+                return T(**{names[tag] : codecs[tag].decode(i & mask)})
+        else:
+            index = {t : k for k, t in enumerate(fields)}
+            def encode(v):
+                tag = index[type(v._value_)]
+                return (tag << payload) | codecs[tag].encode(v._value_)
+
+            def decode(i):
+                tag = i >> payload
+                return T(codecs[tag].decode(i & mask))
+
+        self.encode = encode
+        self.decode = decode
+
+    @property
+    def nbytes(self):
+        n = (self.nbits + 7) // 8
+        # round narrow columns up to a machine word size so they can be
+        # viewed as numpy arrays
+        for k in (1, 2, 4, 8):
+            if n <= k:
+                return k
+        return n
+
+
+class _Layout:
+    def __init__(self, columns):
+        self.columns = [(name, T) for name, T in columns]
+        self.names = {}
+        self.codecs = []
+        self.offsets = []
+        size = 0
+        for k, (name, T) in enumerate(self.columns):
+            if not isinstance(name, str):
+                raise TypeError('column names must be str')
+            if name in self.names:
+                raise ValueError(f'duplicate column {name}')
+            self.names[name] = k
+            codec = _Codec(T)
+            self.codecs.append(codec)
+            self.offsets.append(size)
+            size += codec.nbytes
+        self.row_size = size
+
+    def index(self, key):
+        if isinstance(key, str):
+            return self.names[key]
+        return range(len(self.columns))[key]
+
+
+class TraceWriter:
+    '''
+    Writes rows of values to a trace file, see the module docstring.
+    '''
+    def __init__(self, path, columns : tp.Sequence[tp.Tuple[str, type]], buffer_size : int = 1 << 20):
+        self._layout = layout = _Layout(columns)
+        self._file = open(path, 'wb', buffering=buffer_size)
+        header = pickle.dumps(layout.columns, protocol=pickle.HIGHEST_PROTOCOL)
+        self._file.write(MAGIC)
+        self._file.write(_LEN.pack(len(header)))
+        self._file.write(header)
+        pos = len(MAGIC) + _LEN.size + len(header)
+        self._file.write(bytes(-pos % 8))
+        self._encoders = [
+            (codec.encode, codec.nbytes) for codec in layout.codecs
+        ]
+        self.rows = 0
+
+    def write(self, *values):
+        '''
+        Append one row, values are given in column order
+        '''
+        if len(values) != len(self._encoders):
+            raise ValueError(f'Expected {len(self._encoders)} values not {len(values)}')
+        self._file.write(b''.join(
+            encode(v).to_bytes(nbytes, 'little')
+            for (encode, nbytes), v in zip(self._encoders, values)))
+        self.rows += 1
+
+    def write_rows(self, rows : tp.Iterable[tp.Sequence]):
+        for row in rows:
+            self.write(*row)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TraceRow:
+    '''
+    Lazy view of one row of a trace
+    '''
+    __slots__ = ('_reader', '_offset')
+
+    def __init__(self, reader, offset):
+        self._reader = reader
+        self._offset = offset
+
+    def __getitem__(self, key):
+        k = self._reader._layout.index(key)
+        return self._reader._decode(k, self._offset)
+
+    def __len__(self):
+        return len(self._reader._layout.columns)
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self._reader._decode(k, self._offset)
+
+    def keys(self):
+        return [name for name, _ in self._reader._layout.columns]
+
+    def values(self):
+        return tuple(self)
+
+    def __repr__(self):
+        return 'TraceRow({})'.format(', '.join(f'{k}={v!r}' for k, v in zip(self.keys(), self)))
+
+
+class TraceColumn(tp.Sequence):
+    '''
+    Lazy view of (a range of) one column of a trace
+    '''
+    def __init__(self, reader, column, rows):
+        self._reader = reader
+        self._column = column
+        self._rows = rows
+
+    @property
+    def type(self):
+        return self._reader._layout.columns[self._column][1]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return TraceColumn(self._reader, self._column, self._rows[idx])
+        row = self._rows[idx]
+        return self._reader._decode(self._column, self._reader._data_offset + row * self._reader._layout.row_size)
+
+    def __iter__(self):
+        reader = self._reader
+        data, size = reader._data_offset, reader._layout.row_size
+        k = self._column
+        for row in self._rows:
+            yield reader._decode(k, data + row * size)
+
+    def ints(self) -> tp.List[int]:
+        '''
+        The encoded values as ints without building hwtypes objects
+        '''
+        reader = self._reader
+        mm = reader._mm
+        size = reader._layout.row_size
+        nbytes = reader._layout.codecs[self._column].nbytes
+        base = reader._data_offset + reader._layout.offsets[self._column]
+        frm = int.from_bytes
+        return [frm(mm[base + r*size : base + r*size + nbytes], 'little') for r in self._rows]
+
+    def as_numpy(self):
+        '''
+        Zero copy numpy view of the encoded values of a column of at most 64 bits
+        '''
+        if np is None:
+            raise ImportError('as_numpy requires numpy')
+        reader = self._reader
+        nbytes = reader._layout.codecs[self._column].nbytes
+        if nbytes > 8:
+            raise TypeError('as_numpy only supports columns of at most 64 bits')
+        rows = self._rows
+        size = reader._layout.row_size
+        offset = reader._data_offset + reader._layout.offsets[self._column] + rows.start * size
+        if len(rows) == 0:
+            return np.empty(0, dtype=f'<u{nbytes}')
+        return np.ndarray(shape=(len(rows),), dtype=f'<u{nbytes}',
+                          buffer=reader._mm, offset=offset, strides=(rows.step * size,))
+
+
+class TraceReader:
+    '''
+    Memory mapped random access reader of trace files, see the module
+    docstring.
+    '''
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # can't map empty files
+            self._file.close()
+            raise ValueError(f'{path} is not a trace file') from None
+        mm = self._mm
+        if mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f'{path} is not a trace file')
+        pos = len(MAGIC)
+        hlen, = _LEN.unpack_from(mm, pos)
+        pos += _LEN.size
+        columns = pickle.loads(mm[pos:pos + hlen])
+        pos += hlen
+        self._data_offset = pos + (-pos % 8)
+        self._layout = _Layout(columns)
+        self._decoders = [(c.decode, c.nbytes) for c in self._layout.codecs]
+        size = self._layout.row_size
+        self._rows = (len(mm) - self._data_offset) // size if size else 0
+
+    @property
+    def columns(self) -> tp.List[tp.Tuple[str, type]]:
+        return list(self._layout.columns)
+
+    def __len__(self):
+        return self._rows
+
+    def _decode(self, column, row_offset):
+        decode, nbytes = self._decoders[column]
+        start = row_offset + self._layout.offsets[column]
+        return decode(int.from_bytes(self._mm[start:start + nbytes], 'little'))
+
+    def __getitem__(self, idx : int) -> TraceRow:
+        idx = range(self._rows)[idx]
+        return TraceRow(self, self._data_offset + idx * self._layout.row_size)
+
+    def __iter__(self):
+        for idx in range(self._rows):
+            yield self[idx]
+
+    def column(self, key) -> TraceColumn:
+        return TraceColumn(self, self._layout.index(key), range(self._rows))
+
+    def close(self):
+        try:
+            self._mm.close()
+        except BufferError:
+            # numpy views from as_numpy are still alive, the map is
+            # released when they are
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
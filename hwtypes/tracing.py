@@ -0,0 +1,768 @@
+'''
+Trace-and-compile simulation of family generic functions.
+
+compile_function wraps a function written against a TypeFamily.  The first
+time it is called with a given signature of concrete argument types it runs
+the function once on the Traced family, which records the operation DAG
+instead of computing values.  While recording, structurally identical
+operations are shared (CSE), operations on constants are folded and a few
+algebraic identities are applied.  Only the nodes reachable from the outputs
+are then emitted (DCE) as a straight line python function over plain ints,
+which is cached and used for every later call with the same signature.
+
+    @compile_function
+    def alu(a, b, op):
+        return op.ite(a + b, a - b)
+
+    alu(BitVector[16](1), BitVector[16](2), Bit(0))
+
+Functions which branch on traced values (e.g. `if a == b:`) or take arguments
+other than Bit and bit vectors cannot be traced, for those compile_function
+silently falls back to calling the function directly.  Note the function body runs once per signature at trace time.
+'''
+import functools as ft
+import itertools as it
+import threading
+import typing as tp
+
+from .bit_vector_abc import AbstractBitVector, AbstractBit, TypeFamily, InconsistentSizeError
+from .bit_vector_util import build_ite
+from .bit_vector import Bit, BitVector, UIntVector, SIntVector, _make
+from .util import Method
+
+__all__ = ['TracedBit', 'TracedBitVector', 'TracedNumVector']
+__all__ += ['TracedUIntVector', 'TracedSIntVector']
+__all__ += ['UntraceableError', 'Trace', 'CompiledFunction', 'compile_function']
+
+
+class UntraceableError(TypeError): pass
+
+
+def _mask(width):
+    return (1 << width) - 1
+
+
+def _sx(a, width):
+    # signed interpretation of the unsigned expression a
+    h = 1 << (width - 1)
+    return f'(({a} ^ {h}) - {h})'
+
+# Expression templates: op -> fn(args, attrs, arg_widths, width) -> python
+# expression evaluating to the masked result.  Bits are 0/1 (or bool).
+# The same templates are evaluated at trace time for constant folding so
+# folded and compiled code agree by construction.
+_TEMPLATES = {
+    'not'    : lambda a, at, ws, w: f'({a[0]} ^ {_mask(w)})',
+    'and'    : lambda a, at, ws, w: f'({a[0]} & {a[1]})',
+    'or'     : lambda a, at, ws, w: f'({a[0]} | {a[1]})',
+    'xor'    : lambda a, at, ws, w: f'({a[0]} ^ {a[1]})',
+    'neg'    : lambda a, at, ws, w: f'(-{a[0]} & {_mask(w)})',
+    'add'    : lambda a, at, ws, w: f'(({a[0]} + {a[1]}) & {_mask(w)})',
+    'sub'    : lambda a, at, ws, w: f'(({a[0]} - {a[1]}) & {_mask(w)})',
+    'mul'    : lambda a, at, ws, w: f'(({a[0]} * {a[1]}) & {_mask(w)})',
+    'udiv'   : lambda a, at, ws, w: f'({a[0]} // {a[1]} if {a[1]} else {_mask(w)})',
+    'urem'   : lambda a, at, ws, w: f'({a[0]} % {a[1]} if {a[1]} else {a[0]})',
+    'sdiv'   : lambda a, at, ws, w: f'(({_sx(a[0], w)} // {_sx(a[1], w)}) & {_mask(w)} if {a[1]} else {_mask(w)})',
+    'srem'   : lambda a, at, ws, w: f'(({_sx(a[0], w)} % {_sx(a[1], w)}) & {_mask(w)} if {a[1]} else {a[0]})',
+    'shl'    : lambda a, at, ws, w: f'((({a[0]} << {a[1]}) & {_mask(w)}) if {a[1]} < {w} else 0)',
+    'lshr'   : lambda a, at, ws, w: f'({a[0]} >> {a[1]})',
+    'ashr'   : lambda a, at, ws, w: f'(({_sx(a[0], w)} >> {a[1]}) & {_mask(w)})',
+    'rol'    : lambda a, at, ws, w: f'((({a[0]} << ({a[1]} % {w})) | ({a[0]} >> ({w} - {a[1]} % {w}))) & {_mask(w)})',
+    'ror'    : lambda a, at, ws, w: f'((({a[0]} >> ({a[1]} % {w})) | ({a[0]} << ({w} - {a[1]} % {w}))) & {_mask(w)})',
+    'eq'     : lambda a, at, ws, w: f'({a[0]} == {a[1]})',
+    'ne'     : lambda a, at, ws, w: f'({a[0]} != {a[1]})',
+    'ult'    : lambda a, at, ws, w: f'({a[0]} < {a[1]})',
+    'ule'    : lambda a, at, ws, w: f'({a[0]} <= {a[1]})',
+    'slt'    : lambda a, at, ws, w: f'({_sx(a[0], ws[0])} < {_sx(a[1], ws[1])})',
+    'sle'    : lambda a, at, ws, w: f'({_sx(a[0], ws[0])} <= {_sx(a[1], ws[1])})',
+    'comp'   : lambda a, at, ws, w: f'(1 if {a[0]} == {a[1]} else 0)',
+    'ite'    : lambda a, at, ws, w: f'({a[1]} if {a[0]} else {a[2]})',
+    'concat' : lambda a, at, ws, w: f'({a[0]} | ({a[1]} << {ws[0]}))',
+    'extract': lambda a, at, ws, w: f'(({a[0]} >> {at[0]}) & {_mask(w)})' if at[0] else f'({a[0]} & {_mask(w)})',
+    'gather' : lambda a, at, ws, w: '(' + ' | '.join(f'((({a[0]} >> {i}) & 1) << {k})' for k, i in enumerate(at)) + ')',
+    'zext'   : lambda a, at, ws, w: f'({a[0]} & {_mask(w)})',
+    'sext'   : lambda a, at, ws, w: f'({a[0]} | {_mask(w) ^ _mask(ws[0])} if {a[0]} >> {ws[0] - 1} else {a[0]})',
+    'repeat' : lambda a, at, ws, w: f'({a[0]} * {_mask(w) // _mask(ws[0])})',
+    'bit2bv' : lambda a, at, ws, w: f'(1 if {a[0]} else 0)',
+}
+
+_COMMUTATIVE = frozenset({'and', 'or', 'xor', 'add', 'mul', 'eq', 'ne', 'comp'})
+
+
+# the traces being recorded, per thread
+_local = threading.local()
+
+
+def _stack() -> tp.List['Trace']:
+    try:
+        return _local.stack
+    except AttributeError:
+        stack = _local.stack = []
+        return stack
+
+
+class Trace:
+    '''
+    Operation DAG recorded while running a function on the Traced family.
+
+    Nodes are tuples (op, args, attrs, width), args are node ids.
+    '''
+
+    def __init__(self):
+        self.nodes = []
+        self._table = {}
+        self.inputs = []
+
+    def __enter__(self):
+        _stack().append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _stack().pop()
+
+    @staticmethod
+    def current() -> 'Trace':
+        stack = _stack()
+        if not stack:
+            raise TypeError('Traced values can only be constructed while tracing')
+        return stack[-1]
+
+    def _intern(self, key):
+        try:
+            return self._table[key]
+        except KeyError:
+            pass
+        idx = len(self.nodes)
+        self.nodes.append(key)
+        self._table[key] = idx
+        return idx
+
+    def input(self, width):
+        idx = self._intern(('input', (), (len(self.inputs),), width))
+        self.inputs.append(idx)
+        return idx
+
+    def const(self, value, width):
+        return self._intern(('const', (), (value & _mask(width),), width))
+
+    def const_value(self, idx):
+        op, _, attrs, _ = self.nodes[idx]
+        if op == 'const':
+            return attrs[0]
+        return None
+
+    def width(self, idx):
+        return self.nodes[idx][3]
+
+    def node(self, op, args, attrs, width):
+        args = tuple(args)
+        attrs = tuple(attrs)
+        consts = [self.const_value(a) for a in args]
+
+        if all(c is not None for c in consts):
+            expr = self._expr(op, list(map(str, consts)), attrs, args, width)
+            return self.const(int(eval(expr)), width)
+
+        simplified = self._simplify(op, args, consts, width)
+        if simplified is not None:
+            return simplified
+
+        if op in _COMMUTATIVE:
+            args = tuple(sorted(args))
+        return self._intern((op, args, attrs, width))
+
+    def _simplify(self, op, args, consts, width):
+        mask = _mask(width)
+        if op == 'ite':
+            s, t, f = args
+            if consts[0] is not None:
+                return t if consts[0] else f
+            if t == f:
+                return t
+            return None
+        if op in ('concat', 'gather', 'extract', 'zext', 'sext', 'repeat'):
+            if op in ('zext', 'sext') and self.width(args[0]) == width:
+                return args[0]
+            return None
+        if len(args) != 2:
+            return None
+
+        a, b = args
+        ca, cb = consts
+        if op in _COMMUTATIVE and ca is not None:
+            a, b, ca, cb = b, a, cb, ca
+        if op == 'and':
+            if cb == 0:
+                return self.const(0, width)
+            if cb == mask or a == b:
+                return a
+        elif op in ('or', 'xor', 'add', 'sub', 'shl', 'lshr', 'ashr'):
+            if cb == 0:
+                return a
+            if op == 'or' and a == b:
+                return a
+            if op in ('xor', 'sub') and a == b:
+                return self.const(0, width)
+        elif op == 'mul':
+            if cb == 0:
+                return self.const(0, width)
+            if cb == 1:
+                return a
+        elif op in ('eq', 'ule', 'sle') and a == b:
+            return self.const(1, 1)
+        elif op in ('ne', 'ult', 'slt') and a == b:
+            return self.const(0, 1)
+        return None
+
+    def _expr(self, op, args, attrs, arg_ids, width):
+        ws = [self.width(a) for a in arg_ids]
+        return _TEMPLATES[op](args, attrs, ws, width)
+
+    def live(self, outputs):
+        '''
+        Node ids reachable from outputs in topological order
+        '''
+        seen = set()
+        todo = list(outputs)
+        while todo:
+            idx = todo.pop()
+            if idx in seen:
+                continue
+            seen.add(idx)
+            todo.extend(self.nodes[idx][1])
+        return sorted(seen)
+
+    def emit(self, outputs, name='f'):
+        '''
+        Python source of a function taking one int per input and returning
+        the tuple of ints computed by outputs.
+        '''
+        params = ', '.join(f'v{idx}' for idx in self.inputs)
+        lines = [f'def {name}({params}):']
+        alias = {}
+        def ref(idx):
+            c = self.const_value(idx)
+            return str(c) if c is not None else alias.get(idx, f'v{idx}')
+
+        for idx in self.live(outputs):
+            op, args, attrs, width = self.nodes[idx]
+            if op in ('input', 'const'):
+                continue
+            if op == 'zext':
+                # values are always masked so zero extension is free
+                alias[idx] = ref(args[0])
+                continue
+            expr = self._expr(op, [ref(a) for a in args], attrs, args, width)
+            lines.append(f'    v{idx} = {expr}')
+        lines.append(f'    return ({"".join(ref(o) + ", " for o in outputs)})')
+        return '\n'.join(lines) + '\n'
+
+
+def bit_cast(fn):
+    @ft.wraps(fn)
+    def wrapped(self, other):
+        if isinstance(other, TracedBit):
+            return fn(self, other)
+        else:
+            try:
+                other = TracedBit(other)
+            except TypeError:
+                return NotImplemented
+            return fn(self, other)
+    return wrapped
+
+
+def _bit_op(op):
+    @bit_cast
+    def method(self, other):
+        return TracedBit._from_node_(self._trace.node(op, (self._node, other._node), (), 1))
+    return method
+
+
+class TracedBit(AbstractBit):
+    @staticmethod
+    def get_family() -> TypeFamily:
+        return _Family_
+
+    def __init__(self, value):
+        trace = Trace.current()
+        if isinstance(value, TracedBit):
+            node = value._node
+        elif isinstance(value, (bool, int, Bit)):
+            if isinstance(value, int) and value not in {0, 1}:
+                raise ValueError('Bit must have value 0 or 1 not {}'.format(value))
+            node = trace.const(int(bool(value)), 1)
+        else:
+            raise TypeError("Can't coerce {} to TracedBit".format(type(value)))
+        self._trace = trace
+        self._node = node
+
+    @classmethod
+    def _from_node_(cls, node):
+        bit = cls.__new__(cls)
+        bit._trace = Trace.current()
+        bit._node = node
+        return bit
+
+    def __invert__(self):
+        return type(self)._from_node_(self._trace.node('not', (self._node,), (), 1))
+
+    __eq__ = _bit_op('eq')
+    __ne__ = _bit_op('ne')
+    __and__ = __rand__ = _bit_op('and')
+    __or__ = __ror__ = _bit_op('or')
+    __xor__ = __rxor__ = _bit_op('xor')
+
+    __hash__ = None
+
+    def ite(self, t_branch, f_branch):
+        def _ite(select, t_branch, f_branch):
+            trace = select._trace
+            node = trace.node('ite', (select._node, t_branch._node, f_branch._node), (), trace.width(t_branch._node))
+            return type(t_branch)._from_node_(node)
+
+        return build_ite(_ite, self, t_branch, f_branch)
+
+    def __bool__(self):
+        raise UntraceableError('TracedBit cannot be converted to bool')
+
+    def __repr__(self):
+        return f'{type(self).__name__}(v{self._node})'
+
+
+def _coerce(T : tp.Type['TracedBitVector'], val : tp.Any) -> 'TracedBitVector':
+    if not isinstance(val, TracedBitVector):
+        return T(val)
+    elif val.size != T.size:
+        raise InconsistentSizeError('Inconsistent size')
+    else:
+        return val
+
+
+def bv_cast(fn : tp.Callable[['TracedBitVector', 'TracedBitVector'], tp.Any]) -> tp.Callable[['TracedBitVector', tp.Any], tp.Any]:
+    @ft.wraps(fn)
+    def wrapped(self : 'TracedBitVector', other : tp.Any) -> tp.Any:
+        other = _coerce(type(self), other)
+        return fn(self, other)
+    return wrapped
+
+
+def dispatch_oper(method: tp.MethodDescriptorType):
+    def oper(self, other):
+        try:
+            return method(self, other)
+        except InconsistentSizeError as e:
+            raise e from None
+        except TypeError:
+            return NotImplemented
+
+    return Method(oper)
+
+
+def dispatch_roper(method: Method):
+    method = method.m if isinstance(method, Method) else method
+    def roper(self, other):
+        try:
+            other = _coerce(type(self), other)
+        except InconsistentSizeError as e:
+            raise e from None
+        except TypeError:
+            return NotImplemented
+        return method(other, self)
+
+    return Method(roper)
+
+
+def _bv_op(op):
+    @bv_cast
+    def method(self, other):
+        return self._new_(op, (self._node, other._node))
+    return method
+
+
+def _cmp_op(op, swap=False, invert=False):
+    @bv_cast
+    def method(self, other):
+        args = (other._node, self._node) if swap else (self._node, other._node)
+        bit = TracedBit._from_node_(self._trace.node(op, args, (), 1))
+        return ~bit if invert else bit
+    return method
+
+
+class TracedBitVector(AbstractBitVector):
+    @staticmethod
+    def get_family() -> TypeFamily:
+        return _Family_
+
+    def __init__(self, value=0):
+        trace = Trace.current()
+        size = self.size
+        if isinstance(value, TracedBitVector):
+            node = value._node
+            if value.size > size:
+                node = trace.node('extract', (node,), (0,), size)
+            elif value.size < size:
+                node = trace.node('zext', (node,), (), size)
+        elif isinstance(value, TracedBit):
+            node = trace.node('bit2bv', (value._node,), (), size)
+        elif isinstance(value, (int, Bit, BitVector)):
+            node = trace.const(int(value), size)
+        elif isinstance(value, tp.Sequence):
+            if len(value) != size:
+                raise ValueError('Iterable is not the correct size')
+            B1 = type(self).unsized_t[1]
+            node = ft.reduce(lambda acc, elem : acc.concat(elem), map(B1, value))._node
+        else:
+            raise TypeError('Cannot construct {} from {}'.format(type(self), value))
+        self._trace = trace
+        self._node = node
+
+    @classmethod
+    def _from_node_(cls, node):
+        bv = cls.__new__(cls)
+        bv._trace = Trace.current()
+        bv._node = node
+        return bv
+
+    def _new_(self, op, args, attrs=(), T=None):
+        if T is None:
+            T = type(self)
+        return T._from_node_(self._trace.node(op, args, attrs, T.size))
+
+    @classmethod
+    def make_constant(cls, value, size=None):
+        if size is None:
+            return cls(value)
+        else:
+            return cls.unsized_t[size](value)
+
+    def __repr__(self):
+        return f'{type(self).__name__}(v{self._node})'
+
+    def __getitem__(self, index):
+        size = self.size
+        if isinstance(index, slice):
+            idxs = range(*index.indices(size))
+            T = type(self).unsized_t[len(idxs)]
+            if not idxs:
+                return T._from_node_(self._trace.const(0, 0))
+            if idxs.step == 1:
+                return self._new_('extract', (self._node,), (idxs.start,), T)
+            return self._new_('gather', (self._node,), tuple(idxs), T)
+        elif isinstance(index, int):
+            if index < 0:
+                index = size+index
+            if not (0 <= index < size):
+                raise IndexError()
+            node = self._trace.node('extract', (self._node,), (index,), 1)
+            return TracedBit._from_node_(node)
+        else:
+            raise TypeError()
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            positions = range(*index.indices(self.size))
+            width = len(positions)
+            if isinstance(value, TracedBitVector) and value.size != width:
+                raise InconsistentSizeError('Inconsistent size')
+            if not width:
+                return
+            value = type(self).unsized_t[width](value)
+            if positions.step == 1:
+                start = positions.start
+                mask = type(self)(((1 << width) - 1) << start)
+                value = type(self)(value) << start
+                self._node = ((self & ~mask) | value)._node
+            else:
+                for k, i in enumerate(positions):
+                    self[i] = value[k]
+            return
+        if index < 0:
+            index = self.size+index
+        if not (0 <= index < self.size):
+            raise IndexError()
+        mask = type(self)(1 << index)
+        self._node = TracedBit(value).ite(self | mask, self & ~mask)._node
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def num_bits(self):
+        return self.size
+
+    def concat(self, other):
+        T = type(self).unsized_t
+        if not isinstance(other, T):
+            raise TypeError(f'value must of type {T}')
+        return self._new_('concat', (self._node, other._node), (), T[self.size + other.size])
+
+    def bvnot(self):
+        return self._new_('not', (self._node,))
+
+    def bvneg(self):
+        return self._new_('neg', (self._node,))
+
+    bvand = _bv_op('and')
+    bvor = _bv_op('or')
+    bvxor = _bv_op('xor')
+    bvshl = _bv_op('shl')
+    bvlshr = _bv_op('lshr')
+    bvashr = _bv_op('ashr')
+    bvrol = _bv_op('rol')
+    bvror = _bv_op('ror')
+    bvadd = _bv_op('add')
+    bvsub = _bv_op('sub')
+    bvmul = _bv_op('mul')
+    bvudiv = _bv_op('udiv')
+    bvurem = _bv_op('urem')
+    bvsdiv = _bv_op('sdiv')
+    bvsrem = _bv_op('srem')
+
+    @bv_cast
+    def bvcomp(self, other):
+        return self._new_('comp', (self._node, other._node), (), type(self).unsized_t[1])
+
+    bveq = _cmp_op('eq')
+    bvne = _cmp_op('ne')
+    bvult = _cmp_op('ult')
+    bvule = _cmp_op('ule')
+    bvugt = _cmp_op('ult', swap=True)
+    bvuge = _cmp_op('ule', swap=True)
+    bvslt = _cmp_op('slt')
+    bvsle = _cmp_op('sle')
+    bvsgt = _cmp_op('slt', swap=True)
+    bvsge = _cmp_op('sle', swap=True)
+
+    def adc(self, other, carry):
+        """
+        add with carry
+
+        returns a two element tuple of the form (result, carry)
+
+        """
+        T = type(self)
+        other = _coerce(T, other)
+        carry = _coerce(T.unsized_t[1], carry)
+
+        a = self.zext(1)
+        b = other.zext(1)
+        c = carry.zext(T.size)
+
+        res = a + b + c
+        return res[0:-1], res[-1]
+
+    def ite(self, t_branch, f_branch):
+        return self.bvne(0).ite(t_branch, f_branch)
+
+    def __invert__(self): return self.bvnot()
+
+    __and__ = dispatch_oper(bvand)
+    __rand__ = dispatch_roper(__and__)
+
+    __or__ = dispatch_oper(bvor)
+    __ror__ = dispatch_roper(__or__)
+
+    __xor__ = dispatch_oper(bvxor)
+    __rxor__ = dispatch_roper(__xor__)
+
+    __lshift__ = dispatch_oper(bvshl)
+    __rlshift__ = dispatch_roper(__lshift__)
+
+    __rshift__ = dispatch_oper(bvlshr)
+    __rrshift__ = dispatch_roper(__rshift__)
+
+    def __neg__(self): return self.bvneg()
+
+    __add__ = dispatch_oper(bvadd)
+    __radd__ = dispatch_roper(__add__)
+
+    __sub__ = dispatch_oper(bvsub)
+    __rsub__ = dispatch_roper(__sub__)
+
+    __mul__ = dispatch_oper(bvmul)
+    __rmul__ = dispatch_roper(__mul__)
+
+    __floordiv__ = dispatch_oper(bvudiv)
+    __rfloordiv__ = dispatch_roper(__floordiv__)
+
+    __mod__ = dispatch_oper(bvurem)
+    __rmod__ = dispatch_roper(__mod__)
+
+    __eq__ = dispatch_oper(bveq)
+    __ne__ = dispatch_oper(bvne)
+    __ge__ = dispatch_oper(bvuge)
+    __gt__ = dispatch_oper(bvugt)
+    __le__ = dispatch_oper(bvule)
+    __lt__ = dispatch_oper(bvult)
+
+    def __int__(self):
+        raise UntraceableError('TracedBitVector cannot be converted to int')
+
+    def __bool__(self):
+        raise UntraceableError('TracedBitVector cannot be converted to bool')
+
+    def repeat(self, r):
+        r = int(r)
+        if r <= 0:
+            raise ValueError()
+        return self._new_('repeat', (self._node,), (), type(self).unsized_t[r * self.size])
+
+    def sext(self, ext):
+        ext = int(ext)
+        if ext < 0:
+            raise ValueError()
+        return self._new_('sext', (self._node,), (), type(self).unsized_t[self.size + ext])
+
+    def ext(self, ext):
+        return self.zext(ext)
+
+    def zext(self, ext):
+        ext = int(ext)
+        if ext < 0:
+            raise ValueError()
+        return self._new_('zext', (self._node,), (), type(self).unsized_t[self.size + ext])
+
+
+class TracedNumVector(TracedBitVector):
+    pass
+
+
+class TracedUIntVector(TracedNumVector):
+    pass
+
+
+class TracedSIntVector(TracedNumVector):
+    __rshift__ = dispatch_oper(TracedBitVector.bvashr)
+    __rrshift__ = dispatch_roper(__rshift__)
+
+    __floordiv__ = dispatch_oper(TracedBitVector.bvsdiv)
+    __rfloordiv__ = dispatch_roper(__floordiv__)
+
+    __mod__ = dispatch_oper(TracedBitVector.bvsrem)
+    __rmod__ = dispatch_roper(__mod__)
+
+    __ge__ = dispatch_oper(TracedBitVector.bvsge)
+    __gt__ = dispatch_oper(TracedBitVector.bvsgt)
+    __lt__ = dispatch_oper(TracedBitVector.bvslt)
+    __le__ = dispatch_oper(TracedBitVector.bvsle)
+
+    def ext(self, other):
+        return self.sext(other)
+
+
+_Family_ = TypeFamily(TracedBit, TracedBitVector, TracedUIntVector, TracedSIntVector)
+
+# concrete unsized type -> traced unsized type, most specific first
+_TRACED_T = (
+    (SIntVector, TracedSIntVector),
+    (UIntVector, TracedUIntVector),
+    (BitVector, TracedBitVector),
+)
+
+
+def _traced_t(T):
+    if issubclass(T, Bit):
+        return TracedBit
+    for C, TC in _TRACED_T:
+        if issubclass(T, C):
+            return TC[T.size]
+    raise UntraceableError(f'Cannot trace argument of type {T}')
+
+
+def _concrete_t(T):
+    if issubclass(T, TracedBit):
+        return Bit
+    for C, TC in _TRACED_T:
+        if issubclass(T, TC):
+            return C[T.size]
+    raise UntraceableError(f'Cannot compile output of type {T}')
+
+
+class CompiledFunction:
+    '''
+    Function compiled per signature of concrete argument types.
+    See the module docstring.
+    '''
+    def __init__(self, fn):
+        self.fn = fn
+        self._cache = {}
+        ft.update_wrapper(self, fn)
+
+    def __call__(self, *args):
+        key = tuple(map(type, args))
+        try:
+            compiled = self._cache[key]
+        except KeyError:
+            compiled = self._cache[key] = self._compile(key)
+        return compiled(*args)
+
+    def source(self, *arg_types) -> tp.Optional[str]:
+        '''
+        Python source for the given argument types or None if the
+        function could not be traced.
+        '''
+        compiled = self._cache.get(arg_types)
+        if compiled is None:
+            compiled = self._cache[arg_types] = self._compile(arg_types)
+        return getattr(compiled, '__source__', None)
+
+    def _compile(self, arg_types):
+        trace = Trace()
+        try:
+            with trace:
+                args = []
+                for T in arg_types:
+                    TT = _traced_t(T)
+                    node = trace.input(1 if TT is TracedBit else TT.size)
+                    args.append(TT._from_node_(node))
+                result = self.fn(*args)
+            outputs = []
+            out_types = []
+            build = _output_builder(result, outputs, out_types)
+        except UntraceableError:
+            return self.fn
+
+        name = getattr(self.fn, '__name__', 'f')
+        if not name.isidentifier():
+            name = 'f'
+        body = trace.emit(outputs, name='_' + name)
+        # wrapper unpacking the concrete arguments and packing the results
+        params = ', '.join(f'x{i}' for i in range(len(arg_types)))
+        values = ''.join(f'x{i}._value, ' for i in range(len(arg_types)))
+        src = body + (
+            f'def {name}({params}):\n'
+            f'    r = _{name}({values})\n'
+            f'    return {build}\n'
+        )
+        ns = {'_make': _make, 'Bit': Bit}
+        for k, T in enumerate(out_types):
+            ns[f'T{k}'] = T
+        exec(compile(src, f'<compiled {name}>', 'exec'), ns)
+        fn = ns[name]
+        fn.__source__ = src
+        return fn
+
+
+def _output_builder(result, outputs, out_types):
+    # python expression building the result from the tuple r of the
+    # emitted function, the types of the outputs are T0, T1, ...
+    def _build(value):
+        if isinstance(value, tuple):
+            return '(' + ''.join(_build(v) + ', ' for v in value) + ')'
+        elif isinstance(value, (TracedBit, TracedBitVector)):
+            T = _concrete_t(type(value))
+            k = len(outputs)
+            outputs.append(value._node)
+            if T is Bit:
+                return f'Bit(r[{k}])'
+            t = len(out_types)
+            out_types.append(T)
+            return f'_make(T{t}, r[{k}])'
+        else:
+            raise UntraceableError(f'Cannot compile output {value}')
+    return _build(result)
+
+
+def compile_function(fn: tp.Callable) -> CompiledFunction:
+    return CompiledFunction(fn)
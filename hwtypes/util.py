@@ -1,5 +1,6 @@
 from collections import OrderedDict
 from collections.abc import Mapping, MutableMapping
+import sys
 import typing as tp
 import types
 
@@ -128,6 +129,11 @@ class TypedProperty:
 class Method:
     '''
         Method descriptor which automatically sets the name of the bound function
+
+        Once the owner class is created the descriptor replaces itself with
+        the plain function so that the interpreter can bind it natively
+        instead of calling __get__ (and allocating a MethodType) on every
+        access.
     '''
     def __init__(self, m):
         self.m = m
@@ -141,6 +147,7 @@ class Method:
     def __set_name__(self, owner, name):
         self.m.__name__ = name
         self.m.__qualname__ = owner.__qualname__ + '.' + name
+        setattr(owner, name, self.m)
 
 
     def __call__(self, *args, **kwargs):
@@ -153,3 +160,24 @@ def _issubclass(sub : tp.Any, parent : type) -> bool:
         return issubclass(sub, parent)
     except TypeError:
         return False
+
+
+def _lookup_global(module : str, qualname : str) -> tp.Any:
+    obj = sys.modules.get(module)
+    try:
+        for name in qualname.split('.'):
+            obj = getattr(obj, name)
+    except AttributeError:
+        return None
+    return obj
+
+def _reduce_type(cls : type):
+    '''
+    Reducer registered with copyreg for the metaclasses of the type
+    machinery.  Types which can be found by name are pickled by reference
+    as usual while types built by the machinery (e.g. BitVector[13]) are
+    rebuilt from their parameters by cls._pickle_reduce_().
+    '''
+    if _lookup_global(cls.__module__, cls.__qualname__) is cls:
+        return cls.__qualname__
+    return cls._pickle_reduce_()
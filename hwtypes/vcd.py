@@ -0,0 +1,216 @@
+'''
+Streaming VCD (value change dump) writer for concrete hwtypes values.
+
+Signals are declared up front with their types.  ADT signals are flattened
+hierarchically: products and tuples become scopes with one child per field,
+sum types become scopes with a `tag` signal and one child per variant (the
+inactive variants dump as x) and enums dump the index of the member.
+
+    with VCDWriter(path, [('a', BitVector[16]), ('inst', Inst)]) as vcd:
+        for t, (a, inst) in enumerate(samples):
+            vcd.write(t, a, inst)
+
+Each write compares the flattened values with the previous ones and only
+formats the signals which changed.
+'''
+import datetime
+import typing as tp
+
+from .bit_vector import Bit, BitVector
+from .adt import Tuple, Sum, Enum, TaggedUnion
+
+__all__ = ['VCDWriter']
+
+
+def _ident(k : int) -> str:
+    # identifiers are strings over the printable ascii characters
+    chars = []
+    while True:
+        k, r = divmod(k, 94)
+        chars.append(chr(33 + r))
+        if k == 0:
+            return ''.join(chars)
+        k -= 1
+
+
+def _index_width(n : int) -> int:
+    return max((n - 1).bit_length(), 1)
+
+
+def _flatten(T, path, leaves):
+    '''
+    Appends (path, width) of the leaves of T to leaves and returns a function
+    fn(value, out) appending the leaf values (ints, None for x) to out.
+    '''
+    if isinstance(T, type) and issubclass(T, Bit):
+        leaves.append((path, 1))
+        return lambda v, out: out.append(1 if v else 0)
+    elif isinstance(T, type) and issubclass(T, BitVector) and T.is_sized:
+        leaves.append((path, T.size))
+        return lambda v, out: out.append(v._value)
+    elif isinstance(T, type) and issubclass(T, Enum) and T.is_bound:
+        index = {elem._value_ : i for i, elem in enumerate(T.fields)}
+        leaves.append((path, _index_width(len(index))))
+        return lambda v, out: out.append(index[v._value_])
+    elif isinstance(T, type) and issubclass(T, Tuple) and T.is_bound:
+        fns = [_flatten(t, path + (str(k),), leaves) for k, t in T.field_dict.items()]
+        def flatten_tuple(v, out):
+            for fn, x in zip(fns, v._value_):
+                fn(x, out)
+        return flatten_tuple
+    elif isinstance(T, type) and issubclass(T, Sum) and T.is_bound:
+        if issubclass(T, TaggedUnion):
+            variants = list(T.field_dict.items())
+            tag_of = lambda v: v._tag_
+        else:
+            # use a deterministic order for the unordered fields
+            variants = sorted(((t.__name__, t) for t in T.fields), key=lambda x: x[0])
+            index = {t : k for k, (_, t) in enumerate(variants)}
+            tag_of = lambda v: index[type(v._value_)]
+
+        leaves.append((path + ('tag',), _index_width(len(variants))))
+        fns = []
+        unknown = []
+        for name, t in variants:
+            start = len(leaves)
+            fns.append(_flatten(t, path + (name,), leaves))
+            unknown.append([None] * (len(leaves) - start))
+
+        def flatten_sum(v, out):
+            tag = tag_of(v)
+            out.append(tag)
+            for k, fn in enumerate(fns):
+                if k == tag:
+                    fn(v._value_, out)
+                else:
+                    out.extend(unknown[k])
+        return flatten_sum
+    else:
+        raise TypeError(f'Cannot dump values of type {T}')
+
+
+class VCDWriter:
+    '''
+    See the module docstring.
+
+    signals: sequence of (name, type) of the top level signals
+    scope: name of the top level scope
+    '''
+    def __init__(self,
+            file : tp.Union[str, tp.Any],
+            signals : tp.Sequence[tp.Tuple[str, type]],
+            timescale : str = '1 ns',
+            scope : str = 'top',
+            buffer_size : int = 1 << 20):
+        if isinstance(file, (str, bytes)) or hasattr(file, '__fspath__'):
+            self._file = open(file, 'w', buffering=buffer_size)
+            self._owns_file = True
+        else:
+            self._file = file
+            self._owns_file = False
+
+        leaves = []
+        self._flatteners = []
+        self._names = {}
+        for k, (name, T) in enumerate(signals):
+            if name in self._names:
+                raise ValueError(f'duplicate signal {name}')
+            start = len(leaves)
+            self._flatteners.append(_flatten(T, (name,), leaves))
+            self._names[name] = (k, start, len(leaves))
+
+        self._ids = [_ident(k) for k in range(len(leaves))]
+        self._widths = [w for _, w in leaves]
+        self._last = [object()] * len(leaves)
+        self._current = [None] * len(leaves)
+        self._time = None
+        self._write_header(leaves, timescale, scope)
+
+    def _write_header(self, leaves, timescale, scope):
+        lines = [
+            f'$date {datetime.datetime.now().ctime()} $end',
+            '$version hwtypes $end',
+            f'$timescale {timescale} $end',
+            f'$scope module {scope} $end',
+        ]
+        stack = []
+        for (path, width), ident in zip(leaves, self._ids):
+            scopes = path[:-1]
+            common = 0
+            while common < min(len(stack), len(scopes)) and stack[common] == scopes[common]:
+                common += 1
+            for _ in stack[common:]:
+                lines.append('$upscope $end')
+            for s in scopes[common:]:
+                lines.append(f'$scope module {s} $end')
+            stack = list(scopes)
+            lines.append(f'$var wire {width} {ident} {path[-1]} $end')
+        for _ in stack:
+            lines.append('$upscope $end')
+        lines.append('$upscope $end')
+        lines.append('$enddefinitions $end')
+        self._file.write('\n'.join(lines) + '\n')
+
+    def write(self, time : int, *values):
+        '''
+        Dump the values of all signals (in declaration order) at time
+        '''
+        if len(values) != len(self._flatteners):
+            raise ValueError(f'Expected {len(self._flatteners)} values not {len(values)}')
+        current = []
+        for fn, v in zip(self._flatteners, values):
+            fn(v, current)
+        self._current = current
+        self._dump(time)
+
+    def update(self, time : int, **values):
+        '''
+        Dump the values of the given signals at time, the other signals keep
+        their previous values
+        '''
+        current = list(self._current)
+        for name, v in values.items():
+            k, start, stop = self._names[name]
+            out = []
+            self._flatteners[k](v, out)
+            current[start:stop] = out
+        self._current = current
+        self._dump(time)
+
+    def _dump(self, time):
+        if self._time is not None and time < self._time:
+            raise ValueError('time must not decrease')
+        last = self._last
+        ids = self._ids
+        widths = self._widths
+        lines = []
+        for k, v in enumerate(self._current):
+            if v == last[k]:
+                continue
+            last[k] = v
+            if widths[k] == 1:
+                lines.append(f'{"x" if v is None else v}{ids[k]}\n')
+            elif v is None:
+                lines.append(f'bx {ids[k]}\n')
+            else:
+                lines.append(f'b{v:b} {ids[k]}\n')
+        if lines:
+            if time != self._time:
+                self._file.write(f'#{time}\n')
+                self._time = time
+            self._file.write(''.join(lines))
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
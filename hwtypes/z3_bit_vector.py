@@ -3,30 +3,34 @@ import typing as tp
 import itertools as it
 import functools as ft
 from .bit_vector_abc import AbstractBitVector, AbstractBit, TypeFamily
+from .bit_vector_abc import MutableBitVectorMixin
+from .simplify_policy import _simplify_on_construct, _defer_simplify
+from .op_memo import memo_op, memo_const
 
 from abc import abstractmethod
 
 import z3
 
+from .symbolic_context import current_context
+
 import re
 import warnings
-import weakref
 
 import random
 
 __ALL__ = ['z3BitVector', 'z3NumVector', 'z3SIntVector', 'z3UIntVector']
 
-_var_counter = it.count()
-_name_table = weakref.WeakValueDictionary()
-_free_names = []
-
 def _gen_name():
-    if _free_names:
-        return _free_names.pop()
-    name = f'V_{next(_var_counter)}'
-    while name in _name_table:
-        name = f'V_{next(_var_counter)}'
-    return name
+    return current_context().gen_z3_name()
+
+def _name_taken(name):
+    return name in current_context().z3_names
+
+def _register_name(name, value):
+    current_context().register_z3_name(name, value)
+
+def _z3_ctx():
+    return current_context().z3_ctx
 
 _name_re = re.compile(r'V_\d+')
 
@@ -41,6 +45,11 @@ class _AUTOMATIC:
 SMYBOLIC = _SMYBOLIC()
 AUTOMATIC = _AUTOMATIC()
 
+def _term_id(value):
+    return value._value.get_id()
+
+_memo_op = ft.partial(memo_op, _term_id)
+
 def bit_cast(fn):
     @ft.wraps(fn)
     def wrapped(self, other):
@@ -61,17 +70,17 @@ class z3Bit(AbstractBit):
         elif name is not AUTOMATIC:
             if not isinstance(name, str):
                 raise TypeError('Name must be string')
-            elif name in _name_table:
+            elif _name_taken(name):
                 raise ValueError(f'Name {name} already in use')
             elif _name_re.fullmatch(name):
                 warnings.warn('Name looks like an auto generated name, this might break things')
-            _name_table[name] = self
+            _register_name(name, self)
         elif name is AUTOMATIC and value is SMYBOLIC:
             name = _gen_name()
-            _name_table[name] = self
+            _register_name(name, self)
 
         if value is SMYBOLIC:
-            self._value = z3.Bool(name)
+            self._value = z3.Bool(name, _z3_ctx())
         elif isinstance(value, z3.BoolRef):
             self._value = value
         elif isinstance(value, z3Bit):
@@ -79,18 +88,20 @@ class z3Bit(AbstractBit):
                 warnings.warn('Changing the name of a z3Bit does not cause a new underlying smt variable to be created')
             self._value = value._value
         elif isinstance(value, bool):
-            self._value = z3.BoolVal(value)
+            self._value = z3.BoolVal(value, _z3_ctx())
         elif isinstance(value, int):
             if value not in {0, 1}:
                 raise ValueError('Bit must have value 0 or 1 not {}'.format(value))
-            self._value = z3.BoolVal(bool(value))
+            self._value = z3.BoolVal(bool(value), _z3_ctx())
         elif hasattr(value, '__bool__'):
-            self._value = z3.BoolVal(bool(value))
+            self._value = z3.BoolVal(bool(value), _z3_ctx())
         else:
             raise TypeError("Can't coerce {} to Bit".format(type(value)))
 
         self._name = name
-        self._value = z3.simplify(self._value)
+        self._deferred = _defer_simplify()
+        if _simplify_on_construct():
+            self._value = z3.simplify(self._value)
 
     def __repr__(self):
         if self._name is not AUTOMATIC:
@@ -100,30 +111,39 @@ class z3Bit(AbstractBit):
 
     @property
     def value(self):
+        if self._deferred:
+            self._value = z3.simplify(self._value)
+            self._deferred = False
         return self._value
 
     @bit_cast
+    @_memo_op(commutative=True)
     def __eq__(self, other : 'z3Bit') -> 'z3Bit':
-        return type(self)(self.value == other.value)
+        return type(self)(self._value == other._value)
 
     @bit_cast
+    @_memo_op(commutative=True)
     def __ne__(self, other : 'z3Bit') -> 'z3Bit':
-        return type(self)(self.value != other.value)
+        return type(self)(self._value != other._value)
 
+    @_memo_op()
     def __invert__(self) -> 'z3Bit':
-        return type(self)(z3.Not(self.value))
+        return type(self)(z3.Not(self._value))
 
     @bit_cast
+    @_memo_op(commutative=True)
     def __and__(self, other : 'z3Bit') -> 'z3Bit':
-        return type(self)(z3.And(self.value, other.value))
+        return type(self)(z3.And(self._value, other._value))
 
     @bit_cast
+    @_memo_op(commutative=True)
     def __or__(self, other : 'z3Bit') -> 'z3Bit':
-        return type(self)(z3.Or(self.value, other.value))
+        return type(self)(z3.Or(self._value, other._value))
 
     @bit_cast
+    @_memo_op(commutative=True)
     def __xor__(self, other : 'z3Bit') -> 'z3Bit':
-        return type(self)(z3.Xor(self.value, other.value))
+        return type(self)(z3.Xor(self._value, other._value))
 
     def ite(self, t_branch, f_branch):
         tb_t = type(t_branch)
@@ -151,9 +171,11 @@ class z3Bit(AbstractBit):
             T = type(t_branch)
 
 
-        return T(z3.If(self.value, t_branch.value, f_branch.value))
+        return T(z3.If(self._value, t_branch._value, f_branch._value))
 
 def _coerce(T : tp.Type['z3BitVector'], val : tp.Any) -> 'z3BitVector':
+    if type(val) is int:
+        return _const(T, val)
     if not isinstance(val, z3BitVector):
         return T(val)
     elif val.size != T.size:
@@ -161,6 +183,11 @@ def _coerce(T : tp.Type['z3BitVector'], val : tp.Any) -> 'z3BitVector':
     else:
         return val
 
+@memo_const
+def _const(T, val : int):
+    return T(val)
+
+
 def bv_cast(fn : tp.Callable[['z3BitVector', 'z3BitVector'], tp.Any]) -> tp.Callable[['z3BitVector', tp.Any], tp.Any]:
     @ft.wraps(fn)
     def wrapped(self : 'z3BitVector', other : tp.Any) -> tp.Any:
@@ -186,17 +213,17 @@ class z3BitVector(AbstractBitVector):
         elif name is not AUTOMATIC:
             if not isinstance(name, str):
                 raise TypeError('Name must be string')
-            elif name in _name_table:
+            elif _name_taken(name):
                 raise ValueError(f'Name {name} already in use')
             elif _name_re.fullmatch(name):
                 warnings.warn('Name looks like an auto generated name, this might break things')
-            _name_table[name] = self
+            _register_name(name, self)
         elif name is AUTOMATIC and value is SMYBOLIC:
             name = _gen_name()
-            _name_table[name] = self
+            _register_name(name, self)
         self._name = name
 
-        T = z3.BitVecSort(self.size)
+        T = z3.BitVecSort(self.size, _z3_ctx())
 
         if value is SMYBOLIC:
             self._value = z3.BitVec(name, T)
@@ -214,33 +241,35 @@ class z3BitVector(AbstractBitVector):
 
             if ext < 0:
                 warnings.warn('Truncating value from {} to {}'.format(type(value), type(self)))
-                self._value = value[:self.size].value
+                self._value = value[:self.size]._value
             elif ext > 0:
-                self._value = value.zext(ext).value
+                self._value = value.zext(ext)._value
             else:
-                self._value = value.value
+                self._value = value._value
         elif isinstance(value, z3.BoolRef):
-            self._value = z3.If(value, z3.BitVecVal(1, T), z3.BitVecVal(0, T))
+            self._value = z3.If(value, z3.BitVecVal(1, T, _z3_ctx()), z3.BitVecVal(0, T, _z3_ctx()))
 
         elif isinstance(value, z3Bit):
-            self._value = z3.If(value.value, z3.BitVecVal(1, T), z3.BitVecVal(0, T))
+            self._value = z3.If(value._value, z3.BitVecVal(1, T, _z3_ctx()), z3.BitVecVal(0, T, _z3_ctx()))
 
         elif isinstance(value, tp.Sequence):
             if len(value) != self.size:
                 raise ValueError('Iterable is not the correct size')
             cls = type(self)
             B1 = cls.unsized_t[1]
-            self._value = ft.reduce(lambda acc, elem : acc.concat(elem), map(B1, value)).value
+            self._value = ft.reduce(lambda acc, elem : acc.concat(elem), map(B1, value))._value
         elif isinstance(value, int):
-            self._value =  z3.BitVecVal(value, self.size)
+            self._value =  z3.BitVecVal(value, self.size, _z3_ctx())
 
         elif hasattr(value, '__int__'):
             value = int(value)
-            self._value = z3.BitVecVal(value, self.size)
+            self._value = z3.BitVecVal(value, self.size, _z3_ctx())
         else:
             raise TypeError("Can't coerce {} to z3BitVector".format(type(value)))
 
-        self._value = z3.simplify(self._value)
+        self._deferred = _defer_simplify()
+        if _simplify_on_construct():
+            self._value = z3.simplify(self._value)
         assert self._value.sort() == T
 
     def make_constant(self, value, size:tp.Optional[int]=None):
@@ -250,6 +279,9 @@ class z3BitVector(AbstractBitVector):
 
     @property
     def value(self):
+        if self._deferred:
+            self._value = z3.simplify(self._value)
+            self._deferred = False
         return self._value
 
     @property
@@ -284,7 +316,7 @@ class z3BitVector(AbstractBitVector):
             elif step != 1:
                 raise IndexError('SMT extract does not support step != 1')
 
-            v = z3.Extract(stop-1, start, self.value)
+            v = z3.Extract(stop-1, start, self._value)
             return type(self).unsized_t[v.sort().size()](v)
         elif isinstance(index, int):
             if index < 0:
@@ -293,131 +325,180 @@ class z3BitVector(AbstractBitVector):
             if not (0 <= index < size):
                 raise IndexError()
 
-            v = z3.Extract(index, index, self.value)
-            return self.get_family().Bit(v == z3.BitVecVal(1, 1))
+            return self._get_bit_(index)
         else:
             raise TypeError()
 
 
+    @_memo_op()
+    def _get_bit_(self, index):
+        v = z3.Extract(index, index, self._value)
+        return self.get_family().Bit(v == z3.BitVecVal(1, 1, _z3_ctx()))
+
     def __setitem__(self, index, value):
+        size = self.size
         if isinstance(index, slice):
-            raise NotImplementedError()
+            start, stop, step = index.indices(size)
+            if step != 1:
+                raise IndexError('SMT extract does not support step != 1')
+            stop = max(start, stop)
+            value = _coerce(type(self).unsized_t[stop - start], value)
         else:
             if not (isinstance(value, bool) or isinstance(value, z3Bit) or (isinstance(value, int) and value in {0, 1})):
                 raise ValueError("Second argument __setitem__ on a single BitVector index should be a bit, boolean or 0 or 1, not {value}".format(value=value))
 
             if index < 0:
-                index = self.size+index
+                index = size+index
 
-            if not (0 <= index < self.size):
+            if not (0 <= index < size):
                 raise IndexError()
 
-            mask = type(self)(1 << index)
-            self._value = z3Bit(value).ite(self | mask,  self & ~mask)._value
-
+            start, stop = index, index + 1
+            value = type(self).unsized_t[1](z3Bit(value))
+
+        if start == stop:
+            return
+        # splice the new bits between extracts of the old ones
+        v = self._value
+        new = value._value
+        if stop < size:
+            new = z3.Concat(z3.Extract(size - 1, stop, v), new)
+        if start > 0:
+            new = z3.Concat(new, z3.Extract(start - 1, 0, v))
+        self._assign_(type(self)(new))
+
+    def _assign_(self, other):
+        self._name = AUTOMATIC
+        self._value = other._value
+        self._deferred = other._deferred
 
     def __len__(self):
         return self.size
 
+    @_memo_op()
     def concat(self, other):
         T = type(self).unsized_t
         if not isinstance(other, T):
             raise TypeError(f'value must of type {T}')
-        return T[self.size + other.size](z3.Concat(other.value, self.value))
+        return T[self.size + other.size](z3.Concat(other._value, self._value))
 
+    @_memo_op()
     def bvnot(self):
-        return type(self)(~self.value)
+        return type(self)(~self._value)
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvand(self, other):
-        return type(self)(self.value & other.value)
+        return type(self)(self._value & other._value)
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvnand(self, other):
-        return type(self)(~(self.value & other.value))
+        return type(self)(~(self._value & other._value))
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvor(self, other):
-        return type(self)(self.value | other.value)
+        return type(self)(self._value | other._value)
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvnor(self, other):
-        return type(self)(~(self.value | other.value))
+        return type(self)(~(self._value | other._value))
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvxor(self, other):
-        return type(self)(self.value ^ other.value)
+        return type(self)(self._value ^ other._value)
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvxnor(self, other):
-        return type(self)(~(self.value ^ other.value))
+        return type(self)(~(self._value ^ other._value))
 
     @bv_cast
+    @_memo_op()
     def bvshl(self, other):
-        return type(self)(self.value << other.value)
+        return type(self)(self._value << other._value)
 
     @bv_cast
+    @_memo_op()
     def bvlshr(self, other):
-        return type(self)(z3.LShR(self.value, other.value))
+        return type(self)(z3.LShR(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvashr(self, other):
-        return type(self)(self.value >> other.value)
+        return type(self)(self._value >> other._value)
 
     @bv_cast
+    @_memo_op()
     def bvrol(self, other):
-        return type(self)(z3.RotateLeft(self.value, other.value))
+        return type(self)(z3.RotateLeft(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvror(self, other):
-        return type(self)(z3.RotateRight(self.value, other.value))
+        return type(self)(z3.RotateRight(self._value, other._value))
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvcomp(self, other):
-        return type(self).unsized_t[1](self.value == other.value)
+        return type(self).unsized_t[1](self._value == other._value)
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bveq(self,  other):
-        return self.get_family().Bit(self.value == other.value)
+        return self.get_family().Bit(self._value == other._value)
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvne(self, other):
-        return self.get_family().Bit(self.value != other.value)
+        return self.get_family().Bit(self._value != other._value)
 
     @bv_cast
+    @_memo_op()
     def bvult(self, other):
-        return self.get_family().Bit(z3.ULT(self.value, other.value))
+        return self.get_family().Bit(z3.ULT(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvule(self, other):
-        return self.get_family().Bit(z3.ULE(self.value, other.value))
+        return self.get_family().Bit(z3.ULE(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvugt(self, other):
-        return self.get_family().Bit(z3.UGT(self.value, other.value))
+        return self.get_family().Bit(z3.UGT(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvuge(self, other):
-        return self.get_family().Bit(z3.UGE(self.value, other.value))
+        return self.get_family().Bit(z3.UGE(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvslt(self, other):
-        return self.get_family().Bit(self.value < other.value)
+        return self.get_family().Bit(self._value < other._value)
 
     @bv_cast
+    @_memo_op()
     def bvsle(self, other):
-        return self.get_family().Bit(self.value <= other.value)
+        return self.get_family().Bit(self._value <= other._value)
 
     @bv_cast
+    @_memo_op()
     def bvsgt(self, other):
-        return self.get_family().Bit(self.value > other.value)
+        return self.get_family().Bit(self._value > other._value)
 
     @bv_cast
+    @_memo_op()
     def bvsge(self, other):
-        return self.get_family().Bit(self.value >= other.value)
+        return self.get_family().Bit(self._value >= other._value)
 
+    @_memo_op()
     def bvneg(self):
-        return type(self)(-self.value)
+        return type(self)(-self._value)
 
     def adc(self, other : 'z3BitVector', carry : z3Bit) -> tp.Tuple['z3BitVector', z3Bit]:
         """
@@ -441,32 +522,39 @@ class z3BitVector(AbstractBitVector):
         return self.bvne(0).ite(t_branch, f_branch)
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvadd(self, other):
-        return type(self)(self.value + other.value)
+        return type(self)(self._value + other._value)
 
     @bv_cast
+    @_memo_op()
     def bvsub(self, other):
-        return type(self)(self.value - other.value)
+        return type(self)(self._value - other._value)
 
     @bv_cast
+    @_memo_op(commutative=True)
     def bvmul(self, other):
-        return type(self)(self.value * other.value)
+        return type(self)(self._value * other._value)
 
     @bv_cast
+    @_memo_op()
     def bvudiv(self, other):
-        return type(self)(z3.UDiv(self.value, other.value))
+        return type(self)(z3.UDiv(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvurem(self, other):
-        return type(self)(z3.URem(self.value, other.value))
+        return type(self)(z3.URem(self._value, other._value))
 
     @bv_cast
+    @_memo_op()
     def bvsdiv(self, other):
-        return type(self)(self.value / other.value)
+        return type(self)(self._value / other._value)
 
     @bv_cast
+    @_memo_op()
     def bvsrem(self, other):
-        return type(self)(self.value % other.value)
+        return type(self)(self._value % other._value)
 
     __invert__ = bvnot
     __and__ = bvand
@@ -493,23 +581,26 @@ class z3BitVector(AbstractBitVector):
 
 
     @int_cast
+    @_memo_op()
     def repeat(self, n):
-        return type(self)(z3.RepeatBitVec(n, self.value))
+        return type(self)(z3.RepeatBitVec(n, self._value))
 
     @int_cast
+    @_memo_op()
     def sext(self, ext):
         if ext < 0:
             raise ValueError()
-        return type(self).unsized_t[self.size + ext](z3.SignExt(ext, self.value))
+        return type(self).unsized_t[self.size + ext](z3.SignExt(ext, self._value))
 
     def ext(self, ext):
         return self.zext(ext)
 
     @int_cast
+    @_memo_op()
     def zext(self, ext):
         if ext < 0:
             raise ValueError()
-        return type(self).unsized_t[self.size + ext](z3.ZeroExt(ext, self.value))
+        return type(self).unsized_t[self.size + ext](z3.ZeroExt(ext, self._value))
 
 # Used in testing
 #    def bits(self):
@@ -558,6 +649,12 @@ class z3SIntVector(z3NumVector):
     def __le__(self, other):
         return self.bvsle(other)
 
+class z3MutableBitVector(MutableBitVectorMixin, z3BitVector):
+    '''
+    z3BitVector whose term can be updated in place, e.g. acc += x or
+    reg[i] = b replace the term held by acc / reg
+    '''
+
 _Family_ = ht.TypeFamily(z3Bit, z3BitVector, z3UIntVector, z3SIntVector)
 
 
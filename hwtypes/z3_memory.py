@@ -0,0 +1,88 @@
+import z3
+
+from .z3_bit_vector import z3Bit, z3BitVector, _Family_, _coerce
+from .z3_bit_vector import SMYBOLIC, AUTOMATIC, _gen_name, _name_taken, _register_name, _z3_ctx
+from .memory_abc import AbstractMemory
+
+__all__ = ['z3Memory']
+
+
+class z3Memory(AbstractMemory):
+    '''
+    Memory as a z3 array, see AbstractMemory and SMTMemory.
+    '''
+    @staticmethod
+    def get_family():
+        return _Family_
+
+    def __init__(self, value=SMYBOLIC, *, name=AUTOMATIC):
+        T = type(self)
+        if not T.is_bound:
+            raise TypeError(f'{T} is not bound, use {T}[addr_width, data_width]')
+        if name is not AUTOMATIC and value is not SMYBOLIC:
+            raise TypeError('Can only name symbolic variables')
+        elif name is not AUTOMATIC:
+            if not isinstance(name, str):
+                raise TypeError('Name must be string')
+            elif _name_taken(name):
+                raise ValueError(f'Name {name} already in use')
+            _register_name(name, self)
+        elif value is SMYBOLIC:
+            name = _gen_name()
+            _register_name(name, self)
+
+        self._name = name
+        A = z3.BitVecSort(T.addr_width, _z3_ctx())
+        D = z3.BitVecSort(T.data_width, _z3_ctx())
+        if value is SMYBOLIC:
+            self._value = z3.Array(name, A, D)
+        elif isinstance(value, z3.ArrayRef):
+            if value.domain() != A or value.range() != D:
+                raise TypeError(f'Expected an array from {A} to {D} not {value.sort()}')
+            self._value = value
+        elif isinstance(value, z3Memory):
+            if type(value) is not T:
+                raise TypeError(f'Expected {T} not {type(value)}')
+            self._value = value._value
+        else:
+            default = _coerce(T.data_t, value)
+            self._value = z3.K(A, default._value)
+
+    @property
+    def value(self):
+        return self._value
+
+    def __repr__(self):
+        if self._name is not AUTOMATIC:
+            return f'{type(self)}({self._name})'
+        else:
+            return f'{type(self)}({self._value})'
+
+    def read(self, addr) -> z3BitVector:
+        addr = _coerce(type(self).addr_t, addr)
+        return type(self).data_t(z3.Select(self._value, addr._value))
+
+    def write(self, addr, value) -> None:
+        T = type(self)
+        addr = _coerce(T.addr_t, addr)
+        value = _coerce(T.data_t, value)
+        self._name = AUTOMATIC
+        self._value = z3.Store(self._value, addr._value, value._value)
+
+    def copy(self) -> 'z3Memory':
+        return type(self)(self)
+
+    def __eq__(self, other) -> z3Bit:
+        if not isinstance(other, z3Memory):
+            return NotImplemented
+        elif type(other) is not type(self):
+            raise TypeError(f'Cannot compare {type(self)} and {type(other)}')
+        return z3Bit(self._value == other._value)
+
+    def ite(self, select : z3Bit, other : 'z3Memory') -> 'z3Memory':
+        '''
+        select ? self : other
+        '''
+        if type(other) is not type(self):
+            raise TypeError(f'Expected {type(self)} not {type(other)}')
+        return type(self)(z3.If(z3Bit(select)._value, self._value, other._value))
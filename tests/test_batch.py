@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+import random
+
+import pytest
+
+from hwtypes import BitVector, SIntVector, Bit
+from hwtypes import batch_map
+from hwtypes.adt import Product
+
+
+class Out(Product):
+    res = BitVector[16]
+    neg = Bit
+
+
+def _alu(a, b, op):
+    family = type(a).get_family()
+    return op.ite(a + b, a - b) ^ family.BitVector[16](0x5a5a)
+
+
+def _product(a, b):
+    r = a * b
+    return Out(r, r[-1])
+
+
+def _inputs(n):
+    a = [BitVector[16](random.getrandbits(16)) for _ in range(n)]
+    b = [BitVector[16](random.getrandbits(16)) for _ in range(n)]
+    op = [Bit(random.getrandbits(1)) for _ in range(n)]
+    return a, b, op
+
+
+@pytest.mark.parametrize('threshold', [0, 1 << 30])
+def test_batch_map(threshold):
+    a, b, op = _inputs(1000)
+    res = batch_map(_alu, a, b, op, max_workers=2, shared_memory_threshold=threshold)
+    assert res == list(map(_alu, a, b, op))
+
+
+def test_objects_and_executor():
+    a, b, _ = _inputs(50)
+    with ThreadPoolExecutor(2) as executor:
+        res = batch_map(_product, a, b, executor=executor, chunksize=7)
+    assert res == list(map(_product, a, b))
+
+
+def test_wide_and_empty():
+    a = [SIntVector[70](random.getrandbits(70)) for _ in range(10)]
+    assert batch_map(SIntVector[70].__neg__, a, max_workers=1) == [-x for x in a]
+    assert batch_map(_alu, [], [], []) == []
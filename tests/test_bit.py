@@ -59,3 +59,14 @@ def test_operator_bit2(op, reference, v1, v2):
 
 def test_random():
     assert Bit.random() in [0, 1]
+
+
+def test_flyweight():
+    assert Bit(1) is Bit(True) is Bit(Bit(1)) is ~Bit(0)
+    assert Bit(0) is (Bit(1) & Bit(0))
+    assert not hasattr(Bit(0), '__dict__')
+
+    class MyBit(Bit): pass
+    assert type(MyBit(1)) is MyBit
+    assert MyBit(1) is MyBit(1)
+    assert MyBit(1) is not Bit(1)
@@ -0,0 +1,125 @@
+import pytest
+
+import pysmt.shortcuts as smt
+from pysmt.oracles import SizeOracle
+
+from hwtypes import BitVector, SIntVector, Bit
+from hwtypes import SMTBitVector, z3BitVector, BitVectorArray
+from hwtypes import compile_function
+from hwtypes.bit_vector_abc import AbstractBitVector
+
+
+def _reference(op, value, width):
+    bits = [(value >> i) & 1 for i in range(width)]
+    if op == 'popcount':
+        return sum(bits)
+    elif op == 'clz':
+        return next((k for k, b in enumerate(reversed(bits)) if b), width)
+    elif op == 'ctz':
+        return next((k for k, b in enumerate(bits) if b), width)
+    elif op == 'ffs':
+        return next((k + 1 for k, b in enumerate(bits) if b), 0)
+    elif op == 'reverse':
+        return sum(b << (width - 1 - i) for i, b in enumerate(bits))
+    elif op == 'reduce_and':
+        return all(bits)
+    elif op == 'reduce_or':
+        return any(bits)
+    elif op == 'reduce_xor':
+        return sum(bits) % 2
+
+
+COUNT_OPS = ['popcount', 'clz', 'ctz', 'ffs', 'reverse']
+REDUCE_OPS = ['reduce_and', 'reduce_or', 'reduce_xor']
+
+
+@pytest.mark.parametrize('op', COUNT_OPS + REDUCE_OPS)
+@pytest.mark.parametrize('width', [1, 2, 3, 5, 8])
+def test_bv(op, width):
+    for value in range(1 << width):
+        x = BitVector[width](value)
+        res = getattr(x, op)()
+        # the generic implementation agrees with the native one
+        assert getattr(AbstractBitVector, op)(x) == res
+        if op in REDUCE_OPS:
+            assert res == Bit(_reference(op, value, width))
+        else:
+            assert type(res) is BitVector[width]
+            assert res == _reference(op, value, width)
+
+
+@pytest.mark.parametrize('op', COUNT_OPS)
+def test_sint(op):
+    x = SIntVector[8](-100)
+    res = getattr(x, op)()
+    assert type(res) is SIntVector[8]
+    assert res.as_uint() == _reference(op, x.as_uint(), 8)
+
+
+@pytest.mark.parametrize('op', COUNT_OPS + REDUCE_OPS)
+@pytest.mark.parametrize('width', [1, 3, 8, 13])
+def test_smt(op, width):
+    x = SMTBitVector[width]()
+    res = getattr(x, op)()
+    # check against the (linear) reference encoding
+    bits = [x[i:i+1].zext(width - 1) for i in range(width)]
+    if op == 'popcount':
+        expected = sum(bits[1:], bits[0])
+    elif op == 'reverse':
+        expected = sum((b << (width - 1 - k) for k, b in enumerate(bits)), SMTBitVector[width](0))
+    elif op == 'reduce_xor':
+        expected = x[0]
+        for i in range(1, width):
+            expected = expected ^ x[i]
+    else:
+        expected = None
+
+    if expected is not None:
+        assert smt.is_valid(smt.EqualsOrIff(res.value, expected.value))
+
+    for value in (0, 1, (1 << width) - 1, 0b1011011 & ((1 << width) - 1)):
+        c = getattr(SMTBitVector[width](value), op)()
+        assert c.value.is_constant()
+        ref = _reference(op, value, width)
+        if op in REDUCE_OPS:
+            assert c.value.constant_value() == bool(ref)
+        else:
+            assert c.value.constant_value() == ref
+
+
+@pytest.mark.parametrize('op', COUNT_OPS + REDUCE_OPS)
+def test_z3(op):
+    for value in (0, 1, 0b10110100, 255):
+        res = getattr(z3BitVector[8](value), op)()
+        expected = getattr(BitVector[8](value), op)()
+        assert res == type(res)(int(expected))
+
+
+def test_smt_term_size():
+    # logarithmic depth encodings stay small
+    dag = SizeOracle.MEASURE_DAG_NODES
+    x = SMTBitVector[64]()
+    assert x.popcount().value.size(dag) < 50
+    assert x.clz().value.size(dag) < 80
+    assert x.reduce_xor().value.size(dag) < 30
+    # reverse is a balanced concat tree, not a chain
+    assert x.reverse().value.size(SizeOracle.MEASURE_DEPTH) <= 8
+
+
+@pytest.mark.parametrize('op', COUNT_OPS + REDUCE_OPS)
+def test_array(op):
+    pytest.importorskip('numpy')
+    values = [0, 1, 5, 32, 63, 40, 17]
+    res = getattr(BitVectorArray[6](values), op)()
+    assert res.to_list() == [getattr(BitVector[6](v), op)() for v in values]
+
+
+def test_traced():
+    def f(x : BitVector[8]):
+        return x.popcount() + x.clz(), x.reduce_xor()
+
+    cf = compile_function(f)
+    for value in (0, 1, 0b10110100, 255):
+        x = BitVector[8](value)
+        assert cf(x) == f(x)
+    assert cf.source(BitVector[8]) is not None
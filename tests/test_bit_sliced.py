@@ -0,0 +1,136 @@
+import operator
+import random
+
+import pytest
+
+from hwtypes import BitVector, UIntVector, SIntVector, Bit
+from hwtypes import SlicedBit, SlicedBitVector, SlicedSIntVector
+from hwtypes import to_sliced, from_sliced
+from hwtypes.bit_vector_abc import InconsistentSizeError
+
+NLANES = 40
+WIDTHS = [1, 3, 8]
+
+
+def _samples(width):
+    corner = [0, 1, (1 << width) - 1, 1 << (width - 1)]
+    return corner + [random.randint(0, (1 << width) - 1) for _ in range(NLANES - 4)]
+
+
+@pytest.mark.parametrize("op", [
+    operator.add,
+    operator.sub,
+    operator.mul,
+    operator.floordiv,
+    operator.mod,
+    operator.and_,
+    operator.or_,
+    operator.xor,
+    operator.lshift,
+    operator.rshift,
+    operator.eq,
+    operator.ne,
+    operator.lt,
+    operator.le,
+    operator.gt,
+    operator.ge,
+    BitVector.bvrol,
+    BitVector.bvror,
+    BitVector.bvcomp,
+])
+@pytest.mark.parametrize("width", WIDTHS)
+@pytest.mark.parametrize("T", [BitVector, UIntVector, SIntVector])
+def test_binary(op, width, T):
+    if op in (BitVector.bvrol, BitVector.bvror, BitVector.bvcomp):
+        name = op.__name__
+        op = lambda a, b: getattr(a, name)(b)
+    a = [T[width](x) for x in _samples(width)]
+    b = [T[width](x) for x in _samples(width)]
+    b[1] = T[width](0)
+    b[2] = a[2]
+    res = op(to_sliced(a), to_sliced(b))
+    assert from_sliced(res, NLANES) == [op(x, y) for x, y in zip(a, b)]
+
+
+@pytest.mark.parametrize("width", WIDTHS)
+def test_unary_and_ext(width):
+    a = [SIntVector[width](x) for x in _samples(width)]
+    s = to_sliced(a)
+    assert isinstance(s, SlicedSIntVector[width])
+    assert from_sliced(~s, NLANES) == [~x for x in a]
+    assert from_sliced(-s, NLANES) == [-x for x in a]
+    assert from_sliced(s.zext(2), NLANES) == [x.zext(2) for x in a]
+    assert from_sliced(s.sext(2), NLANES) == [x.sext(2) for x in a]
+    assert from_sliced(s.repeat(2), NLANES) == [x.repeat(2) for x in a]
+    assert from_sliced(s.concat(s), NLANES) == [x.concat(x) for x in a]
+    assert from_sliced(s[-1], NLANES) == [x[-1] for x in a]
+    assert from_sliced(s[::2], NLANES) == [x[::2] for x in a]
+
+
+@pytest.mark.parametrize("index", [slice(1, 4), slice(None, None, 2), slice(None, None, -1), slice(3, 3)])
+def test_setitem_slice(index):
+    a = [BitVector[8](x) for x in _samples(8)]
+    n = len(range(*index.indices(8)))
+    b = [BitVector[n](x & ((1 << n) - 1)) for x in _samples(8)]
+    s = to_sliced(a)
+    s[index] = to_sliced(b, BitVector[n])
+    for x, y in zip(a, b):
+        x[index] = y
+    assert from_sliced(s, NLANES) == a
+    with pytest.raises(InconsistentSizeError):
+        s[index] = SlicedBitVector[n + 1](0)
+
+
+def test_adc_ite():
+    a = [BitVector[8](x) for x in _samples(8)]
+    b = [BitVector[8](x) for x in _samples(8)]
+    c = [Bit(random.randint(0, 1)) for _ in range(NLANES)]
+    sa, sb, sc = to_sliced(a), to_sliced(b), to_sliced(c)
+    res, carry = sa.adc(sb, sc)
+    expected = [x.adc(y, z) for x, y, z in zip(a, b, c)]
+    assert from_sliced(res, NLANES) == [r for r, _ in expected]
+    assert from_sliced(carry, NLANES) == [co for _, co in expected]
+
+    res = sc.ite(sa, sb + 1)
+    assert from_sliced(res, NLANES) == [z.ite(x, y + 1) for x, y, z in zip(a, b, c)]
+    # polymorphic branches
+    res = sc.ite(sa, SlicedSIntVector[8](3))
+    assert from_sliced(res, NLANES) == [BitVector[8](x if z else 3) for x, z in zip(a, c)]
+
+
+def test_transpose():
+    a = [BitVector[5](x) for x in _samples(5)]
+    s = to_sliced(a)
+    assert isinstance(s, SlicedBitVector[5])
+    assert from_sliced(s, NLANES) == a
+    assert from_sliced(s, 3) == a[:3]
+    assert from_sliced(to_sliced(range(7), BitVector[4]), 7) == [BitVector[4](x) for x in range(7)]
+    # constants broadcast to every lane
+    assert from_sliced(SlicedBitVector[5](3), 4) == [BitVector[5](3)] * 4
+    assert from_sliced(SlicedBit(1), 4) == [Bit(1)] * 4
+    with pytest.raises(TypeError):
+        to_sliced([BitVector[5](1), BitVector[4](1)])
+
+
+def test_family_generic():
+    def f(family, a, b, sel):
+        BV = family.BitVector[8]
+        return sel.ite((a + b) ^ BV(0x5a), a - (b >> 2)), a < b
+
+    fam = SlicedBitVector.get_family()
+    a = [BitVector[8](x) for x in _samples(8)]
+    b = [BitVector[8](x) for x in _samples(8)]
+    sel = [Bit(random.randint(0, 1)) for _ in range(NLANES)]
+    res, lt = f(fam, to_sliced(a), to_sliced(b), to_sliced(sel))
+    expected = [f(BitVector.get_family(), x, y, z) for x, y, z in zip(a, b, sel)]
+    assert from_sliced(res, NLANES) == [r for r, _ in expected]
+    assert from_sliced(lt, NLANES) == [l for _, l in expected]
+
+
+def test_errors():
+    with pytest.raises(InconsistentSizeError):
+        SlicedBitVector[4](1) + SlicedBitVector[3](1)
+    with pytest.raises(TypeError):
+        bool(SlicedBit(1))
+    with pytest.raises(ValueError):
+        SlicedBit(2)
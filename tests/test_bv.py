@@ -1,6 +1,6 @@
 import pytest
 import operator
-from hwtypes import BitVector, Bit
+from hwtypes import BitVector, UIntVector, SIntVector, Bit
 
 NTESTS = 4
 WIDTHS = [1,2,4,8]
@@ -152,3 +152,75 @@ def test_coercion(op):
     a = BitVector.random(16)
     b = BitVector.random(16)
     assert op(a, b) == op(int(a), b) == op(a, int(b))
+
+
+def test_slots():
+    for T in (BitVector[8], UIntVector[8], SIntVector[8]):
+        assert not hasattr(T(1), '__dict__')
+    a, b = BitVector[8](1), BitVector[8](2)
+    assert (a == b) is Bit(0)
+    assert (a != b) is Bit(1)
+    assert a[0] is Bit(1)
+
+
+def _ref_slice(bv, index):
+    bits = bv.bits()[index]
+    return BitVector[len(bits)](bits)
+
+
+@pytest.mark.parametrize("width", [1, 7, 64, 130])
+@pytest.mark.parametrize("index", [
+    slice(None),
+    slice(1, None),
+    slice(None, -1),
+    slice(3, 5),
+    slice(5, 3),
+    slice(None, None, 2),
+    slice(1, None, 3),
+    slice(None, None, -1),
+    slice(-2, 0, -2),
+])
+def test_slice(width, index):
+    for _ in range(NTESTS):
+        bv = BitVector.random(width)
+        ref = _ref_slice(bv, index)
+        res = bv[index]
+        assert type(res) is type(ref)
+        assert res == ref
+
+
+@pytest.mark.parametrize("width", [1, 5, 64, 100])
+def test_rotate_ext_repeat(width):
+    for _ in range(NTESTS):
+        bv = BitVector.random(width)
+        s = BitVector.random(width)
+        k = s.as_uint() % width
+        assert bv.bvrol(s) == bv[width-k:].concat(bv[:width-k]) if k else bv.bvrol(s) == bv
+        assert bv.bvror(s) == bv[k:].concat(bv[:k])
+        assert bv.bvrol(s).bvror(s) == bv
+        assert bv.repeat(3) == BitVector[3*width](bv.bits() * 3)
+        assert bv.sext(5) == BitVector[width+5](bv.bits() + [bv.bits()[-1]] * 5)
+        assert bv.zext(5) == BitVector[width+5](bv.bits() + [0] * 5)
+        assert bv.binary_string() == "".join(str(b) for b in reversed(bv.bits()))
+
+
+def test_family_bit():
+    # the comparisons return the Bit of the family of the vector
+    from hwtypes.bit_vector_abc import TypeFamily
+
+    class MyBit(Bit):
+        @staticmethod
+        def get_family():
+            return _MyFamily
+
+    class MyBV(BitVector):
+        @staticmethod
+        def get_family():
+            return _MyFamily
+
+    _MyFamily = TypeFamily(MyBit, MyBV, None, None)
+    x, y = MyBV[8](3), MyBV[8](5)
+    for r in (x == y, x != y, x < y, x <= y, x > y, x >= y, x.bvslt(y), x.bvsge(y),
+              x[0], x.reduce_or(), x.add_with_flags(y).carry):
+        assert type(r) is MyBit
+    assert type(BitVector[8](3) < 5) is Bit
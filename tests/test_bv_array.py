@@ -0,0 +1,186 @@
+import operator
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from hwtypes import BitVector, SIntVector, Bit
+from hwtypes import BitArray, BitVectorArray, UIntVectorArray, SIntVectorArray
+from hwtypes.bit_vector_abc import InconsistentSizeError
+
+NSAMPLES = 16
+WIDTHS = [1, 3, 8, 31, 63, 64, 65, 100, 128]
+
+
+def _samples(width):
+    corner = [0, 1, (1 << width) - 1, 1 << (width - 1)]
+    rand = [random.randint(0, (1 << width) - 1) for _ in range(NSAMPLES)]
+    return corner + rand
+
+
+def _pairs(width):
+    a = _samples(width)
+    b = _samples(width)
+    random.shuffle(b)
+    # make sure division by zero is exercised
+    b[1] = 0
+    return a, b
+
+
+@pytest.mark.parametrize("op", [
+    operator.add,
+    operator.sub,
+    operator.mul,
+    operator.floordiv,
+    operator.mod,
+    operator.and_,
+    operator.or_,
+    operator.xor,
+    operator.lshift,
+    operator.rshift,
+])
+@pytest.mark.parametrize("width", WIDTHS)
+@pytest.mark.parametrize("T, AT", [
+    (BitVector, BitVectorArray),
+    (SIntVector, SIntVectorArray),
+])
+def test_binary(op, width, T, AT):
+    a, b = _pairs(width)
+    if op in (operator.lshift, operator.rshift):
+        b = [v % (width + 2) for v in b]
+    res = op(AT[width](a), AT[width](b))
+    assert isinstance(res, AT[width])
+    expected = [op(T[width](x), T[width](y)) for x, y in zip(a, b)]
+    assert res.to_list() == expected
+
+
+@pytest.mark.parametrize("op", [
+    operator.eq,
+    operator.ne,
+    operator.lt,
+    operator.le,
+    operator.gt,
+    operator.ge,
+])
+@pytest.mark.parametrize("width", WIDTHS)
+@pytest.mark.parametrize("T, AT", [
+    (BitVector, BitVectorArray),
+    (SIntVector, SIntVectorArray),
+])
+def test_comparison(op, width, T, AT):
+    a, b = _pairs(width)
+    b[2] = a[2]
+    res = op(AT[width](a), AT[width](b))
+    assert isinstance(res, BitArray)
+    expected = [op(T[width](x), T[width](y)) for x, y in zip(a, b)]
+    assert res.to_list() == expected
+
+
+@pytest.mark.parametrize("width", WIDTHS)
+def test_unary_and_ext(width):
+    a = _samples(width)
+    x = BitVectorArray[width](a)
+    ref = [BitVector[width](v) for v in a]
+    assert (~x).to_list() == [~v for v in ref]
+    assert (-x).to_list() == [-v for v in ref]
+    assert x.zext(3).to_list() == [v.zext(3) for v in ref]
+    assert x.sext(70).to_list() == [v.sext(70) for v in ref]
+    assert x.repeat(3).to_list() == [v.repeat(3) for v in ref]
+    assert x.concat(x).to_list() == [v.concat(v) for v in ref]
+
+
+@pytest.mark.parametrize("width", WIDTHS)
+def test_rotate(width):
+    a, b = _pairs(width)
+    x, y = BitVectorArray[width](a), BitVectorArray[width](b)
+    ref = [(BitVector[width](v), BitVector[width](s)) for v, s in zip(a, b)]
+    assert x.bvrol(y).to_list() == [v.bvrol(s) for v, s in ref]
+    assert x.bvror(y).to_list() == [v.bvror(s) for v, s in ref]
+    assert x.bvashr(y).to_list() == [v.bvashr(s) for v, s in ref]
+
+
+@pytest.mark.parametrize("width", [5, 64, 80])
+def test_getitem(width):
+    a = _samples(width)
+    x = BitVectorArray[width](a)
+    ref = [BitVector[width](v) for v in a]
+    assert x[0].to_list() == [v[0] for v in ref]
+    assert x[-1].to_list() == [v[-1] for v in ref]
+    assert x[1:4].to_list() == [v[1:4] for v in ref]
+    assert x[::2].to_list() == [v[::2] for v in ref]
+
+
+@pytest.mark.parametrize("width", [5, 64, 80])
+@pytest.mark.parametrize("index", [slice(1, 4), slice(None, None, 2), slice(None, None, -1), slice(3, 3)])
+def test_setitem_slice(width, index):
+    a = _samples(width)
+    n = len(range(*index.indices(width)))
+    b = [v & ((1 << n) - 1) for v in _samples(width)]
+    x = BitVectorArray[width](a)
+    x[index] = BitVectorArray[n](b)
+    ref = []
+    for v, w in zip(a, b):
+        v = BitVector[width](v)
+        v[index] = BitVector[n](w)
+        ref.append(v)
+    assert x.to_list() == ref
+    with pytest.raises(InconsistentSizeError):
+        x[index] = BitVectorArray[n + 1](0)
+
+
+@pytest.mark.parametrize("width", [8, 64, 96])
+def test_adc(width):
+    a, b = _pairs(width)
+    c = [random.randint(0, 1) for _ in a]
+    res, carry = BitVectorArray[width](a).adc(BitVectorArray[width](b), BitVectorArray[1](c))
+    expected = [BitVector[width](x).adc(BitVector[width](y), BitVector[1](z))
+                for x, y, z in zip(a, b, c)]
+    assert res.to_list() == [r for r, _ in expected]
+    assert carry.to_list() == [c for _, c in expected]
+
+
+def test_ite():
+    a, b = _pairs(16)
+    s = [random.randint(0, 1) for _ in a]
+    sel = BitArray(s)
+    x, y = BitVectorArray[16](a), BitVectorArray[16](b)
+    res = sel.ite(x, y)
+    assert isinstance(res, BitVectorArray[16])
+    assert res.to_list() == [BitVector[16](u if c else v) for c, u, v in zip(s, a, b)]
+    r0, r1 = sel.ite((x, sel), (y, ~sel))
+    assert r0.to_list() == res.to_list()
+    assert r1.to_list() == [Bit(1)] * len(s)
+
+
+def test_constants_broadcast():
+    x = BitVectorArray[8]([1, 2, 255])
+    assert (x + 1).to_list() == [BitVector[8](v) for v in (2, 3, 0)]
+    assert (1 + x).to_list() == [BitVector[8](v) for v in (2, 3, 0)]
+    assert (x == BitVector[8](2)).to_list() == [Bit(0), Bit(1), Bit(0)]
+    assert int(BitVectorArray[8](3) + 4) == 7
+
+
+def test_size_mismatch():
+    with pytest.raises(InconsistentSizeError):
+        BitVectorArray[8]([1]) + BitVectorArray[4]([1])
+
+
+def test_family_generic():
+    def alu(family, a, b, op):
+        BV = family.BitVector[16]
+        return op.ite(a + b, a - b) & BV(0xfff0)
+
+    a, b = _pairs(16)
+    op = [random.randint(0, 1) for _ in a]
+    fam = BitVectorArray.get_family()
+    res = alu(fam, fam.BitVector[16](a), fam.BitVector[16](b), fam.Bit(op))
+    expected = [alu(BitVector.get_family(), BitVector[16](x), BitVector[16](y), Bit(o))
+                for x, y, o in zip(a, b, op)]
+    assert res.to_list() == expected
+
+
+def test_from_ndarray():
+    arr = np.array([-1, 0, 5], dtype=np.int64)
+    assert SIntVectorArray[100](arr).to_list() == [SIntVector[100](v) for v in (-1, 0, 5)]
+    assert BitVectorArray[8](arr).to_list() == [BitVector[8](v) for v in (-1, 0, 5)]
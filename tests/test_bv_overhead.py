@@ -0,0 +1,94 @@
+import gc
+import operator
+import sys
+
+import pytest
+
+from hwtypes import BitVector, SIntVector
+
+# Overhead target: a binary operator on two operands of the same type runs
+# at most this many python frames (dispatch, op, trusted constructor).
+# Signed ops additionally call as_sint on their operands.
+MAX_FRAMES = 3
+# Mixing in a python int adds the coercion frames.
+MAX_FRAMES_INT = 6
+
+
+def _count_frames(f, *args):
+    frames = []
+    def profile(frame, event, arg):
+        if event == 'call':
+            frames.append(frame.f_code.co_name)
+    # a collection during f would show up as weakref callbacks
+    gc.disable()
+    sys.setprofile(profile)
+    try:
+        f(*args)
+    finally:
+        sys.setprofile(None)
+        gc.enable()
+    return [f for f in frames if f != 'as_sint']
+
+
+@pytest.mark.parametrize("op", [
+    operator.add,
+    operator.sub,
+    operator.mul,
+    operator.floordiv,
+    operator.mod,
+    operator.and_,
+    operator.or_,
+    operator.xor,
+    operator.lshift,
+    operator.rshift,
+])
+@pytest.mark.parametrize("T", [BitVector[16], SIntVector[16]])
+def test_binary_op_frames(op, T):
+    a, b = T(1234), T(-7)
+    frames = _count_frames(op, a, b)
+    assert len(frames) <= MAX_FRAMES, frames
+    frames = _count_frames(op, a, 3)
+    assert len(frames) <= MAX_FRAMES_INT, frames
+
+
+def test_no_init_on_fast_path():
+    a, b = BitVector[8](3), BitVector[8](4)
+    frames = _count_frames(operator.add, a, b)
+    assert '__init__' not in frames
+    assert '__call__' not in frames
+
+
+@pytest.mark.parametrize("op", [
+    operator.eq,
+    operator.ne,
+    operator.lt,
+    operator.le,
+    operator.gt,
+    operator.ge,
+])
+@pytest.mark.parametrize("T", [BitVector[16], SIntVector[16]])
+def test_comparison_frames(op, T):
+    # the resulting Bit is interned so Bit.__new__ is the last frame
+    a, b = T(1234), T(-7)
+    frames = _count_frames(op, a, b)
+    assert len(frames) <= MAX_FRAMES, frames
+
+
+@pytest.mark.parametrize("f", [
+    lambda bv: bv[3:11],
+    lambda bv: bv[::2],
+    lambda bv: bv.zext(8),
+    lambda bv: bv.sext(8),
+    lambda bv: bv.repeat(4),
+    lambda bv: bv.bvrol(3),
+    lambda bv: bv.bvror(5),
+])
+def test_width_independent_frames(f):
+    # Field extraction, extension, repeat and rotate run in integer
+    # arithmetic: the python work must not grow with the width
+    narrow, wide = BitVector.random(16), BitVector.random(4096)
+    # warm up the sized type cache
+    f(narrow), f(wide)
+    narrow = _count_frames(f, narrow)
+    wide = _count_frames(f, wide)
+    assert len(narrow) == len(wide), (narrow, wide)
@@ -0,0 +1,115 @@
+import pickle
+
+import pytest
+
+from hwtypes import BitVector, SIntVector, UIntVector, Bit, Domain
+from hwtypes.adt import Tuple, Product, Sum, Enum, TaggedUnion
+
+
+class Op(Enum):
+    add = 0
+    sub = 1
+    mul = 2
+
+
+class Inst(Product):
+    op = Op
+    a = BitVector[3]
+    b = Bit
+
+
+class Val(TaggedUnion):
+    op = Op
+    imm = SIntVector[2]
+
+
+@pytest.mark.parametrize('T', [
+    Bit, BitVector[4], SIntVector[3], UIntVector[5], Op, Inst, Val,
+    Tuple[Bit, Op], Sum[Bit, BitVector[2], Inst],
+])
+def test_domain(T):
+    d = Domain(T)
+    values = list(d)
+    assert len(values) == len(d)
+    assert len(set(values)) == len(d)
+    assert all(type(v) is T for v in values)
+    assert [d[i] for i in range(len(d))] == values
+    assert [d.index(v) for v in values] == list(range(len(d)))
+    assert all(v in d for v in values)
+    assert d[-1] == values[-1]
+    assert list(d[1::3]) == values[1::3]
+    assert list(d[::-2]) == values[::-2]
+    assert list(d[::-2][1:]) == values[::-2][1:]
+
+
+def test_sizes():
+    assert len(Domain(Bit)) == 2
+    assert len(Domain(BitVector[16])) == 1 << 16
+    assert Domain(SIntVector[64]).size == 1 << 64
+    assert Domain(SIntVector[64]).shard(3, 4).size == 1 << 62
+    assert len(Domain(Inst)) == 3 * 8 * 2
+    assert len(Domain(Val)) == 3 + 4
+    assert list(Domain(SIntVector[2])) == [SIntVector[2](x) for x in (0, 1, -2, -1)]
+    assert Domain(BitVector[64])[-1] == BitVector[64](-1)
+
+
+def test_enumerate():
+    # enumerate is not exhaustive, bit vector fields only take the value 0
+    assert set(Inst.enumerate()) == {Inst(op, BitVector[3](0), Bit(0)) for op in Op.enumerate()}
+    T = Tuple[BitVector[32], BitVector[32]]
+    assert list(T.enumerate()) == [T(BitVector[32](0), BitVector[32](0))]
+    assert set(Val.enumerate()) == {Val(op=op) for op in Op.enumerate()} | {Val(imm=SIntVector[2](0))}
+    assert set(Domain(Inst)) >= set(Inst.enumerate())
+
+
+@pytest.mark.parametrize('count', [1, 3, 7, 16])
+def test_partitions(count):
+    d = Domain(BitVector[4])
+    values = list(d)
+    shards = [list(d.shard(k, count)) for k in range(count)]
+    assert sum(shards, []) == values
+    assert max(map(len, shards)) - min(map(len, shards)) <= 1
+    strides = [d.stride(k, count) for k in range(count)]
+    assert sorted(sum(map(list, strides), []), key=int) == values
+    assert sum(map(list, d.chunks(count)), []) == values
+    with pytest.raises(IndexError):
+        d.shard(count, count)
+
+
+def test_contains():
+    d = Domain(BitVector[4])[4:8]
+    assert BitVector[4](5) in d
+    assert BitVector[4](9) not in d
+    assert BitVector[5](5) not in d
+    assert 5 not in d
+    assert d.index(BitVector[4](6)) == 2
+    with pytest.raises(ValueError):
+        d.index(BitVector[4](9))
+
+
+def test_pickle():
+    d = Domain(Inst).shard(1, 3)
+    e = pickle.loads(pickle.dumps(d))
+    assert list(e) == list(d)
+    assert repr(e) == repr(d)
+
+
+@pytest.mark.parametrize('T', [BitVector[32], BitVector[64]])
+def test_pickle_large(T):
+    # unpickling only checks the ends of the range
+    d = Domain(T).shard(1, 4)
+    e = pickle.loads(pickle.dumps(d))
+    assert e.indices == d.indices
+    assert e[0] == d[0] == T(1 << (T.size - 2))
+    assert e.size == 1 << (T.size - 2)
+
+
+@pytest.mark.parametrize('T', [Bit, BitVector[7], SIntVector[8], UIntVector[70]])
+def test_arrays(T):
+    pytest.importorskip('numpy')
+    d = Domain(T) if T is Bit or T.size <= 8 else Domain(T)[-300:]
+    values = list(d)
+    assert sum((a.to_list() for a in d.arrays(64)), []) == values
+    assert d[::-3].to_array().to_list() == values[::-3]
+    with pytest.raises(TypeError):
+        Domain(Inst).to_array()
@@ -0,0 +1,130 @@
+import itertools
+
+import pytest
+
+import pysmt.shortcuts as smt
+
+from hwtypes import BitVector, SIntVector, Bit, ArithFlags
+from hwtypes import SMTBitVector, z3BitVector
+from hwtypes import overflow
+from hwtypes.bit_vector_abc import AbstractBitVector
+
+
+@pytest.mark.parametrize('width', [1, 2, 3, 5])
+def test_add_with_flags(width):
+    T = BitVector[width]
+    lo, hi = -(1 << (width - 1)), (1 << (width - 1)) - 1
+    for a, b, c in itertools.product(range(1 << width), range(1 << width), (0, 1)):
+        x, y = T(a), T(b)
+        flags = x.add_with_flags(y, c)
+        assert isinstance(flags, ArithFlags)
+        assert flags == AbstractBitVector.add_with_flags(x, y, c)
+        assert flags.result == x + y + c
+        assert flags.carry == Bit(a + b + c > T._mask_)
+        assert flags.overflow == Bit(not lo <= x.as_sint() + y.as_sint() + c <= hi)
+        assert flags.zero == Bit(flags.result == 0)
+        assert flags.negative == flags.result[-1]
+        if c == 0:
+            assert flags.overflow == overflow(x, y, flags.result)
+            assert (flags.result, flags.carry) == x.adc(y, Bit(0))
+
+
+@pytest.mark.parametrize('width', [1, 2, 3, 5])
+def test_sub_with_flags(width):
+    T = BitVector[width]
+    lo, hi = -(1 << (width - 1)), (1 << (width - 1)) - 1
+    for a, b, c in itertools.product(range(1 << width), range(1 << width), (0, 1)):
+        x, y = T(a), T(b)
+        flags = x.sub_with_flags(y, c)
+        assert flags == AbstractBitVector.sub_with_flags(x, y, c)
+        assert flags.result == x - y - (1 - c)
+        assert flags.carry == Bit(a - b - (1 - c) >= 0)
+        assert flags.overflow == Bit(not lo <= x.as_sint() - y.as_sint() - (1 - c) <= hi)
+        assert flags.zero == Bit(flags.result == 0)
+        assert flags.negative == flags.result[-1]
+
+
+@pytest.mark.parametrize('width', [1, 2, 4])
+def test_saturating(width):
+    T = BitVector[width]
+    lo, hi = -(1 << (width - 1)), (1 << (width - 1)) - 1
+    clamp = lambda v: max(lo, min(hi, v))
+    for a, b in itertools.product(range(1 << width), repeat=2):
+        x, y = T(a), T(b)
+        assert x.uadd_sat(y).as_uint() == min(a + b, T._mask_)
+        assert x.usub_sat(y).as_uint() == max(a - b, 0)
+        assert x.sadd_sat(y).as_sint() == clamp(x.as_sint() + y.as_sint())
+        assert x.ssub_sat(y).as_sint() == clamp(x.as_sint() - y.as_sint())
+
+
+def test_types():
+    x = SIntVector[8](100)
+    flags = x.add_with_flags(100)
+    assert type(flags.result) is SIntVector[8]
+    assert flags.overflow and flags.negative and not flags.carry
+    assert x.sadd_sat(100) == SIntVector[8](127)
+    assert type(x.sadd_sat(100)) is SIntVector[8]
+    assert x.ssub_sat(-100) == 127
+    assert SIntVector[8](-100).ssub_sat(100) == -128
+
+
+@pytest.mark.parametrize('method', ['add_with_flags', 'sub_with_flags'])
+def test_smt(method):
+    width = 6
+    x, y = SMTBitVector[width](), SMTBitVector[width]()
+    c = SMTBitVector[1]()
+    flags = getattr(x, method)(y, c)
+    if method == 'add_with_flags':
+        wide = x.zext(1) + y.zext(1) + c.zext(width)
+        swide = x.sext(1) + y.sext(1) + c.zext(width)
+        carry = wide[width]
+    else:
+        borrow = ~c
+        wide = x.zext(1) - y.zext(1) - borrow.zext(width)
+        swide = x.sext(1) - y.sext(1) - borrow.zext(width)
+        carry = ~wide[width]
+    expected = [
+        wide[:width],
+        carry,
+        swide[width] ^ swide[width - 1],
+        wide[:width] == 0,
+        wide[width - 1],
+    ]
+    for got, exp in zip(flags, expected):
+        assert smt.is_valid(smt.EqualsOrIff(got.value, exp.value))
+
+    # the flags share a single adder
+    terms = [f.value for f in flags]
+    adders = {t for f in terms for t in _subterms(f) if t.is_bv_add()}
+    assert len(adders) <= 2
+
+
+def _subterms(term):
+    seen = set()
+    todo = [term]
+    while todo:
+        t = todo.pop()
+        if t not in seen:
+            seen.add(t)
+            todo.extend(t.args())
+    return seen
+
+
+@pytest.mark.parametrize('op', ['uadd_sat', 'usub_sat', 'sadd_sat', 'ssub_sat'])
+def test_smt_saturating(op):
+    x, y = SMTBitVector[4](), SMTBitVector[4]()
+    res = getattr(x, op)(y)
+    for a, b in itertools.product(range(16), repeat=2):
+        sub = {x.value : smt.BV(a, 4), y.value : smt.BV(b, 4)}
+        value = res.value.substitute(sub).simplify().constant_value()
+        assert value == getattr(BitVector[4](a), op)(BitVector[4](b)).as_uint()
+
+
+def test_z3():
+    for a, b in [(0, 0), (200, 100), (100, 28), (127, 1), (3, 5)]:
+        flags = z3BitVector[8](a).add_with_flags(z3BitVector[8](b))
+        expected = BitVector[8](a).add_with_flags(BitVector[8](b))
+        assert flags.result == type(flags.result)(expected.result.as_uint())
+        for got, exp in zip(flags[1:], expected[1:]):
+            assert got == type(got)(bool(exp))
+        assert z3BitVector[8](a).usub_sat(z3BitVector[8](b)) == z3BitVector[8](max(a - b, 0))
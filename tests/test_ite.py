@@ -61,3 +61,20 @@ for i in range(N_TESTS):
 def test_ite(a, b, c):
     res = c.ite(a, b)
     assert res == (a if int(c) else b)
+
+
+def test_ite_plan_cache():
+    from hwtypes.bit_vector_util import _ite_plan
+    BV = BitVector[8]
+    t = (BV(1), (Bit(0), BV(2)))
+    f = (BV(3), (Bit(1), BV(4)))
+    hits = _ite_plan.cache_info().hits
+    assert Bit(1).ite(t, f) == t
+    assert Bit(0).ite(t, f) == f
+    # the second ite reuses the plan of the first
+    assert _ite_plan.cache_info().hits > hits
+
+    with pytest.raises(TypeError):
+        Bit(0).ite(t, (BV(3), Bit(1)))
+    with pytest.raises(TypeError):
+        Bit(0).ite(t, (BV(3), (Bit(1), BitVector[4](4))))
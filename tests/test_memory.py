@@ -0,0 +1,153 @@
+import pickle
+import random
+
+import pytest
+
+import pysmt.shortcuts as smt
+import z3
+
+from hwtypes import BitVector, Bit, InconsistentSizeError
+from hwtypes import Memory, SMTMemory, z3Memory
+from hwtypes import SMTBitVector, SMTBit, z3BitVector
+from hwtypes import SimplifyPolicy, simplify_policy
+
+
+def test_types():
+    M = Memory[16, 12]
+    assert M is Memory[16, 12]
+    assert (M.addr_width, M.data_width) == (16, 12)
+    assert M.addr_t is BitVector[16] and M.data_t is BitVector[12]
+    assert SMTMemory[4, 8].data_t is SMTBitVector[8]
+    assert pickle.loads(pickle.dumps(M)) is M
+    with pytest.raises(TypeError):
+        Memory()
+    with pytest.raises(TypeError):
+        M[1, 2]
+    with pytest.raises(IndexError):
+        Memory[16]
+
+
+@pytest.mark.parametrize('addr_width, data_width', [(1, 1), (4, 8), (12, 13), (20, 64), (32, 70)])
+def test_concrete(addr_width, data_width):
+    M = Memory[addr_width, data_width]
+    mem = M()
+    ref = {}
+    rng = random.Random(addr_width * data_width)
+    for _ in range(500):
+        addr = rng.getrandbits(addr_width)
+        value = rng.getrandbits(data_width)
+        mem[BitVector[addr_width](addr) if rng.random() < 0.5 else addr] = value
+        ref[addr] = value
+    for addr in list(ref) + [rng.getrandbits(addr_width) for _ in range(100)]:
+        x = mem[addr]
+        assert type(x) is BitVector[data_width]
+        assert x == ref.get(addr, 0)
+    with pytest.raises(IndexError):
+        mem[1 << addr_width]
+    with pytest.raises(InconsistentSizeError):
+        mem[BitVector[addr_width + 1](0)]
+
+
+def test_bulk():
+    M = Memory[16, 12]
+    mem = M(default=0xabc)
+    values = list(range(3000))
+    mem.load(values, offset=1000)
+    assert mem.dump(1000, 3000) == [BitVector[12](v) for v in values]
+    assert mem.dump(990, 10) == [BitVector[12](0xabc)] * 10
+    assert mem[999] == 0xabc and mem[4000] == 0xabc
+    data = mem.dump_bytes(500, 5000)
+    other = M(default=0xabc)
+    other.load_bytes(data, 500)
+    assert other == mem
+    # high bits are dropped
+    other.load_bytes(b'\xff\xff', 0)
+    assert other[0] == 0xfff
+    assert other != mem
+    with pytest.raises(IndexError):
+        mem.load([1, 2], offset=(1 << 16) - 1)
+    with pytest.raises(ValueError):
+        mem.load_bytes(b'\x00\x00\x00')
+
+
+def test_copy_store_eq():
+    mem = Memory[8, 8]()
+    mem[3] = 4
+    copy = mem.copy()
+    stored = mem.store(5, 6)
+    assert stored[5] == 6 and mem[5] == 0
+    assert copy == mem and stored != mem
+    copy[3] = 0
+    assert copy == Memory[8, 8]() and mem[3] == 4
+    assert Memory[8, 8](1) != Memory[8, 8](0)
+    full = Memory[8, 8](1)
+    full.load([0] * 256)
+    assert full == Memory[8, 8](0)
+    with pytest.raises(TypeError):
+        hash(mem)
+
+
+def test_smt():
+    M = SMTMemory[32, 8]
+    mem = M(name='ram')
+    a, b = SMTBitVector[32](), SMTBitVector[32]()
+    v = SMTBitVector[8]()
+    init = mem.copy()
+    mem[a] = v
+    mem[b] = 7
+    x = mem[a]
+    assert type(x) is SMTBitVector[8]
+    # a != b implies mem[a] == v
+    assert smt.is_valid(smt.Implies(smt.Not(smt.Equals(a.value, b.value)), smt.Equals(x.value, v.value)))
+    assert smt.is_valid(smt.Equals(mem[b].value, smt.BV(7, 8)))
+    assert not smt.is_valid(smt.Equals(init[a].value, v.value))
+    # the term size does not depend on the memory size
+    assert mem.value.size() < 20
+    assert (mem == mem.copy()).value is smt.TRUE()
+    assert 'ram' in repr(init)
+
+    const = M(0)
+    assert const[123].value.simplify().constant_value() == 0
+    c = SMTBit()
+    merged = mem.ite(c, const)
+    assert smt.is_valid(smt.Implies(smt.Not(c.value), smt.Equals(merged[b].value, smt.BV(0, 8))))
+
+
+def test_smt_bulk():
+    mem = SMTMemory[8, 8](0)
+    mem.load([1, 2, 3], offset=10)
+    assert [x.value.simplify().constant_value() for x in mem.dump(9, 5)] == [0, 1, 2, 3, 0]
+
+
+def test_z3():
+    import z3
+    mem = z3Memory[16, 8](name='zram')
+    a = z3BitVector[16]()
+    mem[a] = 5
+    mem[a + 1] = 6
+    s = z3.Solver()
+    s.add(mem[a].value != 5)
+    assert s.check() == z3.unsat
+    assert mem[a + 1] == z3BitVector[8](6)
+    const = z3Memory[16, 8](3)
+    assert const[7] == z3BitVector[8](3)
+
+
+def test_policy():
+    M = z3Memory[4, 8]()
+    M.write(0, 5)
+    assert M.read(0).value.as_long() == 5
+    with simplify_policy(SimplifyPolicy.NONE):
+        # reads follow the policy of the constructors
+        assert z3.is_select(M.read(0)._value)
+
+    with simplify_policy(SimplifyPolicy.DEFERRED):
+        x = SMTBitVector[4]()
+        addr = x + 0
+        term = addr._value
+        M = SMTMemory[4, 8]()
+        v = M.read(addr)
+        M.write(addr, v)
+        # reads and writes don't force the simplification of the operands
+        assert addr._value is term
+        assert v._value.arg(1) is term
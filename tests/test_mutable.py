@@ -0,0 +1,110 @@
+import operator
+
+import pytest
+
+import pysmt.shortcuts as smt
+
+from hwtypes import BitVector, MutableBitVector, Bit
+from hwtypes import SMTBitVector, SMTMutableBitVector, SMTBit
+from hwtypes import z3BitVector, z3MutableBitVector
+
+
+IOPS = [
+    (operator.iadd, operator.add),
+    (operator.isub, operator.sub),
+    (operator.imul, operator.mul),
+    (operator.ifloordiv, operator.floordiv),
+    (operator.imod, operator.mod),
+    (operator.iand, operator.and_),
+    (operator.ior, operator.or_),
+    (operator.ixor, operator.xor),
+    (operator.ilshift, operator.lshift),
+    (operator.irshift, operator.rshift),
+]
+
+
+@pytest.mark.parametrize('iop, op', IOPS)
+def test_inplace(iop, op):
+    for a, b in [(0, 0), (7, 3), (200, 100), (255, 9), (13, 0), (1, 8)]:
+        x = MutableBitVector[8](a)
+        alias = x
+        x = iop(x, BitVector[8](b))
+        assert x is alias
+        assert type(x) is MutableBitVector[8]
+        assert x.freeze() == op(BitVector[8](a), BitVector[8](b))
+        y = iop(MutableBitVector[8](a), b)
+        assert y == x
+
+
+def test_mutable():
+    acc = MutableBitVector[16](0)
+    ref = acc
+    for k in range(10):
+        acc += k
+    assert acc is ref and acc == 45
+    with pytest.raises(TypeError):
+        hash(acc)
+    frozen = acc.freeze()
+    assert type(frozen) is BitVector[16]
+    assert hash(frozen) == hash(BitVector[16](45))
+    copy = acc.copy()
+    acc.assign(3)
+    assert acc == 3 and copy == 45
+    assert type(acc + 1) is MutableBitVector[16]
+    with pytest.raises(TypeError):
+        acc += BitVector[8](1)
+
+
+def test_setitem_slice():
+    x = BitVector[8](0xf0)
+    x[0:4] = 0x5
+    assert x == 0xf5
+    x[4:8] = BitVector[4](0xa)
+    assert x == 0xa5
+    x[::2] = 0
+    assert x == 0xa0
+    x[1::2] = 0b0101
+    assert x == 0b00100010
+    x[-1] = True
+    assert x == 0b10100010
+    x[3:3] = 0
+    assert x == 0b10100010
+    with pytest.raises(TypeError):
+        x[0:4] = BitVector[3](0)
+
+
+def test_smt_setitem():
+    x = SMTBitVector[8]()
+    orig = x.value
+    x[2:5] = 3
+    # a single concat of extracts
+    assert x.value.is_bv_concat()
+    expected = smt.BVConcat(smt.BVConcat(smt.BVExtract(orig, 5, 7), smt.BV(3, 3)), smt.BVExtract(orig, 0, 1))
+    assert smt.is_valid(smt.Equals(x.value, expected))
+    b = SMTBit()
+    x[0] = b
+    assert smt.is_valid(smt.Iff(x[0].value, b.value))
+    x[0:8] = 7
+    assert x.value.is_constant() and x.value.constant_value() == 7
+
+    y = SMTMutableBitVector[8]()
+    alias = y
+    y += 1
+    y[7] = 0
+    assert y is alias
+    with pytest.raises(IndexError):
+        y[::2] = 0
+
+
+def test_z3():
+    x = z3BitVector[8](0x0f)
+    x[4:8] = 0xa
+    assert x == z3BitVector[8](0xaf)
+    x[0] = 0
+    assert x == z3BitVector[8](0xae)
+    y = z3MutableBitVector[8](5)
+    alias = y
+    y <<= 1
+    y |= 1
+    assert y is alias
+    assert y == z3BitVector[8](11)
@@ -0,0 +1,119 @@
+import itertools
+
+import pytest
+import z3
+
+from hwtypes import Bit, BitVector, SIntVector, UIntVector
+from hwtypes import SMTBit, SMTBitVector, SMTSIntVector, SMTUIntVector
+from hwtypes import z3Bit, z3BitVector
+from hwtypes import mux, onehot_mux, priority_select
+from hwtypes.bit_vector_util import PolyBase
+
+
+def _eval(v, *subs):
+    if isinstance(v, z3BitVector):
+        e = z3.substitute(v.value, *((x.value, y.value) for x, y in subs))
+        return z3.simplify(e).as_long()
+    return v.substitute(*subs).value.simplify().constant_value()
+
+
+def _ref_mux(values, idx):
+    return values[min(idx, len(values) - 1)]
+
+
+def _ref_onehot(values, idx):
+    return values[max(idx.bit_length() - 1, 0)]
+
+
+def _ref_priority(conds, values):
+    for c, v in zip(conds, values):
+        if c:
+            return v
+    return values[-1]
+
+
+@pytest.mark.parametrize('n', [1, 2, 3, 5, 8])
+def test_mux_concrete(n):
+    values = [BitVector[8](3 * i + 1) for i in range(n)]
+    for idx in range(16):
+        assert mux(values, BitVector[4](idx)) == _ref_mux(values, idx)
+
+
+@pytest.mark.parametrize('family', [
+    (SMTBit, SMTBitVector),
+    (z3Bit, z3BitVector),
+])
+@pytest.mark.parametrize('n', [1, 2, 3, 5, 6, 7, 8, 10])
+def test_mux_symbolic(family, n):
+    B, BV = family
+    values = [3 * i + 1 for i in range(n)]
+    sel = BV[4]()
+    r = mux([BV[8](v) for v in values], sel)
+    assert type(r) is BV[8]
+    for idx in range(16):
+        expected = _ref_mux(values, idx)
+        assert _eval(r, (sel, BV[4](idx))) == expected
+
+
+@pytest.mark.parametrize('n', [1, 2, 3, 5, 8])
+def test_onehot_mux(n):
+    values = [BitVector[8](3 * i + 1) for i in range(n)]
+    sel = SMTBitVector[n]()
+    r = onehot_mux([SMTBitVector[8](int(v)) for v in values], sel)
+    for idx in range(1 << n):
+        expected = _ref_onehot(values, idx)
+        assert onehot_mux(values, BitVector[n](idx)) == expected
+        assert _eval(r, (sel, SMTBitVector[n](idx))) == int(expected)
+
+
+@pytest.mark.parametrize('n', [1, 2, 3, 5])
+def test_priority_select(n):
+    values = [BitVector[8](3 * i + 1) for i in range(n)]
+    conds = [SMTBit() for _ in range(n)]
+    r = priority_select(conds, [SMTBitVector[8](int(v)) for v in values])
+    for bits in itertools.product((0, 1), repeat=n):
+        expected = _ref_priority(bits, values)
+        assert priority_select([Bit(b) for b in bits], values) == expected
+        subs = [(c, SMTBit(b)) for c, b in zip(conds, bits)]
+        assert _eval(r, *subs) == int(expected)
+
+
+def test_mux_tuples():
+    values = [(BitVector[4](i), Bit(i & 1)) for i in range(3)]
+    assert mux(values, BitVector[2](1)) == values[1]
+    sel = SMTBitVector[2]()
+    x, b = mux([(SMTBitVector[4](i), SMTBit(i & 1)) for i in range(3)], sel)
+    assert type(x) is SMTBitVector[4]
+    assert type(b) is SMTBit
+
+
+def test_mux_poly():
+    sel = SMTBitVector[1]()
+    r = mux([SMTSIntVector[8](0), SMTUIntVector[8](0)], sel)
+    assert isinstance(r, PolyBase)
+    assert mux([SIntVector[8](-1), UIntVector[8](1)], BitVector[1](0)) < 0
+
+
+def test_mux_concrete_select():
+    # concrete selects return the selected value itself, symbolic selects
+    # type the result by the rules of ite
+    values = [SIntVector[8](-1), BitVector[8](1), UIntVector[8](2)]
+    for i, v in enumerate(values):
+        assert mux(values, BitVector[2](i)) is v
+        assert onehot_mux(values, BitVector[3](1 << i)) is v
+        assert priority_select([Bit(j == i) for j in range(3)], values) is v
+    r = mux([SMTSIntVector[8](0), SMTBitVector[8](0)], SMTBitVector[1]())
+    assert not isinstance(r, SMTSIntVector)
+
+
+def test_mux_errors():
+    with pytest.raises(ValueError):
+        mux([], BitVector[2](0))
+    with pytest.raises(ValueError):
+        mux([BitVector[8](i) for i in range(5)], BitVector[2](0))
+    with pytest.raises(ValueError):
+        onehot_mux([BitVector[8](0)], BitVector[2](0))
+    with pytest.raises(ValueError):
+        priority_select([Bit(0)], [BitVector[8](0), BitVector[8](1)])
+    with pytest.raises(TypeError):
+        mux([BitVector[8](0)], 0)
@@ -0,0 +1,142 @@
+import threading
+
+import pytest
+
+from hwtypes import SMTBit, SMTBitVector, SMTMutableBitVector
+from hwtypes import z3Bit, z3BitVector
+from hwtypes import SimplifyPolicy, simplify_policy
+from hwtypes import set_op_memo_size, get_op_memo_size, clear_op_memo, op_memo_info
+
+
+@pytest.fixture
+def memo_size():
+    size = get_op_memo_size()
+    yield
+    set_op_memo_size(size)
+
+
+def _same(a, b):
+    return a._value is b._value
+
+
+@pytest.mark.parametrize('BV', [SMTBitVector, z3BitVector])
+def test_memo(BV):
+    x = BV[8]()
+    y = BV[8]()
+    clear_op_memo()
+    assert _same(x + 1, x + 1)
+    assert _same(x[3], x[3])
+    assert not _same(x[3], x[4])
+    assert _same(x < y, x < y)
+    assert _same(x.zext(2), x.zext(2))
+    assert not _same(x.zext(2), x.zext(3))
+    # commutative operations share an entry
+    assert _same(x + y, y + x)
+    assert not _same(x - y, y - x)
+    assert not _same(x.concat(y), y.concat(x))
+    # each hit is a new wrapper
+    assert x + 1 is not x + 1
+    assert op_memo_info().hits >= 6
+
+
+@pytest.mark.parametrize('B', [SMTBit, z3Bit])
+def test_memo_bit(B):
+    a = B()
+    b = B()
+    assert _same(a & b, a & b)
+    assert _same(a & b, b & a)
+    assert _same(~a, ~a)
+    assert not _same(a ^ b, a | b)
+
+
+@pytest.mark.parametrize('BV', [SMTBitVector, z3BitVector])
+def test_memo_setitem(BV):
+    x = BV[8]()
+    a = x + 1
+    b = x + 1
+    term = b._value
+    a[0] = 1
+    # updating a memoized result does not change the other results
+    assert b._value is term
+    assert not _same(a, b)
+    assert _same(x + 1, b)
+
+
+def test_info(memo_size):
+    clear_op_memo()
+    x = SMTBitVector[8]()
+    x + x
+    x + x
+    info = op_memo_info()
+    assert info.hits == 1
+    assert info.misses == 1
+    assert info.currsize == 1
+
+
+def test_lru(memo_size):
+    clear_op_memo()
+    set_op_memo_size(2)
+    x = SMTBitVector[8]()
+    y = SMTBitVector[8]()
+    x + y
+    x - y
+    x * y
+    assert op_memo_info().currsize == 2
+    x * y
+    x - y
+    assert op_memo_info().hits == 2
+    # x + y was evicted
+    x + y
+    assert op_memo_info().hits == 2
+
+    set_op_memo_size(0)
+    x * y
+    assert op_memo_info().currsize == 0
+
+    with pytest.raises(ValueError):
+        set_op_memo_size(-1)
+
+
+def test_mutable():
+    x = SMTMutableBitVector[8]()
+    assert x + 1 is not x + 1
+
+    y = SMTBitVector[8]()
+    z = y + 1
+    z[0] = 0
+    # updating a memoized wrapper does not affect the memo
+    assert (y + 1) is not z
+    assert (y + 1).value != z.value
+
+
+def test_policy():
+    x = SMTBitVector[8]()
+    y = x + 0
+    with simplify_policy(SimplifyPolicy.NONE):
+        z = x + 0
+        assert not _same(z, y)
+        assert _same(z, x + 0)
+    assert _same(x + 0, y)
+
+
+def test_threads(memo_size):
+    # the memo of the default context is shared by the threads
+    set_op_memo_size(4)
+    x = SMTBitVector[8]()
+    errors = []
+
+    def worker(k):
+        try:
+            for i in range(300):
+                y = x + (i % 7)
+                assert _same(y, x + (i % 7))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert op_memo_info().currsize <= 4
@@ -0,0 +1,80 @@
+import pickle
+
+import pytest
+
+from hwtypes import BitVector, UIntVector, SIntVector, Bit
+from hwtypes import FPVector, RoundingMode
+from hwtypes.adt import Tuple, Product, Sum, Enum, TaggedUnion
+from hwtypes.adt import AnonymousProduct
+
+
+class P(Product):
+    a = BitVector[4]
+    b = Bit
+
+
+class E(Enum):
+    x = 1
+    y = 2
+
+
+class TU(TaggedUnion):
+    p = BitVector[3]
+    q = Bit
+
+
+Q = Product.from_fields('Q', {'z': SIntVector[5], 'w': Tuple[Bit, BitVector[2]]})
+QE = Enum.from_fields('QE', {'a': 0, 'b': 3})
+QT = TaggedUnion.from_fields('QT', {'u': Q, 'v': BitVector[2]})
+
+TYPES = [
+    BitVector[13],
+    UIntVector[1],
+    SIntVector[70],
+    Tuple[BitVector[4], Bit],
+    Sum[BitVector[4], Bit],
+    AnonymousProduct[{'a': Bit, 'b': BitVector[2]}],
+    P, Q, E, QE, TU, QT,
+    FPVector[8, 7, RoundingMode.RNE, False],
+]
+
+
+def _roundtrip(x):
+    return pickle.loads(pickle.dumps(x))
+
+
+@pytest.mark.parametrize('T', TYPES)
+def test_type(T):
+    assert _roundtrip(T) is T
+
+
+@pytest.mark.parametrize('x', [
+    BitVector[13](3),
+    SIntVector[70](-5),
+    Bit(1),
+    Tuple[BitVector[4], Bit](BitVector[4](1), Bit(0)),
+    Sum[BitVector[4], Bit](Bit(1)),
+    AnonymousProduct[{'a': Bit, 'b': BitVector[2]}](Bit(1), BitVector[2](3)),
+    P(BitVector[4](2), Bit(1)),
+    Q(SIntVector[5](-3), Tuple[Bit, BitVector[2]](Bit(0), BitVector[2](2))),
+    TU(q=Bit(0)),
+    QT(v=BitVector[2](1)),
+])
+def test_value(x):
+    y = _roundtrip(x)
+    assert type(y) is type(x)
+    assert y == x
+
+
+def test_enum_identity():
+    assert _roundtrip(E.x) is E.x
+    assert _roundtrip(QE.b) is QE.b
+
+
+def test_uncached_from_fields():
+    R = Product.from_fields('R', {'a': Bit}, cache=False)
+    S = _roundtrip(R)
+    assert S is not R
+    assert S.field_dict == R.field_dict
+    assert S.__name__ == 'R'
+    assert _roundtrip(R(Bit(1))).a == Bit(1)
@@ -7,6 +7,7 @@ from hwtypes import Bit
 
 from hwtypes import SMTBit, SMTBitVector
 from hwtypes import SMTUIntVector, SMTSIntVector
+from hwtypes.bit_vector_util import PolyVector
 
 @pytest.mark.parametrize("cond_0", [Bit(0), Bit(1)])
 @pytest.mark.parametrize("cond_1", [Bit(0), Bit(1)])
@@ -53,7 +54,10 @@ def test_poly_smt():
     assert u1.value != u2.value
     assert (u1 * 2).value != (u1 + u1).value
     assert (u1 + u2).value == (u1 + u2).value
-    assert (u1 + u2).value != (u2 + u1).value
+    assert sc.BVAdd(u1.value, u2.value) != sc.BVAdd(u2.value, u1.value)
+    # (commutative operations are memoized with their operands in a
+    # canonical order so (u1 + u2) and (u2 + u1) are the same value)
+    assert (u1 + u2).value == (u2 + u1).value
 
     # On to the real test
     expr = c1.ite(u1, s1) < 1
@@ -90,3 +94,52 @@ def test_poly_smt():
     assert expr.value != sc.Ite(_c1, sc.BVAdd(e1, one), sc.BVAdd(e1, one))
     # which was the pattern for sign dependent operators
 
+
+
+def test_poly_type_cache():
+    S = SMTSIntVector[8]
+    U = SMTUIntVector[8]
+    c1 = SMTBit(name='pc1')
+    c2 = SMTBit(name='pc2')
+    u1 = U(name='pu1')
+    s1 = S(name='ps1')
+
+    # the select is carried by the type, the methods only depend on the
+    # types of the branches and are shared
+    v1 = c1.ite(u1, s1)
+    v2 = c2.ite(u1, s1)
+    assert type(v1) is not type(v2)
+    assert type(c1.ite(u1, s1)) is type(v1)
+    assert type(v1).__lt__ is type(v2).__lt__
+    assert type(c1.ite(s1, u1)).__lt__ is not type(v1).__lt__
+
+    _c1, _c2, _u1, _s1 = c1.value, c2.value, u1.value, s1.value
+    one = sc.BV(1, 8)
+    e1 = sc.Ite(_c1, _u1, _s1)
+    e2 = sc.Ite(_c2, _u1, _s1)
+    assert (v1 < 1).value == sc.Ite(_c1, sc.BVULT(e1, one), sc.BVSLT(e1, one))
+    assert (v2 < 1).value == sc.Ite(_c2, sc.BVULT(e2, one), sc.BVSLT(e2, one))
+
+
+@pytest.mark.parametrize("cond_0", [Bit(0), Bit(1)])
+@pytest.mark.parametrize("cond_1", [Bit(0), Bit(1)])
+@pytest.mark.parametrize("cond_2", [Bit(0), Bit(1)])
+def test_poly_same_type_branches(cond_0, cond_1, cond_2):
+    S = SIntVector[8]
+    U = UIntVector[8]
+    # both branches have the same polymorphic type but different selects
+    val = cond_2.ite(cond_0.ite(U(-1), S(-1)), cond_1.ite(U(-1), S(-1)))
+    # muxing the selects keeps the polymorphic type (and its methods)
+    assert type(val).__lt__ is type(cond_0.ite(U(0), S(0))).__lt__
+    signed = not (cond_0 if cond_2 else cond_1)
+    assert (val < 0) == signed
+    assert val.ext(1) == (BitVector[9](-1) if signed else BitVector[9](255))
+
+
+def test_poly_cast():
+    # type(v)(x) keeps the select of v outside of its methods
+    v = Bit(0).ite(UIntVector[8](1), SIntVector[8](-2))
+    assert type(v)(255) < 0
+    v = Bit(1).ite(UIntVector[8](1), SIntVector[8](-2))
+    assert not (type(v)(255) < 0)
+    assert isinstance(type(v)(255), PolyVector[UIntVector[8], SIntVector[8], Bit(1)])
@@ -0,0 +1,144 @@
+import pytest
+
+from hwtypes import Bit, BitVector, UIntVector, SIntVector
+from hwtypes import SMTBit, SMTBitVector, SMTUIntVector, SMTSIntVector, SMTInt
+from hwtypes import SMTFPVector, FPVector, RoundingMode
+from hwtypes import Product, TaggedUnion
+from hwtypes import Session, SymbolicContext, concretize
+from hwtypes.adt_util import rebind_type
+
+
+def test_check():
+    x = SMTBitVector[8]()
+    y = SMTBitVector[8]()
+    with Session() as s:
+        s.add(x + y == 10, x > y)
+        assert s.check()
+        vx, vy = s.get_value((x, y))
+        assert type(vx) is BitVector[8]
+        assert vx + vy == 10 and vx > vy
+        s.add(x == y)
+        assert not s.check()
+        with pytest.raises(RuntimeError):
+            s.get_value(x)
+
+
+def test_push_pop():
+    x = SMTUIntVector[8]()
+    b = SMTBit()
+    with Session() as s:
+        s.add(x < 4)
+        with s.scope():
+            s.add(x > 5)
+            assert s.levels == 1
+            assert not s.check()
+        assert s.levels == 0
+        assert s.check()
+        s.push()
+        s.add(b, x == 3)
+        assert s.check()
+        assert s.get_value(b) is Bit(1)
+        v = s.get_value(x)
+        assert type(v) is UIntVector[8] and v == 3
+        s.pop()
+        with pytest.raises(ValueError):
+            s.pop()
+
+
+def test_assumptions():
+    x = SMTSIntVector[8]()
+    i = SMTInt()
+    with Session() as s:
+        s.add(x < 0)
+        neg = s.assumption(x == -5)
+        pos = s.assumption(x == 5)
+        assert s.check(neg)
+        v = s.get_value(x)
+        assert type(v) is SIntVector[8] and v == -5
+        assert not s.check(pos)
+        assert not s.check(neg, pos)
+        s.add(i == x.as_sint() * 2)
+        assert s.check(neg)
+        assert s.get_value(i) == -10
+        assert s.num_checks == 4
+
+
+def test_many_queries():
+    x = SMTBitVector[8]()
+    with Session() as s:
+        s.add(x[0] == 0)
+        for k in range(256):
+            assert s.check(s.assumption(x == k)) == (k % 2 == 0)
+        s.reset()
+        assert s.check(s.assumption(x == 1))
+
+
+def test_context():
+    with SymbolicContext():
+        x = SMTBitVector[8](name='x')
+        with Session() as s:
+            s.add(x * 3 == 9)
+            assert s.check()
+            assert s.get_value(x * 3) == 9
+    with Session() as s:
+        with pytest.raises(TypeError):
+            s.add(True)
+
+
+def test_assumption_context():
+    # the assumption literal is built in the context of the session
+    with SymbolicContext() as ctx:
+        x = SMTBitVector[8](name='x')
+        s = Session()
+        c = x == 5
+    try:
+        with SymbolicContext():
+            a = s.assumption(c)
+        mgr = ctx.env.formula_manager
+        assert mgr.formulae[a.value._content] is a.value
+        assert s.check(a)
+        assert s.get_value(x) == 5
+        with ctx:
+            assert not s.check(a, x == 6)
+    finally:
+        s.close()
+
+
+def test_concretize():
+    class P(Product, cache=True):
+        a = SMTUIntVector[8]
+        b = SMTBit
+
+    class U(TaggedUnion, cache=True):
+        p = P
+        c = SMTBitVector[4]
+
+    x = SMTUIntVector[8]()
+    y = SMTUIntVector[8]()
+    shared = (x * y + 1) ^ x
+    values = (P(a=shared, b=x < y), [U(p=P(a=x, b=SMTBit(1))), U(c=shared[:4])], 5)
+    with Session() as s:
+        s.add(x == 3, y == 4)
+        assert s.check()
+        p, (u0, u1), five = concretize(s, values)
+        assert five == 5
+        assert type(p) is rebind_type(P, BitVector.get_family())
+        assert p.a == 14 and type(p.a) is UIntVector[8]
+        assert p.b is Bit(1)
+        assert u0.p.value.a == 3 and u0.p.value.b is Bit(1)
+        assert u1.c.value == 14 and type(u1.c.value) is UIntVector[4]
+        model = s.get_model()
+    assert concretize(model, shared) == 14
+
+
+def test_concretize_fp():
+    T = SMTFPVector[8, 7, RoundingMode.RNE, True]
+    FP = FPVector[8, 7, RoundingMode.RNE, True]
+    bits = FP(1.5).reinterpret_as_bv()
+    x = T()
+    with Session() as s:
+        s.add(SMTBitVector[16](x._value) == int(bits))
+        assert s.check()
+        v = concretize(s, x)
+        assert type(v) is FP
+        assert v == FP(1.5)
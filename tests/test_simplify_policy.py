@@ -0,0 +1,134 @@
+import threading
+
+import pytest
+import pysmt.shortcuts as smt
+import z3
+
+from hwtypes import SMTBit, SMTBitVector, SMTInt, z3BitVector
+from hwtypes import SimplifyPolicy, get_simplify_policy, set_simplify_policy, simplify_policy
+
+
+def test_default():
+    assert get_simplify_policy() is SimplifyPolicy.EAGER
+    x = SMTBitVector[8]()
+    assert (x + 0).value == x.value
+
+
+def test_none():
+    x = SMTBitVector[8]()
+    with simplify_policy(SimplifyPolicy.NONE):
+        y = x + 0
+        b = SMTBit(True) & SMTBit(True)
+        i = SMTInt(1) + 1
+        assert y.value == smt.BVAdd(x.value, smt.BV(0, 8))
+        assert not b.value.is_constant()
+        assert not i.value.is_constant()
+    assert get_simplify_policy() is SimplifyPolicy.EAGER
+    # leaving the policy does not change existing values
+    assert y._value == smt.BVAdd(x.value, smt.BV(0, 8))
+
+
+def test_deferred():
+    x = SMTBitVector[8]()
+    with simplify_policy(SimplifyPolicy.DEFERRED):
+        y = (x + 0) * 1
+        assert y._value != x.value
+        assert y.value == x.value
+        assert (SMTInt(2) + 2).value == smt.Int(4)
+
+
+def test_periodic():
+    x = SMTBitVector[8]()
+    zero = SMTBitVector[8](0)
+    ys = [SMTBitVector[8]() for _ in range(4)]
+    with simplify_policy(SimplifyPolicy.PERIODIC, period=2):
+        zs = [y + zero for y in ys]
+        simplified = [z._value == y.value for y, z in zip(ys, zs)]
+        assert simplified.count(True) == 2
+
+
+def test_nesting():
+    with simplify_policy(SimplifyPolicy.NONE):
+        with simplify_policy(SimplifyPolicy.DEFERRED):
+            assert get_simplify_policy() is SimplifyPolicy.DEFERRED
+        assert get_simplify_policy() is SimplifyPolicy.NONE
+    assert get_simplify_policy() is SimplifyPolicy.EAGER
+
+    set_simplify_policy('none')
+    try:
+        assert get_simplify_policy() is SimplifyPolicy.NONE
+    finally:
+        set_simplify_policy(SimplifyPolicy.EAGER)
+
+    with pytest.raises(ValueError):
+        set_simplify_policy('sometimes')
+    with pytest.raises(ValueError):
+        set_simplify_policy(SimplifyPolicy.PERIODIC, period=0)
+    assert get_simplify_policy() is SimplifyPolicy.EAGER
+
+
+@pytest.mark.parametrize('policy', list(SimplifyPolicy))
+def test_equivalent(policy):
+    x = SMTBitVector[8]()
+    y = SMTBitVector[8]()
+    expected = ((x + 1) * y - x) ^ 3
+    with simplify_policy(policy, period=3):
+        r = ((x + 1) * y - x) ^ 3
+        assert smt.is_valid(smt.Equals(r.value, expected.value))
+
+
+@pytest.mark.parametrize('policy', list(SimplifyPolicy))
+def test_z3(policy):
+    x = z3BitVector[8]()
+    with simplify_policy(policy):
+        r = (x + 0) * 1
+        raw = r._value
+        v = r.value
+    s = z3.Solver()
+    s.add(v != x.value)
+    assert s.check() == z3.unsat
+    if policy in (SimplifyPolicy.EAGER, SimplifyPolicy.DEFERRED):
+        assert z3.eq(v, x.value)
+    if policy is not SimplifyPolicy.EAGER:
+        assert not z3.eq(raw, x.value)
+
+
+def test_deferred_after_block():
+    # the values built under DEFERRED simplify when queried after the block
+    x = SMTBitVector[8]()
+    with simplify_policy(SimplifyPolicy.DEFERRED):
+        y = (x + 0) * 1
+    with simplify_policy(SimplifyPolicy.NONE):
+        z = x + 0
+        assert y.value == x.value
+    assert z.value == smt.BVAdd(x.value, smt.BV(0, 8))
+
+
+def test_threads():
+    # the default is process wide, simplify_policy overrides it per thread
+    seen = []
+    def worker():
+        seen.append(get_simplify_policy())
+        with simplify_policy(SimplifyPolicy.DEFERRED):
+            seen.append(get_simplify_policy())
+    def run():
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join()
+
+    with simplify_policy(SimplifyPolicy.NONE):
+        run()
+        assert get_simplify_policy() is SimplifyPolicy.NONE
+    assert seen == [SimplifyPolicy.EAGER, SimplifyPolicy.DEFERRED]
+
+    seen.clear()
+    set_simplify_policy(SimplifyPolicy.NONE)
+    try:
+        run()
+        with simplify_policy(SimplifyPolicy.PERIODIC):
+            set_simplify_policy(SimplifyPolicy.DEFERRED)
+            assert get_simplify_policy() is SimplifyPolicy.PERIODIC
+        assert get_simplify_policy() is SimplifyPolicy.DEFERRED
+    finally:
+        set_simplify_policy(SimplifyPolicy.EAGER)
+    assert seen == [SimplifyPolicy.NONE, SimplifyPolicy.DEFERRED]
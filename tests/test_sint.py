@@ -81,3 +81,26 @@ def test_operator_by_0(op, reference):
     I0, I1 = SIntVector.random(5), 0
     expected = signed(reference(int(I0), int(I1)), 5)
     assert expected == int(op(I0, I1))
+
+
+def test_override():
+    # the signed operators dispatch to the methods of the subclass
+    class Traced(SIntVector):
+        calls = []
+
+        def bvashr(self, other):
+            Traced.calls.append('bvashr')
+            return super().bvashr(other)
+
+        def bvslt(self, other):
+            Traced.calls.append('bvslt')
+            return super().bvslt(other)
+
+    T = Traced[8]
+    a, b = T(-8), T(2)
+    assert int(a >> b) == -2
+    assert a < b
+    assert int(-16 >> T(2)) == -4
+    assert Traced.calls == ['bvashr', 'bvslt', 'bvashr']
+    assert int(SIntVector[8](-8) >> SIntVector[8](2)) == -2
+    assert Traced.calls == ['bvashr', 'bvslt', 'bvashr']
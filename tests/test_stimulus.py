@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from hwtypes import BitVector, UIntVector, SIntVector, Bit
+from hwtypes import FPVector, RoundingMode
+from hwtypes import random_values, random_array
+from hwtypes.adt import Tuple, Product, Sum, Enum, TaggedUnion
+
+
+class Op(Enum):
+    add = 0
+    sub = 1
+
+
+class Inst(Product):
+    op = Op
+    imm = SIntVector[12]
+    val = Sum[Bit, BitVector[3]]
+
+
+class Val(TaggedUnion):
+    small = BitVector[4]
+    pair = Tuple[Bit, BitVector[2]]
+
+
+@pytest.mark.parametrize('T', [
+    Bit, BitVector[1], BitVector[13], UIntVector[16], SIntVector[70],
+    FPVector[8, 7, RoundingMode.RNE, False], Op, Inst, Val,
+])
+def test_types_and_seed(T):
+    xs = random_values(T, 200, random.Random(5))
+    assert len(xs) == 200
+    assert all(type(x) is T for x in xs)
+    # compare reprs as random FP values include NaNs
+    assert list(map(repr, random_values(T, 200, 5))) == list(map(repr, xs))
+    if T not in (Bit, BitVector[1], Op, Val):
+        assert len(set(map(repr, xs))) > 100
+
+
+def test_uniform():
+    xs = random_values(BitVector[4], 16000, 0)
+    counts = [0] * 16
+    for x in xs:
+        counts[int(x)] += 1
+    assert all(800 < c < 1200 for c in counts)
+
+
+def test_corners():
+    n = 1000
+    xs = random_values(SIntVector[32], n, 1, corner_prob=0.5)
+    corners = {0, -1, -(1 << 31), (1 << 31) - 1} | {1 << k for k in range(31)} | {-(1 << 31)}
+    assert sum(int(x) in corners for x in xs) >= n // 2
+    xs = random_values(BitVector[32], n, 1, corner_prob=1, corners={'ones': 1})
+    assert xs == [BitVector[32](-1)] * n
+    with pytest.raises(ValueError):
+        random_values(BitVector[8], 10, 1, corner_prob=0.5, corners={'bogus': 1})
+
+
+@pytest.mark.parametrize('T', [BitVector[13], SIntVector[64], UIntVector[100], Bit])
+def test_array(T):
+    arr = random_array(T, 300, 7, corner_prob=0.2)
+    values = arr.to_list()
+    assert len(values) == 300
+    assert len(set(values)) > (1 if T is Bit else 100)
+    assert random_array(T, 300, 7, corner_prob=0.2).to_list() == values
+    if T is not Bit:
+        assert T(-1) in values and T(0) in values
@@ -0,0 +1,248 @@
+import gc
+import threading
+import tracemalloc
+import weakref
+
+import pysmt.shortcuts
+
+import pytest
+import z3
+
+from hwtypes import SMTBit, SMTBitVector, SMTInt, SMTMemory
+from hwtypes import SMTFPVector, RoundingMode
+from hwtypes import z3Bit, z3BitVector
+from hwtypes import SymbolicContext, ContextRecycler, current_context
+from hwtypes import op_memo_info
+from hwtypes.symbolic_context import shortcuts
+
+
+def test_names():
+    with SymbolicContext():
+        x = SMTBitVector[8](name='ctx_x')
+        with pytest.raises(ValueError):
+            SMTBit(name='ctx_x')
+    with SymbolicContext():
+        # the name is free in another context
+        y = SMTBitVector[8](name='ctx_x')
+    z = SMTBitVector[8](name='ctx_x')
+    assert x.value is not y.value
+
+    with SymbolicContext():
+        a = z3BitVector[8](name='ctx_a')
+        with pytest.raises(ValueError):
+            z3Bit(name='ctx_a')
+    b = z3BitVector[8](name='ctx_a')
+
+
+def test_env():
+    outer = current_context()
+    with SymbolicContext() as ctx:
+        assert current_context() is ctx
+        x = SMTBitVector[8](name='x')
+        i = SMTInt(name='i')
+        mem = SMTMemory[4, 8](name='mem')
+        f = (x + 1 == 0) & (x.as_uint() + i > 3) & (mem[x[:4]] == x)
+        mgr = ctx.env.formula_manager
+        assert mgr.get_symbol('x') is x.value
+        assert mgr.get_symbol('i') is i.value
+        assert ctx.env.factory.is_sat(f.value)
+        assert ctx.env.factory.is_valid(((x + 1) - 1 == x).value)
+        assert (x[0] & ~x[0]).value.is_false()
+    assert current_context() is outer
+    assert ctx.env is not outer.env
+
+
+def test_fp():
+    T = SMTFPVector[8, 7, RoundingMode.RNE, True]
+    with SymbolicContext() as ctx:
+        x = T(name='x')
+        y = T()
+        f = (x + y == y + x) & (x.to_ubv(8) == 3) & (x.reinterpret_as_bv()[0] == 1)
+        mgr = ctx.env.formula_manager
+        assert mgr.get_symbol('x') is x._value
+        assert mgr.formulae[f.value._content] is f.value
+        assert ctx.env.factory.is_sat(f.value)
+        with pytest.raises(ValueError):
+            SMTBit(name='x')
+    assert f.value._content not in pysmt.shortcuts.get_env().formula_manager.formulae
+    T(name='x')
+
+
+def test_nesting():
+    with SymbolicContext() as a:
+        with SymbolicContext() as b:
+            assert current_context() is b
+        assert current_context() is a
+        with pytest.raises(RuntimeError):
+            b.__exit__(None, None, None)
+
+
+def test_z3():
+    with SymbolicContext() as ctx:
+        x = z3BitVector[8]()
+        y = x + 1
+        assert y.value.ctx == ctx.z3_ctx
+        s = z3.Solver(ctx=ctx.z3_ctx)
+        s.add((y == 0).value)
+        assert s.check() == z3.sat
+        assert s.model().eval(x.value).as_long() == 255
+
+
+def test_memo():
+    with SymbolicContext():
+        x = SMTBitVector[8]()
+        y = SMTBitVector[8]()
+        assert (x + y)._value is (x + y)._value
+        assert op_memo_info().hits == 1
+
+
+def test_threads():
+    errors = []
+    results = {}
+
+    def worker(k):
+        try:
+            with SymbolicContext() as ctx:
+                x = SMTBitVector[16](name='x')
+                acc = x
+                for i in range(200):
+                    acc = (acc + k) ^ (x & i)
+                assert current_context() is ctx
+                assert ctx.env.formula_manager.get_symbol('x') is x.value
+                v = acc.substitute((x, SMTBitVector[16](7)))
+                results[k] = v.value.constant_value()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    for k in range(4):
+        acc = 7
+        for i in range(200):
+            acc = ((acc + k) & 0xffff) ^ (7 & i)
+        assert results[k] == acc
+
+
+def test_release():
+    with SymbolicContext() as ctx:
+        with pytest.raises(RuntimeError):
+            ctx.release()
+        x = SMTBitVector[8](name='x')
+        assert ctx.num_terms > 0
+    env = weakref.ref(ctx.env)
+    del x
+    ctx.release()
+    gc.collect()
+    assert ctx.released
+    assert env() is None
+    with pytest.raises(RuntimeError):
+        ctx.env
+    with pytest.raises(RuntimeError):
+        with ctx:
+            pass
+    with pytest.raises(RuntimeError):
+        current_context().release()
+
+
+def test_release_threads():
+    # a context active in another thread can't be released
+    ctx = SymbolicContext()
+    entered = threading.Event()
+    leave = threading.Event()
+
+    def worker():
+        with ctx:
+            entered.set()
+            leave.wait(10)
+
+    t = threading.Thread(target=worker)
+    t.start()
+    entered.wait(10)
+    try:
+        with pytest.raises(RuntimeError):
+            ctx.release()
+        assert not ctx.released
+    finally:
+        leave.set()
+        t.join()
+    ctx.release()
+    assert ctx.released
+
+
+def test_recycler():
+    with pytest.raises(ValueError):
+        ContextRecycler(max_queries=0)
+
+    rec = ContextRecycler(max_queries=2)
+    with rec.query() as a:
+        x = SMTBitVector[8](name='x')
+    with rec.query() as b:
+        # the context is shared by the queries until it is recycled
+        with pytest.raises(ValueError):
+            SMTBitVector[8](name='x')
+    assert a is b and a.released
+    assert rec.context is None and rec.recycled == 1
+    del x
+    with rec.query() as c:
+        SMTBitVector[8](name='x')
+    assert c is not a and not c.released
+
+    rec = ContextRecycler(max_terms=100)
+    with rec.query() as a:
+        SMTBitVector[8]() + 1
+    assert not a.released
+    with rec.query() as b:
+        x = SMTBitVector[8]()
+        for i in range(100):
+            x = x + i
+    assert a is b and b.released
+    assert rec.recycled == 1
+
+
+def _model(k):
+    x = SMTBitVector[16](name='x')
+    y = SMTBitVector[16](name='y')
+    acc = x
+    for i in range(200):
+        acc = (acc + y * (i + k)) ^ (x >> (i % 16))
+    return (acc == k).substitute((x, SMTBitVector[16](3))).value.serialize()
+
+
+def test_recycler_memory():
+    rec = ContextRecycler(max_queries=1)
+    # warm up the caches of pysmt
+    with rec.query():
+        _model(0)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        with rec.query():
+            _model(0)
+            footprint = tracemalloc.get_traced_memory()[0] - base
+        for k in range(10):
+            with rec.query():
+                _model(k)
+        gc.collect()
+        growth = tracemalloc.get_traced_memory()[0] - base
+    finally:
+        tracemalloc.stop()
+    # each query builds thousands of terms, all but a few (small) pysmt
+    # internal allocations are freed with the context
+    assert growth < footprint / 4
+
+
+def test_shortcuts():
+    with SymbolicContext() as ctx:
+        assert shortcuts.BVAdd is shortcuts.BVAdd
+        x = shortcuts.Symbol('x', pysmt.shortcuts.BVType(8))
+        assert x in ctx.env.formula_manager
+        assert shortcuts.get_env() is ctx.env
+        # no fallback to the global pysmt.shortcuts
+        with pytest.raises(AttributeError):
+            shortcuts.Solver
+    assert shortcuts.get_env() is pysmt.shortcuts.get_env()
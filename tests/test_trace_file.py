@@ -0,0 +1,115 @@
+import random
+
+import pytest
+
+from hwtypes import BitVector, SIntVector, Bit
+from hwtypes import TraceWriter, TraceReader
+from hwtypes.adt import Tuple, Product, Sum, Enum, TaggedUnion
+
+
+class Op(Enum):
+    add = 0
+    sub = 1
+    mul = 2
+
+
+class Inst(Product):
+    op = Op
+    imm = BitVector[12]
+    valid = Bit
+
+
+class Val(TaggedUnion):
+    small = BitVector[4]
+    big = Tuple[SIntVector[40], Bit]
+
+
+COLUMNS = [
+    ('a', BitVector[16]),
+    ('b', SIntVector[70]),
+    ('en', Bit),
+    ('inst', Inst),
+    ('val', Val),
+    ('s', Sum[Bit, BitVector[3]]),
+]
+
+
+def _rand_row():
+    op = random.choice(list(Op.enumerate()))
+    if random.getrandbits(1):
+        val = Val(small=BitVector[4](random.getrandbits(4)))
+    else:
+        val = Val(big=Tuple[SIntVector[40], Bit](SIntVector[40](random.getrandbits(40)), Bit(1)))
+    if random.getrandbits(1):
+        s = Sum[Bit, BitVector[3]](Bit(random.getrandbits(1)))
+    else:
+        s = Sum[Bit, BitVector[3]](BitVector[3](random.getrandbits(3)))
+    return (
+        BitVector[16](random.getrandbits(16)),
+        SIntVector[70](random.getrandbits(70)),
+        Bit(random.getrandbits(1)),
+        Inst(op, BitVector[12](random.getrandbits(12)), Bit(random.getrandbits(1))),
+        val,
+        s,
+    )
+
+
+@pytest.fixture
+def trace(tmp_path):
+    rows = [_rand_row() for _ in range(200)]
+    path = tmp_path / 'trace.hwt'
+    with TraceWriter(path, COLUMNS) as w:
+        w.write_rows(rows)
+        assert w.rows == 200
+    return path, rows
+
+
+def test_roundtrip(trace):
+    path, rows = trace
+    with TraceReader(path) as r:
+        assert len(r) == len(rows)
+        assert r.columns == COLUMNS
+        for k in (0, 17, -1):
+            assert r[k].values() == rows[k]
+        assert r[5]['inst'] == rows[5][3]
+        assert r[5][1] == rows[5][1]
+        assert [row.values() for row in r] == rows
+
+
+def test_columns(trace):
+    path, rows = trace
+    with TraceReader(path) as r:
+        a = r.column('a')
+        assert len(a) == len(rows)
+        assert list(a) == [row[0] for row in rows]
+        view = a[10:50:3]
+        assert list(view) == [row[0] for row in rows[10:50:3]]
+        assert view[-1] == rows[10:50:3][-1][0]
+        assert r.column('b').ints() == [row[1].as_uint() for row in rows]
+        assert list(r.column('val')[::-1]) == [row[4] for row in rows[::-1]]
+
+
+def test_numpy(trace):
+    np = pytest.importorskip('numpy')
+    path, rows = trace
+    r = TraceReader(path)
+    arr = r.column('a')[3:20:2].as_numpy()
+    assert arr.tolist() == [int(row[0]) for row in rows[3:20:2]]
+    with pytest.raises(TypeError):
+        r.column('b').as_numpy()
+    del arr
+    r.close()
+
+
+def test_errors(tmp_path):
+    path = tmp_path / 'bad'
+    path.write_bytes(b'not a trace file')
+    with pytest.raises(ValueError):
+        TraceReader(path)
+    with pytest.raises(TypeError):
+        TraceWriter(tmp_path / 'x', [('a', BitVector)])
+    with TraceWriter(tmp_path / 'y', [('a', Bit)]) as w:
+        with pytest.raises(ValueError):
+            w.write(Bit(0), Bit(1))
+    with TraceReader(tmp_path / 'y') as r:
+        assert len(r) == 0
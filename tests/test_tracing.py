@@ -0,0 +1,212 @@
+import operator
+import random
+import threading
+
+import pytest
+
+from hwtypes import BitVector, UIntVector, SIntVector, Bit
+from hwtypes import compile_function, Trace, TracedBitVector
+
+NSAMPLES = 32
+WIDTHS = [1, 4, 16, 65]
+
+
+def _samples(width):
+    corner = [0, 1, (1 << width) - 1, 1 << (width - 1)]
+    return corner + [random.randint(0, (1 << width) - 1) for _ in range(NSAMPLES)]
+
+
+@pytest.mark.parametrize("op", [
+    operator.add,
+    operator.sub,
+    operator.mul,
+    operator.floordiv,
+    operator.mod,
+    operator.and_,
+    operator.or_,
+    operator.xor,
+    operator.lshift,
+    operator.rshift,
+    operator.eq,
+    operator.ne,
+    operator.lt,
+    operator.le,
+    operator.gt,
+    operator.ge,
+    BitVector.bvrol,
+    BitVector.bvror,
+    BitVector.bvcomp,
+])
+@pytest.mark.parametrize("width", WIDTHS)
+@pytest.mark.parametrize("T", [BitVector, UIntVector, SIntVector])
+def test_binary(op, width, T):
+    if op in (BitVector.bvrol, BitVector.bvror, BitVector.bvcomp):
+        name = op.__name__
+        op = lambda a, b: getattr(a, name)(b)
+    f = compile_function(op)
+    for x, y in zip(_samples(width), _samples(width) + [0]):
+        a, b = T[width](x), T[width](y)
+        expected = op(a, b)
+        res = f(a, b)
+        assert type(res) is type(expected)
+        assert res == expected
+
+
+@pytest.mark.parametrize("width", WIDTHS)
+def test_unary_and_ext(width):
+    def f(a):
+        return (~a, -a, a.zext(3), a.sext(4), a.repeat(3), a.concat(a),
+                a[0], a[-1], a[::2], a[width//2:], a.bvslt(0))
+    cf = compile_function(f)
+    for x in _samples(width):
+        a = SIntVector[width](x)
+        assert cf(a) == f(a)
+
+
+def _alu(a, b, op, c):
+    family = type(a).get_family()
+    BV = family.BitVector[16]
+    s, carry = a.adc(b, c)
+    return op.ite(s, a - b) & BV(0xfff0), carry, (a == b).ite(a, b)
+
+
+def test_alu():
+    alu = compile_function(_alu)
+    for _ in range(64):
+        a = BitVector[16](random.randint(0, 0xffff))
+        b = BitVector[16](random.randint(0, 0xffff))
+        op = Bit(random.randint(0, 1))
+        c = Bit(random.randint(0, 1))
+        assert alu(a, b, op, c) == _alu(a, b, op, c)
+
+
+def test_optimizations():
+    def f(a, b):
+        BV = type(a)
+        x = (a + b) & (b + a)               # cse + idempotence
+        y = BV(3) * BV(5) + 0               # constant folding
+        dead = a * b * a                    # dead code
+        return x | y
+
+    cf = compile_function(f)
+    a, b = BitVector[8](1), BitVector[8](2)
+    assert cf(a, b) == f(a, b)
+    src = cf.source(BitVector[8], BitVector[8])
+    assert src.count(' + ') == 1
+    assert '15' in src
+    assert '*' not in src
+
+
+def test_cache_per_signature():
+    f = compile_function(lambda a, b: a + b)
+    assert f(BitVector[8](255), BitVector[8](1)) == BitVector[8](0)
+    assert f(BitVector[16](255), BitVector[16](1)) == BitVector[16](256)
+    assert f(SIntVector[8](-1), SIntVector[8](-1)) == SIntVector[8](-2)
+    assert len(f._cache) == 3
+
+
+def test_fallback():
+    def f(a, b):
+        if a == b:
+            return a
+        return a + b
+
+    cf = compile_function(f)
+    assert cf.source(BitVector[8], BitVector[8]) is None
+    assert cf(BitVector[8](2), BitVector[8](2)) == BitVector[8](2)
+    assert cf(BitVector[8](2), BitVector[8](3)) == BitVector[8](5)
+
+
+def test_trace_constants():
+    with Trace() as trace:
+        a = TracedBitVector[8](3)
+        b = TracedBitVector[8](4)
+        assert trace.const_value((a + b)._node) == 7
+    with pytest.raises(TypeError):
+        TracedBitVector[8](3)
+
+
+def test_trace_threads():
+    # the traces being recorded are per thread
+    entered = threading.Event()
+    done = threading.Event()
+    errors = []
+
+    def other():
+        try:
+            entered.wait()
+            with pytest.raises(TypeError):
+                Trace.current()
+            with Trace() as trace:
+                assert Trace.current() is trace
+                TracedBitVector[8](1)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    t = threading.Thread(target=other)
+    t.start()
+    with Trace() as trace:
+        entered.set()
+        done.wait()
+        assert Trace.current() is trace
+        a = TracedBitVector[8](3)
+        assert trace.const_value(a._node) == 3
+    t.join()
+    assert not errors
+
+
+@pytest.mark.parametrize("index", [
+    slice(5, 2), slice(2, 5, -1), slice(3, 3), slice(1, 6), slice(0, 8, 3), slice(None, None, -1),
+])
+def test_slices(index):
+    def get(x):
+        return x[index]
+
+    def set_(x, v):
+        y = x + 0
+        y[index] = v[:len(range(*index.indices(8)))]
+        return y
+
+    cget = compile_function(get)
+    cset = compile_function(set_)
+    for a in _samples(8):
+        x = BitVector[8](a)
+        v = BitVector[8](random.randint(0, 255))
+        assert type(cget(x)) is type(get(x))
+        assert cget(x) == get(x)
+        assert cset(x, v) == set_(x, v)
+    assert cget.source(BitVector[8]) is not None
+    assert cset.source(BitVector[8], BitVector[8]) is not None
+
+
+def test_fallback_arguments():
+    f = compile_function(lambda a, b: a + b)
+    assert f(BitVector[8](3), 4) == BitVector[8](7)
+    assert f.source(BitVector[8], int) is None
+
+
+def test_compile_threads():
+    # signatures compiled at the same time keep their own output types
+    barrier = threading.Barrier(2, timeout=10)
+
+    def f(x):
+        barrier.wait()
+        return x + 1
+
+    cf = compile_function(f)
+    results = {}
+
+    def worker(T):
+        results[T] = cf(T(1))
+
+    types = [BitVector[8], SIntVector[16]]
+    threads = [threading.Thread(target=worker, args=(T,)) for T in types]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for T in types:
+        assert type(results[T]) is T
+        assert results[T] == T(2)
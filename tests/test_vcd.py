@@ -0,0 +1,99 @@
+import io
+
+import pytest
+
+from hwtypes import BitVector, Bit
+from hwtypes import VCDWriter
+from hwtypes.adt import Tuple, Product, Enum, TaggedUnion
+
+
+class Op(Enum):
+    add = 0
+    sub = 1
+    mul = 2
+
+
+class Inst(Product):
+    op = Op
+    imm = BitVector[12]
+
+
+class Val(TaggedUnion):
+    small = BitVector[4]
+    pair = Tuple[Bit, BitVector[2]]
+
+
+def _parse(text):
+    '''
+    Returns {hierarchical name : ident} and [(time, {ident : value})]
+    '''
+    header, body = text.split('$enddefinitions $end\n')
+    names = {}
+    scope = []
+    for line in header.splitlines():
+        tok = line.split()
+        if tok[0] == '$scope':
+            scope.append(tok[2])
+        elif tok[0] == '$upscope':
+            scope.pop()
+        elif tok[0] == '$var':
+            names['.'.join(scope + [tok[4]])] = tok[3]
+    assert not scope
+    changes = []
+    for line in body.splitlines():
+        if line.startswith('#'):
+            changes.append((int(line[1:]), {}))
+        elif line.startswith('b'):
+            v, ident = line[1:].split()
+            changes[-1][1][ident] = v
+        else:
+            changes[-1][1][line[1:]] = line[0]
+    return names, changes
+
+
+def test_vcd():
+    f = io.StringIO()
+    signals = [('clk', Bit), ('a', BitVector[8]), ('inst', Inst), ('val', Val)]
+    with VCDWriter(f, signals) as vcd:
+        inst = Inst(Op.sub, BitVector[12](5))
+        vcd.write(0, Bit(0), BitVector[8](3), inst, Val(small=BitVector[4](9)))
+        vcd.write(1, Bit(1), BitVector[8](3), inst, Val(small=BitVector[4](9)))
+        vcd.write(2, Bit(0), BitVector[8](3), inst, Val(pair=Tuple[Bit, BitVector[2]](Bit(1), BitVector[2](2))))
+        vcd.write(3, Bit(0), BitVector[8](3), inst, Val(pair=Tuple[Bit, BitVector[2]](Bit(1), BitVector[2](2))))
+        vcd.update(4, a=BitVector[8](4))
+        with pytest.raises(ValueError):
+            vcd.write(1, Bit(0), BitVector[8](3), inst, Val(small=BitVector[4](9)))
+
+    names, changes = _parse(f.getvalue())
+    assert set(names) == {
+        'top.clk', 'top.a', 'top.inst.op', 'top.inst.imm', 'top.val.tag',
+        'top.val.small', 'top.val.pair.0', 'top.val.pair.1',
+    }
+    n = {k.split('.', 1)[1] : v for k, v in names.items()}
+    assert len(set(n.values())) == len(n)
+
+    # time 3 had no changes so it is not dumped
+    assert [t for t, _ in changes] == [0, 1, 2, 4]
+    assert changes[0][1] == {
+        n['clk']: '0', n['a']: '11', n['inst.op']: '1', n['inst.imm']: '101',
+        n['val.tag']: '0', n['val.small']: '1001', n['val.pair.0']: 'x', n['val.pair.1']: 'x',
+    }
+    assert changes[1][1] == {n['clk']: '1'}
+    assert changes[2][1] == {
+        n['clk']: '0', n['val.tag']: '1', n['val.small']: 'x',
+        n['val.pair.0']: '1', n['val.pair.1']: '10',
+    }
+    assert changes[3][1] == {n['a']: '100'}
+
+
+def test_file(tmp_path):
+    path = tmp_path / 'dump.vcd'
+    with VCDWriter(path, [('x', BitVector[3])], timescale='1 ps') as vcd:
+        for t in range(10):
+            vcd.write(t, BitVector[3](t // 2))
+    text = path.read_text()
+    assert '$timescale 1 ps $end' in text
+    _, changes = _parse(text)
+    assert [t for t, _ in changes] == [0, 2, 4, 6, 8]
+    with pytest.raises(TypeError):
+        VCDWriter(io.StringIO(), [('x', BitVector)])